@@ -0,0 +1,173 @@
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+class RoomBroadcaster:
+    def __init__(self, socketio, config: dict = None):
+        config = config or {}
+        self.socketio = socketio
+        self.window = config.get('batch_window_ms', 30) / 1000.0
+        self.max_batch_size = config.get('max_batch_size', 100)
+        self.namespace = config.get('namespace', '/')
+        self.pending: Dict[str, List[Tuple[str, dict, float]]] = {}
+        self.deadlines: List[Tuple[float, str]] = []
+        self.condition = threading.Condition()
+        self.send_lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        
+        self.events_queued = 0
+        self.events_coalesced = 0
+        self.frames_sent = 0
+        self.batches_sent = 0
+        self.events_batched = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+        
+        if self.window > 0:
+            self.start()
+    
+    def start(self):
+        if self.running:
+            return
+        
+        self.running = True
+        self.thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread:
+            self.thread.join(timeout=5)
+        self.flush_all()
+    
+    def send(self, room: str, event: str, data: dict):
+        if not self.running:
+            with self.condition:
+                self.events_queued += 1
+                self.frames_sent += 1
+            self.socketio.emit(event, data, room=room, namespace=self.namespace)
+            return
+        
+        with self.condition:
+            self.events_queued += 1
+            events = self.pending.get(room)
+            if events is None:
+                events = self.pending[room] = []
+                heapq.heappush(self.deadlines, (time.time() + self.window, room))
+                self.condition.notify()
+            events.append((event, data, time.time()))
+            full = len(events) >= self.max_batch_size
+        
+        if full:
+            self.flush(room)
+    
+    def send_update(self, room: str, update: Optional[Tuple[str, dict]]):
+        if update is None:
+            return
+        event, payload = update
+        if event == 'lobby_state' or payload['changes']:
+            self.send(room, event, payload)
+    
+    def flush(self, room: str):
+        with self.send_lock:
+            with self.condition:
+                events = self.pending.pop(room, None)
+            if events:
+                self._send_frame(room, events)
+    
+    def flush_all(self):
+        for room in list(self.pending.keys()):
+            self.flush(room)
+    
+    def _flush_loop(self):
+        while True:
+            with self.condition:
+                while self.running and not self.deadlines:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                
+                due, room = self.deadlines[0]
+                delay = due - time.time()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+                heapq.heappop(self.deadlines)
+            
+            self.flush(room)
+    
+    def _send_frame(self, room: str, events: List[Tuple[str, dict, float]]):
+        now = time.time()
+        merged = self._coalesce(events)
+        
+        with self.condition:
+            for _, _, queued_at in events:
+                delay = now - queued_at
+                self.total_delay += delay
+                self.max_delay = max(self.max_delay, delay)
+            self.events_batched += len(events)
+            self.events_coalesced += len(events) - len(merged)
+            self.frames_sent += 1
+            if len(merged) > 1:
+                self.batches_sent += 1
+        
+        if len(merged) == 1:
+            event, data = merged[0]
+            self.socketio.emit(event, data, room=room, namespace=self.namespace)
+            return
+        
+        self.socketio.emit('lobby_batch', {
+            'lobby_id': room,
+            'events': [{'event': event, 'data': data} for event, data in merged]
+        }, room=room, namespace=self.namespace)
+    
+    def _coalesce(self, events: List[Tuple[str, dict, float]]) -> List[Tuple[str, dict]]:
+        merged: List[Tuple[str, dict]] = []
+        sync_index = None
+        
+        for event, data, _ in events:
+            if event == 'lobby_state':
+                if sync_index is not None:
+                    merged[sync_index] = None
+                sync_index = len(merged)
+                merged.append((event, data))
+                continue
+            
+            if event == 'lobby_delta' and sync_index is not None:
+                previous_event, previous = merged[sync_index]
+                if previous_event == 'lobby_state' and data['version'] <= previous['version']:
+                    continue
+                if previous_event == 'lobby_delta' and data['from_version'] == previous['version']:
+                    merged[sync_index] = (event, {
+                        'lobby_id': data['lobby_id'],
+                        'from_version': previous['from_version'],
+                        'version': data['version'],
+                        'changes': previous['changes'] + data['changes']
+                    })
+                    continue
+            
+            if event == 'lobby_delta':
+                sync_index = len(merged)
+            merged.append((event, data))
+        
+        return [entry for entry in merged if entry is not None]
+    
+    def get_stats(self) -> dict:
+        with self.condition:
+            pending = sum(len(events) for events in self.pending.values())
+            delivered = self.events_queued - pending
+            return {
+                'batch_window_ms': self.window * 1000,
+                'pending_rooms': len(self.pending),
+                'events_queued': self.events_queued,
+                'frames_sent': self.frames_sent,
+                'frames_saved': delivered - self.frames_sent,
+                'events_coalesced': self.events_coalesced,
+                'batches_sent': self.batches_sent,
+                'avg_added_latency_ms': self.total_delay / max(1, self.events_batched) * 1000,
+                'max_added_latency_ms': self.max_delay * 1000
+            }
\ No newline at end of file
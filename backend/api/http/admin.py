@@ -3,31 +3,83 @@ import psutil
 
 admin_bp = Blueprint('admin', __name__)
 
-def init_admin_routes(engine, analytics_service):
+def init_admin_routes(engine, analytics_service, broadcaster=None, event_log=None, snapshots=None, persister=None,
+                      shards=None):
+    lobbies = shards or engine
     
     @admin_bp.route('/admin/stats', methods=['GET'])
     def get_stats():
-        stats = {
-            'total_lobbies': len(engine.lobbies),
-            'total_players': len(engine.players),
-            'total_bots': len(engine.bots),
-            'total_parties': len(engine.parties),
-            'lobbies': engine.get_all_lobbies()
-        }
+        stats = analytics_service.get_totals()
+        stats['events'] = engine.event_bus.get_stats()
+        stats['lobbies'] = lobbies.get_all_lobbies()
         return jsonify(stats)
     
     @admin_bp.route('/admin/events', methods=['GET'])
     def get_events():
         limit = request.args.get('limit', 100, type=int)
-        events = engine.event_bus.get_history(limit)
+        
+        if not event_log or request.args.get('source') == 'memory':
+            events = engine.event_bus.get_history(limit)
+            return jsonify({'events': events})
+        
+        events = event_log.query(
+            since=request.args.get('since', type=float),
+            until=request.args.get('until', type=float),
+            lobby_id=request.args.get('lobby_id'),
+            event=request.args.get('event'),
+            limit=limit
+        )
         return jsonify({'events': events})
     
+    @admin_bp.route('/admin/events/stats', methods=['GET'])
+    def get_event_stats():
+        stats = engine.event_bus.get_stats()
+        if event_log:
+            stats['log'] = event_log.get_stats()
+        return jsonify(stats)
+    
+    @admin_bp.route('/admin/rules/stats', methods=['GET'])
+    def get_rule_stats():
+        if shards:
+            return jsonify({'per_shard': shards.broadcast('get_rule_stats')})
+        return jsonify(engine.rule_engine.get_stats())
+    
+    @admin_bp.route('/admin/reaper/stats', methods=['GET'])
+    def get_reaper_stats():
+        if shards:
+            return jsonify({'per_shard': shards.broadcast('get_reaper_stats')})
+        return jsonify(engine.reaper.get_stats())
+    
+    @admin_bp.route('/admin/snapshots/stats', methods=['GET'])
+    def get_snapshot_stats():
+        if not snapshots:
+            return jsonify({'error': 'Snapshots not configured'}), 404
+        return jsonify(snapshots.get_stats())
+    
+    @admin_bp.route('/admin/persistence/stats', methods=['GET'])
+    def get_persistence_stats():
+        if not persister:
+            return jsonify({'error': 'Persistence not configured'}), 404
+        return jsonify(persister.get_stats())
+    
+    @admin_bp.route('/admin/snapshots', methods=['POST'])
+    def write_snapshot():
+        if not snapshots:
+            return jsonify({'error': 'Snapshots not configured'}), 404
+        return jsonify({'success': True, 'snapshot': snapshots.write_snapshot()})
+    
+    @admin_bp.route('/admin/broadcast/stats', methods=['GET'])
+    def get_broadcast_stats():
+        if not broadcaster:
+            return jsonify({'error': 'Broadcaster not configured'}), 404
+        return jsonify(broadcaster.get_stats())
+    
     @admin_bp.route('/admin/lobbies/<lobby_id>/kick', methods=['POST'])
     def kick_player(lobby_id):
         data = request.json
         player_id = data.get('player_id')
         
-        engine.remove_player_from_lobby(lobby_id, player_id)
+        lobbies.remove_player_from_lobby(lobby_id, player_id)
         return jsonify({'success': True})
     
     @admin_bp.route('/admin/analytics', methods=['GET'])
@@ -38,6 +90,13 @@ def init_admin_routes(engine, analytics_service):
     @admin_bp.route('/admin/system', methods=['GET'])
     def get_system_info():
         import platform
+        import time
+        
+        if shards:
+            created = [lobby['created_at'] for lobby in shards.get_all_lobbies()]
+            uptime = time.time() - min(created) if created else 0
+        else:
+            uptime = time.time() - engine.lobbies.get(list(engine.lobbies.keys())[0]).created_at if engine.lobbies else 0
         
         try:
             import psutil
@@ -52,7 +111,7 @@ def init_admin_routes(engine, analytics_service):
             'python_version': platform.python_version(),
             'cpu_percent': cpu_percent,
             'memory_percent': memory_percent,
-            'uptime': __import__('time').time() - engine.lobbies.get(list(engine.lobbies.keys())[0]).created_at if engine.lobbies else 0
+            'uptime': uptime
         }
         return jsonify(info)
     
@@ -62,8 +121,9 @@ def init_admin_routes(engine, analytics_service):
         clear_type = data.get('type', 'all')
         
         if clear_type == 'lobbies' or clear_type == 'all':
-            for lobby_id in list(engine.lobbies.keys()):
-                engine.delete_lobby(lobby_id)
+            lobby_ids = [lobby['lobby_id'] for lobby in shards.get_all_lobbies()] if shards else list(engine.lobbies.keys())
+            for lobby_id in lobby_ids:
+                lobbies.delete_lobby(lobby_id)
         
         if clear_type == 'events' or clear_type == 'all':
             engine.event_bus.clear_history()
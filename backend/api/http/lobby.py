@@ -1,14 +1,39 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from core.player import Player
 
 lobby_bp = Blueprint('lobby', __name__)
 
-def init_lobby_routes(engine):
+def init_lobby_routes(engine, broadcaster=None):
     
     @lobby_bp.route('/lobbies', methods=['GET'])
     def get_lobbies():
-        lobbies = engine.get_all_lobbies()
-        return jsonify({'lobbies': lobbies})
+        if not request.args:
+            lobbies = [lobby.to_json() for lobby in list(engine.lobbies.values())]
+            return Response(b'{"lobbies":[' + b','.join(lobbies) + b']}', mimetype='application/json')
+        
+        has_bots = request.args.get('has_bots')
+        tags = dict(tag.split(':', 1) for tag in request.args.getlist('tag') if ':' in tag)
+        fields = request.args.get('fields')
+        
+        lobbies, next_cursor = engine.query_lobbies(
+            state=request.args.get('state'),
+            min_free_slots=request.args.get('min_free_slots', type=int),
+            has_bots=None if has_bots is None else has_bots.lower() in ('1', 'true', 'yes'),
+            tags=tags,
+            cursor=request.args.get('cursor', 0, type=int),
+            limit=request.args.get('limit', type=int)
+        )
+        
+        if fields:
+            fields = [f.strip() for f in fields.split(',') if f.strip()]
+            return jsonify({
+                'lobbies': [lobby.project(fields) for lobby in lobbies],
+                'next_cursor': next_cursor
+            })
+        
+        body = b'{"lobbies":[' + b','.join(lobby.to_json() for lobby in lobbies) + b'],"next_cursor":'
+        return Response(body + (str(next_cursor).encode() if next_cursor else b'null') + b'}',
+                        mimetype='application/json')
     
     @lobby_bp.route('/lobbies', methods=['POST'])
     def create_lobby():
@@ -19,12 +44,26 @@ def init_lobby_routes(engine):
         lobby = engine.create_lobby(lobby_id, config)
         return jsonify({'success': True, 'lobby': lobby.to_dict()})
     
+    @lobby_bp.route('/lobbies/quick-join', methods=['POST'])
+    def quick_join():
+        data = request.json
+        player = Player(
+            player_id=data.get('player_id'),
+            username=data.get('username'),
+            metadata=data.get('metadata', {})
+        )
+        
+        lobby = engine.quick_join(player)
+        if lobby:
+            return jsonify({'success': True, 'lobby': lobby.to_dict(), 'player': player.to_dict()})
+        return jsonify({'error': 'No open lobby available'}), 404
+    
     @lobby_bp.route('/lobbies/<lobby_id>', methods=['GET'])
     def get_lobby(lobby_id):
         lobby = engine.get_lobby(lobby_id)
         if not lobby:
             return jsonify({'error': 'Lobby not found'}), 404
-        return jsonify({'lobby': lobby.to_dict()})
+        return Response(b'{"lobby":' + lobby.to_json() + b'}', mimetype='application/json')
     
     @lobby_bp.route('/lobbies/<lobby_id>', methods=['DELETE'])
     def delete_lobby(lobby_id):
@@ -59,9 +98,43 @@ def init_lobby_routes(engine):
         player_id = data.get('player_id')
         ready = data.get('ready', True)
         
+        lobby = engine.get_lobby(lobby_id)
+        since_version = lobby.version if lobby else None
+        
         engine.set_player_ready(lobby_id, player_id, ready)
+        if lobby and broadcaster:
+            broadcaster.send_update(lobby_id, lobby.get_update(since_version))
         return jsonify({'success': True})
     
+    @lobby_bp.route('/lobbies/<lobby_id>/join-many', methods=['POST'])
+    def join_lobby_many(lobby_id):
+        data = request.json
+        players = [
+            Player(
+                player_id=entry.get('player_id'),
+                username=entry.get('username'),
+                metadata=entry.get('metadata', {})
+            )
+            for entry in data.get('players', [])
+        ]
+        
+        success = engine.add_players_to_lobby(lobby_id, players)
+        if success:
+            return jsonify({'success': True, 'players': [p.to_dict() for p in players]})
+        return jsonify({'error': 'Could not join lobby'}), 400
+    
+    @lobby_bp.route('/lobbies/<lobby_id>/leave-many', methods=['POST'])
+    def leave_lobby_many(lobby_id):
+        data = request.json
+        removed = engine.remove_players(lobby_id, data.get('player_ids', []))
+        return jsonify({'success': True, 'player_ids': removed})
+    
+    @lobby_bp.route('/lobbies/<lobby_id>/ready-many', methods=['POST'])
+    def set_ready_many(lobby_id):
+        data = request.json
+        updated = engine.set_ready_many(lobby_id, data.get('player_ids', []), data.get('ready', True))
+        return jsonify({'success': True, 'player_ids': updated})
+    
     @lobby_bp.route('/players', methods=['GET'])
     def get_players():
         players = engine.get_all_players()
@@ -74,4 +147,57 @@ def init_lobby_routes(engine):
             return jsonify({'error': 'Player not found'}), 404
         return jsonify({'player': player.to_dict()})
     
+    @lobby_bp.route('/players/<player_id>/party', methods=['GET'])
+    def get_player_party(player_id):
+        party = engine.get_player_party(player_id)
+        if not party:
+            return jsonify({'error': 'Party not found'}), 404
+        return jsonify({'party': party.to_dict()})
+    
+    @lobby_bp.route('/parties', methods=['POST'])
+    def create_party():
+        data = request.json
+        party = engine.create_party(data.get('party_id'), data.get('leader_id'))
+        if not party:
+            return jsonify({'error': 'Party already exists'}), 409
+        return jsonify({'success': True, 'party': party.to_dict()})
+    
+    @lobby_bp.route('/parties/<party_id>', methods=['GET'])
+    def get_party(party_id):
+        party = engine.get_party(party_id)
+        if not party:
+            return jsonify({'error': 'Party not found'}), 404
+        return jsonify({'party': party.to_dict()})
+    
+    @lobby_bp.route('/parties/<party_id>/members', methods=['POST'])
+    def add_party_member(party_id):
+        data = request.json
+        if engine.add_party_member(party_id, data.get('player_id')):
+            return jsonify({'success': True, 'party': engine.get_party(party_id).to_dict()})
+        return jsonify({'error': 'Could not join party'}), 400
+    
+    @lobby_bp.route('/parties/<party_id>/members/<player_id>', methods=['DELETE'])
+    def remove_party_member(party_id, player_id):
+        party = engine.get_player_party(player_id)
+        if not party or party.party_id != party_id:
+            return jsonify({'error': 'Player not in party'}), 404
+        engine.leave_party(player_id)
+        return jsonify({'success': True})
+    
+    @lobby_bp.route('/parties/<party_id>/join', methods=['POST'])
+    def join_party_to_lobby(party_id):
+        data = request.json
+        players = [
+            Player(
+                player_id=entry.get('player_id'),
+                username=entry.get('username'),
+                metadata=entry.get('metadata', {})
+            )
+            for entry in data.get('players', [])
+        ]
+        
+        if engine.join_party_to_lobby(party_id, data.get('lobby_id'), players):
+            return jsonify({'success': True, 'party': engine.get_party(party_id).to_dict()})
+        return jsonify({'error': 'Could not join lobby'}), 400
+    
     return lobby_bp
\ No newline at end of file
@@ -19,6 +19,10 @@ def init_matchmaking_routes(matcher):
         queue = matcher.create_queue(queue_id, config)
         return jsonify({'success': True, 'queue': queue.to_dict()})
     
+    @matchmaking_bp.route('/queues/stats', methods=['GET'])
+    def get_matcher_stats():
+        return jsonify(matcher.get_stats())
+    
     @matchmaking_bp.route('/queues/<queue_id>', methods=['GET'])
     def get_queue(queue_id):
         queue = matcher.get_queue(queue_id)
@@ -0,0 +1,172 @@
+from flask import Blueprint, request, jsonify
+from core.player import Player
+
+shards_bp = Blueprint('lobby', __name__)
+
+def _players_from(entries):
+    return [
+        Player(
+            player_id=entry.get('player_id'),
+            username=entry.get('username'),
+            metadata=entry.get('metadata', {})
+        )
+        for entry in entries
+    ]
+
+def init_shard_routes(shards, broadcaster=None):
+    
+    @shards_bp.route('/lobbies', methods=['GET'])
+    def get_lobbies():
+        if not request.args:
+            return jsonify({'lobbies': shards.get_all_lobbies()})
+        
+        has_bots = request.args.get('has_bots')
+        tags = dict(tag.split(':', 1) for tag in request.args.getlist('tag') if ':' in tag)
+        fields = request.args.get('fields')
+        
+        try:
+            lobbies, next_cursor = shards.query_lobbies(
+                state=request.args.get('state'),
+                min_free_slots=request.args.get('min_free_slots', type=int),
+                has_bots=None if has_bots is None else has_bots.lower() in ('1', 'true', 'yes'),
+                tags=tags,
+                cursor=request.args.get('cursor'),
+                limit=request.args.get('limit', type=int),
+                fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None
+            )
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        return jsonify({'lobbies': lobbies, 'next_cursor': next_cursor})
+    
+    @shards_bp.route('/lobbies', methods=['POST'])
+    def create_lobby():
+        data = request.json
+        lobby_id = data.get('lobby_id', f"lobby_{int(__import__('time').time())}")
+        config = data.get('config', {})
+        
+        lobby = shards.create_lobby(lobby_id, config)
+        return jsonify({'success': True, 'lobby': lobby})
+    
+    @shards_bp.route('/lobbies/quick-join', methods=['POST'])
+    def quick_join():
+        data = request.json
+        player = _players_from([data])[0]
+        
+        lobby = shards.quick_join(player)
+        if lobby:
+            return jsonify({'success': True, 'lobby': lobby, 'player': player.to_dict()})
+        return jsonify({'error': 'No open lobby available'}), 404
+    
+    @shards_bp.route('/lobbies/<lobby_id>', methods=['GET'])
+    def get_lobby(lobby_id):
+        lobby = shards.get_lobby(lobby_id)
+        if not lobby:
+            return jsonify({'error': 'Lobby not found'}), 404
+        return jsonify({'lobby': lobby})
+    
+    @shards_bp.route('/lobbies/<lobby_id>', methods=['DELETE'])
+    def delete_lobby(lobby_id):
+        shards.delete_lobby(lobby_id)
+        return jsonify({'success': True})
+    
+    @shards_bp.route('/lobbies/<lobby_id>/join', methods=['POST'])
+    def join_lobby(lobby_id):
+        player = _players_from([request.json])[0]
+        
+        if shards.add_player_to_lobby(lobby_id, player):
+            return jsonify({'success': True, 'player': player.to_dict()})
+        return jsonify({'error': 'Could not join lobby'}), 400
+    
+    @shards_bp.route('/lobbies/<lobby_id>/leave', methods=['POST'])
+    def leave_lobby(lobby_id):
+        shards.remove_player_from_lobby(lobby_id, request.json.get('player_id'))
+        return jsonify({'success': True})
+    
+    @shards_bp.route('/lobbies/<lobby_id>/ready', methods=['POST'])
+    def set_ready(lobby_id):
+        data = request.json
+        _, update = shards.call_with_update(lobby_id, 'set_player_ready', data.get('player_id'), data.get('ready', True))
+        if broadcaster:
+            broadcaster.send_update(lobby_id, update)
+        return jsonify({'success': True})
+    
+    @shards_bp.route('/lobbies/<lobby_id>/join-many', methods=['POST'])
+    def join_lobby_many(lobby_id):
+        players = _players_from(request.json.get('players', []))
+        
+        if shards.add_players_to_lobby(lobby_id, players):
+            return jsonify({'success': True, 'players': [p.to_dict() for p in players]})
+        return jsonify({'error': 'Could not join lobby'}), 400
+    
+    @shards_bp.route('/lobbies/<lobby_id>/leave-many', methods=['POST'])
+    def leave_lobby_many(lobby_id):
+        removed = shards.remove_players(lobby_id, request.json.get('player_ids', []))
+        return jsonify({'success': True, 'player_ids': removed})
+    
+    @shards_bp.route('/lobbies/<lobby_id>/ready-many', methods=['POST'])
+    def set_ready_many(lobby_id):
+        data = request.json
+        updated = shards.set_ready_many(lobby_id, data.get('player_ids', []), data.get('ready', True))
+        return jsonify({'success': True, 'player_ids': updated})
+    
+    @shards_bp.route('/players', methods=['GET'])
+    def get_players():
+        return jsonify({'players': shards.get_all_players()})
+    
+    @shards_bp.route('/players/<player_id>', methods=['GET'])
+    def get_player(player_id):
+        player = shards.get_player(player_id)
+        if not player:
+            return jsonify({'error': 'Player not found'}), 404
+        return jsonify({'player': player})
+    
+    @shards_bp.route('/players/<player_id>/party', methods=['GET'])
+    def get_player_party(player_id):
+        party = shards.get_player_party(player_id)
+        if not party:
+            return jsonify({'error': 'Party not found'}), 404
+        return jsonify({'party': party.to_dict()})
+    
+    @shards_bp.route('/parties', methods=['POST'])
+    def create_party():
+        data = request.json
+        party = shards.create_party(data.get('party_id'), data.get('leader_id'))
+        if not party:
+            return jsonify({'error': 'Party already exists'}), 409
+        return jsonify({'success': True, 'party': party.to_dict()})
+    
+    @shards_bp.route('/parties/<party_id>', methods=['GET'])
+    def get_party(party_id):
+        party = shards.get_party(party_id)
+        if not party:
+            return jsonify({'error': 'Party not found'}), 404
+        return jsonify({'party': party.to_dict()})
+    
+    @shards_bp.route('/parties/<party_id>/members', methods=['POST'])
+    def add_party_member(party_id):
+        if shards.add_party_member(party_id, request.json.get('player_id')):
+            return jsonify({'success': True, 'party': shards.get_party(party_id).to_dict()})
+        return jsonify({'error': 'Could not join party'}), 400
+    
+    @shards_bp.route('/parties/<party_id>/members/<player_id>', methods=['DELETE'])
+    def remove_party_member(party_id, player_id):
+        party = shards.get_player_party(player_id)
+        if not party or party.party_id != party_id:
+            return jsonify({'error': 'Player not in party'}), 404
+        shards.leave_party(player_id)
+        return jsonify({'success': True})
+    
+    @shards_bp.route('/parties/<party_id>/join', methods=['POST'])
+    def join_party_to_lobby(party_id):
+        data = request.json
+        players = _players_from(data.get('players', []))
+        
+        if shards.join_party_to_lobby(party_id, data.get('lobby_id'), players):
+            return jsonify({'success': True, 'party': shards.get_party(party_id).to_dict()})
+        return jsonify({'error': 'Could not join lobby'}), 400
+    
+    @shards_bp.route('/admin/shards/stats', methods=['GET'])
+    def get_shard_stats():
+        return jsonify(shards.get_stats())
+    
+    return shards_bp
\ No newline at end of file
@@ -1,7 +1,51 @@
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from core.player import Player
 
-def init_websocket(socketio, engine, bot_manager):
+def _client_version(data):
+    try:
+        return int(data.get('version'))
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def _optional_int(data, key):
+    value = data.get(key)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f'Invalid {key}')
+    if value < 0:
+        raise ValueError(f'Invalid {key}')
+    return value
+
+def _query_args(data):
+    if not isinstance(data, dict):
+        raise ValueError('Invalid query')
+    has_bots = data.get('has_bots')
+    if isinstance(has_bots, str):
+        has_bots = has_bots.lower() in ('1', 'true', 'yes')
+    tags = data.get('tags')
+    if tags is not None and not isinstance(tags, dict):
+        raise ValueError('Invalid tags')
+    fields = data.get('fields')
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    if fields is not None and not (isinstance(fields, list) and all(isinstance(f, str) for f in fields)):
+        raise ValueError('Invalid fields')
+    return {
+        'state': data.get('state'),
+        'min_free_slots': _optional_int(data, 'min_free_slots'),
+        'has_bots': None if has_bots is None else bool(has_bots),
+        'tags': tags,
+        'limit': _optional_int(data, 'limit'),
+        'fields': fields
+    }
+
+def init_websocket(socketio, engine, bot_manager, broadcaster):
+    
+    def broadcast_lobby_update(lobby, since_version):
+        broadcaster.send_update(lobby.lobby_id, lobby.get_update(since_version))
     
     @socketio.on('connect')
     def handle_connect():
@@ -31,13 +75,29 @@ def init_websocket(socketio, engine, bot_manager):
         success = engine.add_player_to_lobby(lobby_id, player)
         if success:
             join_room(lobby_id)
-            emit('player_joined', player.to_dict(), room=lobby_id, broadcast=True)
+            broadcaster.send(lobby_id, 'player_joined', player.to_dict())
             
             lobby = engine.get_lobby(lobby_id)
             emit('lobby_state', lobby.to_dict())
         else:
             emit('error', {'message': 'Could not join lobby'})
     
+    @socketio.on('quick_join')
+    def handle_quick_join(data):
+        player = Player(
+            player_id=data.get('player_id'),
+            username=data.get('username'),
+            metadata=data.get('metadata', {})
+        )
+        
+        lobby = engine.quick_join(player)
+        if lobby:
+            join_room(lobby.lobby_id)
+            broadcaster.send(lobby.lobby_id, 'player_joined', player.to_dict())
+            emit('lobby_state', lobby.to_dict())
+        else:
+            emit('error', {'message': 'No open lobby available'})
+    
     @socketio.on('leave_lobby')
     def handle_leave_lobby(data):
         lobby_id = data.get('lobby_id')
@@ -45,7 +105,7 @@ def init_websocket(socketio, engine, bot_manager):
         
         engine.remove_player_from_lobby(lobby_id, player_id)
         leave_room(lobby_id)
-        emit('player_left', {'player_id': player_id}, room=lobby_id, broadcast=True)
+        broadcaster.send(lobby_id, 'player_left', {'player_id': player_id})
     
     @socketio.on('set_ready')
     def handle_set_ready(data):
@@ -53,24 +113,66 @@ def init_websocket(socketio, engine, bot_manager):
         player_id = data.get('player_id')
         ready = data.get('ready', True)
         
+        lobby = engine.get_lobby(lobby_id)
+        since_version = lobby.version if lobby else None
+        
         engine.set_player_ready(lobby_id, player_id, ready)
-        emit('player_ready', {'player_id': player_id, 'ready': ready}, room=lobby_id, broadcast=True)
         
-        lobby = engine.get_lobby(lobby_id)
         if lobby:
-            emit('lobby_state', lobby.to_dict(), room=lobby_id, broadcast=True)
+            broadcast_lobby_update(lobby, since_version)
+    
+    @socketio.on('join_lobby_many')
+    def handle_join_lobby_many(data):
+        lobby_id = data.get('lobby_id')
+        players = [
+            Player(
+                player_id=entry.get('player_id'),
+                username=entry.get('username'),
+                metadata=entry.get('metadata', {})
+            )
+            for entry in data.get('players', [])
+        ]
+        
+        lobby = engine.get_lobby(lobby_id)
+        since_version = lobby.version if lobby else None
+        
+        if engine.add_players_to_lobby(lobby_id, players):
+            join_room(lobby_id)
+            broadcast_lobby_update(lobby, since_version)
+            emit('lobby_state', lobby.to_dict())
+        else:
+            emit('error', {'message': 'Could not join lobby'})
+    
+    @socketio.on('leave_lobby_many')
+    def handle_leave_lobby_many(data):
+        lobby_id = data.get('lobby_id')
+        lobby = engine.get_lobby(lobby_id)
+        since_version = lobby.version if lobby else None
+        
+        if engine.remove_players(lobby_id, data.get('player_ids', [])):
+            broadcast_lobby_update(lobby, since_version)
+    
+    @socketio.on('set_ready_many')
+    def handle_set_ready_many(data):
+        lobby_id = data.get('lobby_id')
+        lobby = engine.get_lobby(lobby_id)
+        since_version = lobby.version if lobby else None
+        
+        if engine.set_ready_many(lobby_id, data.get('player_ids', []), data.get('ready', True)):
+            broadcast_lobby_update(lobby, since_version)
     
     @socketio.on('add_bot')
     def handle_add_bot(data):
         lobby_id = data.get('lobby_id')
         profile = data.get('profile', 'default')
         
+        lobby = engine.get_lobby(lobby_id)
+        since_version = lobby.version if lobby else None
+        
         bot = bot_manager.add_bot_to_lobby(lobby_id, profile)
         if bot:
-            emit('bot_added', bot.to_dict(), room=lobby_id, broadcast=True)
-            
-            lobby = engine.get_lobby(lobby_id)
-            emit('lobby_state', lobby.to_dict(), room=lobby_id, broadcast=True)
+            broadcaster.send(lobby_id, 'bot_added', bot.to_dict())
+            broadcast_lobby_update(lobby, since_version)
     
     @socketio.on('get_lobby')
     def handle_get_lobby(data):
@@ -78,24 +180,163 @@ def init_websocket(socketio, engine, bot_manager):
         lobby = engine.get_lobby(lobby_id)
         
         if lobby:
-            emit('lobby_state', lobby.to_dict())
+            emit(*lobby.get_update(_client_version(data)))
         else:
             emit('error', {'message': 'Lobby not found'})
     
     @socketio.on('get_lobbies')
-    def handle_get_lobbies():
-        lobbies = engine.get_all_lobbies()
-        emit('lobbies_list', {'lobbies': lobbies})
+    def handle_get_lobbies(data=None):
+        if not data:
+            lobbies = engine.get_all_lobbies()
+            emit('lobbies_list', {'lobbies': lobbies})
+            return
+        
+        try:
+            args = _query_args(data)
+            cursor = _optional_int(data, 'cursor') or 0
+        except ValueError as e:
+            emit('error', {'message': str(e)})
+            return
+        
+        fields = args.pop('fields')
+        lobbies, next_cursor = engine.query_lobbies(cursor=cursor, **args)
+        
+        emit('lobbies_list', {
+            'lobbies': [lobby.project(fields) if fields else lobby.to_dict() for lobby in lobbies],
+            'next_cursor': next_cursor
+        })
     
     def broadcast_event(event_data):
-        event_name = event_data.get('event')
-        data = event_data.get('data', {})
+        data = event_data['data']
+        broadcaster.send(data['lobby_id'], event_data['event'], data)
+    
+    for event_name in ('player_joined', 'player_left', 'bot_joined', 'lobby_all_ready',
+                       'players_joined', 'players_left', 'players_ready_changed', 'party_joined'):
+        engine.event_bus.on(f'lobby.*.{event_name}', broadcast_event)
+
+def init_sharded_websocket(socketio, shards, bot_manager, broadcaster):
+    
+    def players_from(entries):
+        return [
+            Player(
+                player_id=entry.get('player_id'),
+                username=entry.get('username'),
+                metadata=entry.get('metadata', {})
+            )
+            for entry in entries
+        ]
+    
+    @socketio.on('connect')
+    def handle_connect():
+        emit('connected', {'message': 'Connected to Joinly'})
+    
+    @socketio.on('disconnect')
+    def handle_disconnect():
+        pass
+    
+    @socketio.on('create_lobby')
+    def handle_create_lobby(data):
+        lobby_id = data.get('lobby_id', f"lobby_{int(__import__('time').time())}")
+        emit('lobby_created', shards.create_lobby(lobby_id, data.get('config', {})))
+    
+    @socketio.on('join_lobby')
+    def handle_join_lobby(data):
+        lobby_id = data.get('lobby_id')
+        player = players_from([data])[0]
         
-        if 'lobby_id' in data:
-            emit(event_name, data, room=data['lobby_id'], namespace='/', broadcast=True)
+        if shards.add_player_to_lobby(lobby_id, player):
+            join_room(lobby_id)
+            emit('lobby_state', shards.get_lobby(lobby_id))
+        else:
+            emit('error', {'message': 'Could not join lobby'})
+    
+    @socketio.on('quick_join')
+    def handle_quick_join(data):
+        lobby = shards.quick_join(players_from([data])[0])
+        if lobby:
+            join_room(lobby['lobby_id'])
+            emit('lobby_state', lobby)
+        else:
+            emit('error', {'message': 'No open lobby available'})
+    
+    @socketio.on('leave_lobby')
+    def handle_leave_lobby(data):
+        lobby_id = data.get('lobby_id')
+        shards.remove_player_from_lobby(lobby_id, data.get('player_id'))
+        leave_room(lobby_id)
+    
+    @socketio.on('set_ready')
+    def handle_set_ready(data):
+        lobby_id = data.get('lobby_id')
+        _, update = shards.call_with_update(lobby_id, 'set_player_ready', data.get('player_id'), data.get('ready', True))
+        broadcaster.send_update(lobby_id, update)
+    
+    @socketio.on('join_lobby_many')
+    def handle_join_lobby_many(data):
+        lobby_id = data.get('lobby_id')
+        success, update = shards.call_with_update(lobby_id, 'add_players_to_lobby', players_from(data.get('players', [])))
+        if success:
+            join_room(lobby_id)
+            broadcaster.send_update(lobby_id, update)
+            emit('lobby_state', shards.get_lobby(lobby_id))
+        else:
+            emit('error', {'message': 'Could not join lobby'})
+    
+    @socketio.on('leave_lobby_many')
+    def handle_leave_lobby_many(data):
+        lobby_id = data.get('lobby_id')
+        removed, update = shards.call_with_update(lobby_id, 'remove_players', data.get('player_ids', []))
+        if removed:
+            broadcaster.send_update(lobby_id, update)
+    
+    @socketio.on('set_ready_many')
+    def handle_set_ready_many(data):
+        lobby_id = data.get('lobby_id')
+        updated, update = shards.call_with_update(lobby_id, 'set_ready_many', data.get('player_ids', []),
+                                                  data.get('ready', True))
+        if updated:
+            broadcaster.send_update(lobby_id, update)
+    
+    @socketio.on('add_bot')
+    def handle_add_bot(data):
+        lobby_id = data.get('lobby_id')
+        bot, update = shards.call_with_update(lobby_id, 'add_bot_to_lobby', data.get('profile', 'default'))
+        if bot:
+            broadcaster.send(lobby_id, 'bot_added', bot.to_dict())
+            broadcaster.send_update(lobby_id, update)
+    
+    @socketio.on('get_lobby')
+    def handle_get_lobby(data):
+        update = shards.get_lobby_update(data.get('lobby_id'), _client_version(data))
+        if update:
+            emit(*update)
+        else:
+            emit('error', {'message': 'Lobby not found'})
+    
+    @socketio.on('get_lobbies')
+    def handle_get_lobbies(data=None):
+        if not data:
+            emit('lobbies_list', {'lobbies': shards.get_all_lobbies()})
+            return
+        
+        try:
+            args = _query_args(data)
+        except ValueError as e:
+            emit('error', {'message': str(e)})
+            return
+        
+        try:
+            lobbies, next_cursor = shards.query_lobbies(cursor=data.get('cursor'), **args)
+        except ValueError:
+            emit('error', {'message': 'Invalid cursor'})
+            return
+        
+        emit('lobbies_list', {'lobbies': lobbies, 'next_cursor': next_cursor})
+    
+    def broadcast_event(event_data):
+        data = event_data['data']
+        broadcaster.send(data['lobby_id'], event_data['event'], data)
     
-    engine.event_bus.on('player_joined', broadcast_event)
-    engine.event_bus.on('player_left', broadcast_event)
-    engine.event_bus.on('player_ready_changed', broadcast_event)
-    engine.event_bus.on('bot_joined', broadcast_event)
-    engine.event_bus.on('lobby_all_ready', broadcast_event)
\ No newline at end of file
+    for event_name in ('player_joined', 'player_left', 'bot_joined', 'lobby_all_ready',
+                       'players_joined', 'players_left', 'players_ready_changed', 'party_joined'):
+        shards.event_bus.on(f'lobby.*.{event_name}', broadcast_event)
\ No newline at end of file
@@ -26,8 +26,12 @@ try:
     print("  ✓ bots routes")
     from api.http.admin import init_admin_routes
     print("  ✓ admin routes")
-    from api.websocket import init_websocket
+    from api.http.shards import init_shard_routes
+    print("  ✓ shard routes")
+    from api.websocket import init_websocket, init_sharded_websocket
     print("  ✓ websocket handlers")
+    from api.broadcast import RoomBroadcaster
+    print("  ✓ room broadcaster")
     print("✓ API routes imported")
 except Exception as e:
     import traceback
@@ -53,13 +57,16 @@ engine = components['engine']
 matcher = components['matcher']
 bot_manager = components['bot_manager']
 analytics = components['analytics']
+broadcaster = RoomBroadcaster(socketio, bootstrap.config['admin'].get('admin', {}).get('websocket', {}))
 print("✓ Joinly components ready")
 
 print("[6/7] Registering API blueprints...")
-lobby_bp = init_lobby_routes(engine)
+shards = components['shards']
+lobby_bp = init_shard_routes(shards, broadcaster) if shards else init_lobby_routes(engine, broadcaster)
 matchmaking_bp = init_matchmaking_routes(matcher)
 bots_bp = init_bots_routes(bot_manager)
-admin_bp = init_admin_routes(engine, analytics)
+admin_bp = init_admin_routes(engine, analytics, broadcaster, components['event_log'], components['snapshots'],
+                             components['persister'], shards)
 
 app.register_blueprint(lobby_bp, url_prefix='/api')
 app.register_blueprint(matchmaking_bp, url_prefix='/api')
@@ -68,7 +75,10 @@ app.register_blueprint(admin_bp, url_prefix='/api')
 print("✓ API blueprints registered")
 
 print("[7/7] Initializing WebSocket handlers...")
-init_websocket(socketio, engine, bot_manager)
+if shards:
+    init_sharded_websocket(socketio, shards, bot_manager, broadcaster)
+else:
+    init_websocket(socketio, engine, bot_manager, broadcaster)
 print("✓ WebSocket handlers ready")
 
 @app.route('/')
@@ -125,4 +135,5 @@ if __name__ == '__main__':
         socketio.run(app, host='0.0.0.0', port=5000, debug=False, log_output=False)
     except KeyboardInterrupt:
         print("\nShutting down...")
+        broadcaster.stop()
         bootstrap.stop_services()
\ No newline at end of file
@@ -4,13 +4,17 @@ import colorlog
 from logging.handlers import RotatingFileHandler
 from core.engine import LobbyEngine
 from matchmaking.matcher import Matcher
-from bots.bot_manager import BotManager
+from bots.bot_manager import BotManager, ShardedBotManager
 from services.presence import PresenceService
 from services.heartbeat import HeartbeatService
 from services.analytics import AnalyticsService
 from services.scheduler import SchedulerService
 from storage.base import StorageManager
 from storage.sqlite_store import SQLiteStore
+from storage.event_log import EventLog
+from storage.snapshots import SnapshotManager
+from storage.persister import WriteBehindPersister
+from core.sharding import ShardedEngine
 
 def setup_logger(name='joinly', level='INFO', log_file='joinly.log'):
     logger = logging.getLogger(name)
@@ -56,18 +60,52 @@ class JoinlyBootstrap:
         self.logger = setup_logger()
         self.config = self._load_config()
         
-        self.engine = LobbyEngine()
-        self.matcher = Matcher(self.engine)
-        self.bot_manager = BotManager(self.engine)
+        lobby_config = self.config['lobby'].get('lobby', {})
+        self.engine = LobbyEngine(lobby_config)
+        
+        sharding_config = lobby_config.get('sharding', {})
+        self.shards = None
+        if sharding_config.get('shards', 0) > 0:
+            self.shards = ShardedEngine(lobby_config, sharding_config, self.engine.event_bus, self.engine)
+            self.shards.start()
+        
+        matchmaking_config = self.config['matchmaking'].get('matchmaking', {})
+        self.matcher = Matcher(self.shards or self.engine, matchmaking_config)
+        for queue_id, queue_config in matchmaking_config.get('queues', {}).items():
+            self.matcher.create_queue(queue_id, queue_config)
+        self.bot_manager = ShardedBotManager(self.shards) if self.shards else BotManager(self.engine)
         
         self.presence_service = PresenceService(self.engine)
         self.heartbeat_service = HeartbeatService(self.engine)
-        self.analytics_service = AnalyticsService(self.engine)
+        self.analytics_service = AnalyticsService(self.engine, self.shards)
         self.scheduler_service = SchedulerService()
         
         storage_backend = SQLiteStore()
         self.storage_manager = StorageManager(storage_backend)
         
+        persistence_config = lobby_config.get('persistence', {})
+        self.persister = None
+        if persistence_config.get('enabled', False) and self.shards:
+            self.logger.warning("Persistence is not supported with sharding, lobby state will not be persisted")
+        elif persistence_config.get('enabled', False):
+            self.persister = WriteBehindPersister(self.engine, self.storage_manager, persistence_config)
+        
+        event_log_config = lobby_config.get('event_log', {})
+        self.event_log = None
+        if event_log_config.get('enabled', False):
+            self.event_log = EventLog(event_log_config)
+            self.event_log.open()
+            self.engine.event_bus.on('*', self.event_log.append)
+        
+        snapshot_config = lobby_config.get('snapshots', {})
+        self.snapshots = None
+        if snapshot_config.get('enabled', False) and self.shards:
+            self.logger.warning("Snapshots are not supported with sharding, lobby state will not be restored")
+        elif snapshot_config.get('enabled', False):
+            self.snapshots = SnapshotManager(self.engine, self.matcher, self.bot_manager, snapshot_config)
+            restored = self.snapshots.restore()
+            self.logger.info(f"Restored {restored['lobbies']} lobbies from snapshot {restored['sequence']}")
+        
         self.logger.info("Joinly framework initialized")
     
     def _load_config(self):
@@ -100,6 +138,10 @@ class JoinlyBootstrap:
         self.presence_service.start()
         self.matcher.start()
         self.scheduler_service.start()
+        if self.snapshots:
+            self.snapshots.start()
+        if self.persister:
+            self.persister.start()
         
         self.scheduler_service.add_job_minutes(5, self._periodic_cleanup)
         
@@ -112,6 +154,15 @@ class JoinlyBootstrap:
         self.presence_service.stop()
         self.matcher.stop()
         self.scheduler_service.stop()
+        if self.snapshots:
+            self.snapshots.stop()
+        if self.persister:
+            self.persister.stop()
+        if self.shards:
+            self.shards.stop()
+        self.engine.event_bus.stop()
+        if self.event_log:
+            self.event_log.close()
         self.storage_manager.close()
         
         self.logger.info("All services stopped")
@@ -131,5 +182,9 @@ class JoinlyBootstrap:
             'heartbeat': self.heartbeat_service,
             'analytics': self.analytics_service,
             'scheduler': self.scheduler_service,
-            'storage': self.storage_manager
+            'storage': self.storage_manager,
+            'event_log': self.event_log,
+            'shards': self.shards,
+            'snapshots': self.snapshots,
+            'persister': self.persister
         }
\ No newline at end of file
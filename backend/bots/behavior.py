@@ -1,5 +1,4 @@
 import random
-import time
 
 class BehaviorController:
     def __init__(self):
@@ -10,30 +9,21 @@ class BehaviorController:
             'random': self._random_behavior
         }
     
-    def execute_behavior(self, bot):
+    def get_ready_delay(self, bot) -> float:
         behavior_func = self.behaviors.get(bot.behavior, self._normal_behavior)
-        behavior_func(bot)
+        return behavior_func(bot)
     
-    def _normal_behavior(self, bot):
-        if not bot.ready and bot.auto_ready:
-            if time.time() - bot.joined_at > bot.ready_delay:
-                bot.ready = True
+    def _normal_behavior(self, bot) -> float:
+        return bot.ready_delay
     
-    def _aggressive_behavior(self, bot):
-        if not bot.ready and bot.auto_ready:
-            if time.time() - bot.joined_at > bot.ready_delay * 0.5:
-                bot.ready = True
+    def _aggressive_behavior(self, bot) -> float:
+        return bot.ready_delay * 0.5
     
-    def _passive_behavior(self, bot):
-        if not bot.ready and bot.auto_ready:
-            if time.time() - bot.joined_at > bot.ready_delay * 1.5:
-                bot.ready = True
+    def _passive_behavior(self, bot) -> float:
+        return bot.ready_delay * 1.5
     
-    def _random_behavior(self, bot):
-        if not bot.ready and bot.auto_ready:
-            delay = random.uniform(bot.ready_delay * 0.5, bot.ready_delay * 2.0)
-            if time.time() - bot.joined_at > delay:
-                bot.ready = True
+    def _random_behavior(self, bot) -> float:
+        return random.uniform(bot.ready_delay * 0.5, bot.ready_delay * 2.0)
     
     def add_behavior(self, name: str, behavior_func):
         self.behaviors[name] = behavior_func
@@ -1,3 +1,4 @@
+import itertools
 import uuid
 from typing import Dict, List, Optional
 from .bot_profiles import BotProfileLibrary
@@ -29,6 +30,7 @@ class BotManager:
     
     def add_bot_to_lobby(self, lobby_id: str, profile_name: str = 'default') -> Optional[Bot]:
         bot = self.create_bot(profile_name)
+        bot.ready_delay = self.behavior_controller.get_ready_delay(bot)
         
         if self.engine.add_bot_to_lobby(lobby_id, bot):
             return bot
@@ -66,9 +68,7 @@ class BotManager:
         return added_bots
     
     def update_all_bots(self):
-        for bot in self.active_bots.values():
-            bot.tick()
-            self.behavior_controller.execute_behavior(bot)
+        self.engine.process_timers()
     
     def get_bot_stats(self) -> dict:
         return {
@@ -85,4 +85,41 @@ class BotManager:
         return counts
     
     def _count_in_lobbies(self) -> int:
-        return sum(1 for bot in self.active_bots.values() if bot.lobby_id)
\ No newline at end of file
+        return sum(1 for bot in self.active_bots.values() if bot.lobby_id)
+
+class ShardedBotManager:
+    def __init__(self, shards):
+        self.shards = shards
+        self.profile_library = BotProfileLibrary()
+        self.sequence = itertools.count()
+    
+    def create_bot(self, profile_name: str = 'default') -> Bot:
+        shard = self.shards.shards[next(self.sequence) % self.shards.shard_count]
+        return shard.submit('create_bot', profile_name).result(self.shards.timeout)
+    
+    def create_bots(self, count: int, profile_name: str = 'default') -> List[Bot]:
+        return [self.create_bot(profile_name) for _ in range(count)]
+    
+    def add_bot_to_lobby(self, lobby_id: str, profile_name: str = 'default') -> Optional[Bot]:
+        return self.shards.call(lobby_id, 'add_bot_to_lobby', profile_name)
+    
+    def remove_bot(self, bot_id: str):
+        self.shards.broadcast('remove_bot', bot_id)
+    
+    def get_bot(self, bot_id: str) -> Optional[Bot]:
+        return next((bot for bot in self.shards.broadcast('get_bot', bot_id) if bot), None)
+    
+    def get_all_bots(self) -> List[Bot]:
+        return [bot for bots in self.shards.broadcast('get_all_bots') for bot in bots]
+    
+    def fill_lobby_with_bots(self, lobby_id: str, profile_name: str = 'default'):
+        return self.shards.call(lobby_id, 'fill_lobby_with_bots', profile_name)
+    
+    def get_bot_stats(self) -> dict:
+        stats = {'total_bots': 0, 'bots_by_behavior': {}, 'bots_in_lobbies': 0}
+        for shard_stats in self.shards.broadcast('get_bot_stats'):
+            stats['total_bots'] += shard_stats['total_bots']
+            stats['bots_in_lobbies'] += shard_stats['bots_in_lobbies']
+            for behavior, count in shard_stats['bots_by_behavior'].items():
+                stats['bots_by_behavior'][behavior] = stats['bots_by_behavior'].get(behavior, 0) + count
+        return stats
\ No newline at end of file
@@ -3,7 +3,13 @@ import random
 from typing import Optional
 
 class Bot:
+    __slots__ = (
+        'bot_id', 'username', 'profile', 'ready', 'team', 'lobby_id', 'skill_rating', 'behavior',
+        'auto_ready', 'ready_delay', 'joined_at', 'last_action', '_metadata'
+    )
+    
     def __init__(self, bot_id: str, profile: dict):
+        now = time.time()
         self.bot_id = bot_id
         self.username = profile.get('username', f'Bot_{bot_id[:4]}')
         self.profile = profile
@@ -14,30 +20,32 @@ class Bot:
         self.behavior = profile.get('behavior', 'normal')
         self.auto_ready = profile.get('auto_ready', True)
         self.ready_delay = profile.get('ready_delay', 2.0)
-        self.joined_at = time.time()
-        self.last_action = time.time()
-        self.metadata = profile.get('metadata', {})
+        self.joined_at = now
+        self.last_action = now
+        self._metadata = profile.get('metadata') or None
+    
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
     
-    def update(self):
-        if self.auto_ready and not self.ready:
-            if time.time() - self.joined_at > self.ready_delay:
-                self.ready = True
+    @metadata.setter
+    def metadata(self, metadata: dict):
+        self._metadata = metadata or None
     
     def set_team(self, team: int):
         self.team = team
     
-    def tick(self):
-        current_time = time.time()
-        
+    def get_ready_deadline(self) -> float:
+        return self.joined_at + self.ready_delay
+    
+    def get_action_interval(self) -> Optional[float]:
         if self.behavior == 'aggressive':
-            if current_time - self.last_action > 1.0:
-                self.last_action = current_time
-                
-        elif self.behavior == 'passive':
-            if current_time - self.last_action > 5.0:
-                self.last_action = current_time
-        
-        self.update()
+            return 1.0
+        if self.behavior == 'passive':
+            return 5.0
+        return None
     
     def to_dict(self) -> dict:
         return {
@@ -49,5 +57,5 @@ class Bot:
             'skill_rating': self.skill_rating,
             'behavior': self.behavior,
             'is_bot': True,
-            'metadata': self.metadata
+            'metadata': self._metadata or {}
         }
\ No newline at end of file
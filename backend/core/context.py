@@ -1,10 +1,13 @@
+import json
+import threading
 import time
-from typing import Dict, Optional
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
 from .player import Player
 from .bot import Bot
 
 class LobbyContext:
-    def __init__(self, lobby_id: str, config: dict, event_bus):
+    def __init__(self, lobby_id: str, config: dict, event_bus, lock=None):
         self.lobby_id = lobby_id
         self.config = config
         self.event_bus = event_bus
@@ -12,19 +15,96 @@ class LobbyContext:
         self.bots: Dict[str, Bot] = {}
         self.state = 'waiting'
         self.created_at = time.time()
+        self.last_activity = self.created_at
+        self.ready_since = None
         self.max_players = config.get('max_players', 10)
         self.max_bots = config.get('max_bots', 4)
         self.require_all_ready = config.get('require_all_ready', True)
-        self.metadata = {}
+        self.metadata = dict(config.get('metadata', {}))
+        self.skill_total = 0
+        self.ready_players: Set[str] = set()
+        self.ready_bots: Set[str] = set()
+        self.all_ready = False
+        self.version = 0
+        self._snapshot = None
+        self._snapshot_json = None
+        self._snapshot_version = -1
+        self.changes = deque(maxlen=config.get('delta_history', 256))
+        self.lock = lock or threading.RLock()
+    
+    def touch(self, change: dict = None):
+        self.version += 1
+        self.last_activity = time.time()
+        if change is None:
+            self.changes.clear()
+        else:
+            change['version'] = self.version
+            self.changes.append(change)
+    
+    def get_changes_since(self, version: int) -> Optional[List[dict]]:
+        with self.lock:
+            if version == self.version:
+                return []
+            if version > self.version or not self.changes:
+                return None
+            
+            first_version = self.changes[0]['version']
+            if version < first_version - 1:
+                return None
+            
+            return list(self.changes)[version - first_version + 1:]
+    
+    def get_update(self, since_version: int = None) -> Tuple[str, dict]:
+        changes = self.get_changes_since(since_version) if since_version is not None else None
+        if changes is None:
+            return 'lobby_state', self.to_dict()
+        return 'lobby_delta', {
+            'lobby_id': self.lobby_id,
+            'from_version': since_version,
+            'version': changes[-1]['version'] if changes else since_version,
+            'changes': changes
+        }
     
     def add_player(self, player: Player):
         if len(self.players) < self.max_players:
             self.players[player.player_id] = player
+            self.skill_total += player.skill_rating
             player.lobby_id = self.lobby_id
+            if player.ready:
+                self.ready_players.add(player.player_id)
+            self.touch({'op': 'player_added', 'player': player.to_dict()})
+            self.check_all_ready()
     
     def remove_player(self, player_id: str):
         if player_id in self.players:
+            self.skill_total -= self.players[player_id].skill_rating
             del self.players[player_id]
+            self.ready_players.discard(player_id)
+            self.touch({'op': 'player_removed', 'player_id': player_id})
+            self.check_all_ready()
+    
+    def restore(self, players: List[Player], bots: List[Bot], state: str, version: int):
+        for player in players:
+            self.players[player.player_id] = player
+            self.skill_total += player.skill_rating
+            player.lobby_id = self.lobby_id
+            if player.ready:
+                self.ready_players.add(player.player_id)
+        for bot in bots:
+            self.bots[bot.bot_id] = bot
+            bot.lobby_id = self.lobby_id
+            if bot.ready:
+                self.ready_bots.add(bot.bot_id)
+        
+        self.all_ready = (
+            bool(self.players)
+            and len(self.ready_players) == len(self.players)
+            and len(self.ready_bots) == len(self.bots)
+        )
+        self.state = state
+        if state == 'ready':
+            self.ready_since = time.time()
+        self.version = version
     
     def get_player(self, player_id: str) -> Optional[Player]:
         return self.players.get(player_id)
@@ -33,28 +113,82 @@ class LobbyContext:
         if len(self.bots) < self.max_bots:
             self.bots[bot.bot_id] = bot
             bot.lobby_id = self.lobby_id
+            if bot.ready:
+                self.ready_bots.add(bot.bot_id)
+            self.touch({'op': 'bot_added', 'bot': bot.to_dict()})
+            self.check_all_ready()
     
     def remove_bot(self, bot_id: str):
         if bot_id in self.bots:
             del self.bots[bot_id]
+            self.ready_bots.discard(bot_id)
+            self.touch({'op': 'bot_removed', 'bot_id': bot_id})
+            self.check_all_ready()
     
     def set_player_ready(self, player_id: str, ready: bool):
         if player_id in self.players:
             self.players[player_id].ready = ready
+            if ready:
+                self.ready_players.add(player_id)
+            else:
+                self.ready_players.discard(player_id)
+            self.touch({'op': 'player_updated', 'player_id': player_id, 'fields': {'ready': ready}})
+            self.check_all_ready()
+    
+    def set_player_connected(self, player_id: str, connected: bool):
+        player = self.players.get(player_id)
+        if player and player.connected != connected:
+            player.connected = connected
+            self.touch({'op': 'player_updated', 'player_id': player_id, 'fields': {'connected': connected}})
+    
+    def set_bot_ready(self, bot_id: str, ready: bool):
+        if bot_id in self.bots:
+            self.bots[bot_id].ready = ready
+            if ready:
+                self.ready_bots.add(bot_id)
+            else:
+                self.ready_bots.discard(bot_id)
+            self.touch({'op': 'bot_updated', 'bot_id': bot_id, 'fields': {'ready': ready}})
             self.check_all_ready()
     
+    def get_ready_counts(self) -> Dict[str, int]:
+        return {
+            'players_ready': len(self.ready_players),
+            'players_total': len(self.players),
+            'bots_ready': len(self.ready_bots),
+            'bots_total': len(self.bots)
+        }
+    
     def check_all_ready(self) -> bool:
-        if not self.players:
-            return False
+        all_ready = (
+            bool(self.players)
+            and len(self.ready_players) == len(self.players)
+            and len(self.ready_bots) == len(self.bots)
+        )
         
-        all_ready = all(p.ready for p in self.players.values())
+        if all_ready == self.all_ready:
+            return all_ready
+        self.all_ready = all_ready
         
-        if all_ready and self.require_all_ready:
-            self.state = 'ready'
+        if not self.require_all_ready:
+            return all_ready
+        
+        if all_ready:
+            if self.state != 'ready':
+                self.state = 'ready'
+                self.ready_since = time.time()
+                self.touch({'op': 'lobby_updated', 'fields': {'state': 'ready'}})
             self.event_bus.emit('lobby_all_ready', {'lobby_id': self.lobby_id})
-            return True
+        elif self.state == 'ready':
+            self.state = 'waiting'
+            self.ready_since = None
+            self.touch({'op': 'lobby_updated', 'fields': {'state': 'waiting'}})
         
-        return False
+        return all_ready
+    
+    def set_metadata(self, key: str, value):
+        self.metadata[key] = value
+        self.touch({'op': 'lobby_updated', 'fields': {'metadata': dict(self.metadata)}})
     
     def get_player_count(self) -> int:
         return len(self.players)
@@ -62,23 +196,53 @@ class LobbyContext:
     def get_bot_count(self) -> int:
         return len(self.bots)
     
+    def get_average_skill(self) -> float:
+        if not self.players:
+            return 0.0
+        return self.skill_total / len(self.players)
+    
     def is_full(self) -> bool:
         return len(self.players) >= self.max_players
     
-    def tick(self):
-        for bot in self.bots.values():
-            bot.update()
-    
     def to_dict(self) -> dict:
+        with self.lock:
+            if self._snapshot_version != self.version:
+                self._snapshot = self._build_dict()
+                self._snapshot_json = None
+                self._snapshot_version = self.version
+            return self._snapshot
+    
+    def to_json(self) -> bytes:
+        with self.lock:
+            snapshot = self.to_dict()
+            if self._snapshot_json is None:
+                self._snapshot_json = json.dumps(snapshot, separators=(',', ':')).encode('utf-8')
+            return self._snapshot_json
+    
+    def to_summary(self) -> dict:
         return {
             'lobby_id': self.lobby_id,
+            'version': self.version,
             'state': self.state,
             'player_count': self.get_player_count(),
             'bot_count': self.get_bot_count(),
+            'ready_count': len(self.ready_players) + len(self.ready_bots),
             'max_players': self.max_players,
             'max_bots': self.max_bots,
-            'players': [p.to_dict() for p in self.players.values()],
-            'bots': [b.to_dict() for b in self.bots.values()],
             'created_at': self.created_at,
             'metadata': self.metadata
-        }
\ No newline at end of file
+        }
+    
+    def project(self, fields: List[str]) -> dict:
+        with self.lock:
+            if 'players' in fields or 'bots' in fields:
+                source = self.to_dict()
+            else:
+                source = self.to_summary()
+            return {field: source[field] for field in fields if field in source}
+    
+    def _build_dict(self) -> dict:
+        lobby = self.to_summary()
+        lobby['players'] = [p.to_dict() for p in self.players.values()]
+        lobby['bots'] = [b.to_dict() for b in self.bots.values()]
+        return lobby
\ No newline at end of file
@@ -1,130 +1,479 @@
 import threading
 import time
-from typing import Dict, List, Optional
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Tuple
 from .context import LobbyContext
+from .lobby_index import LobbyIndex
 from .player import Player
 from .party import Party
 from .bot import Bot
 from .events import EventBus
 from .rules import RuleEngine
 from .permissions import PermissionManager
+from .timing_wheel import TimingWheel
+from .reaper import LobbyReaper
 
 class LobbyEngine:
-    def __init__(self):
+    def __init__(self, config: dict = None):
+        self.config = config or {}
         self.lobbies: Dict[str, LobbyContext] = {}
         self.players: Dict[str, Player] = {}
         self.parties: Dict[str, Party] = {}
+        self.player_parties: Dict[str, str] = {}
         self.bots: Dict[str, Bot] = {}
-        self.event_bus = EventBus()
+        self.event_bus = EventBus(self.config.get('events', {}))
         self.rule_engine = RuleEngine()
         self.permission_manager = PermissionManager()
+        self.lobby_index = LobbyIndex()
         self.lock = threading.RLock()
         
+        engine_config = self.config.get('engine', {})
+        self.concurrency = engine_config.get('concurrency', 'global')
+        self.striped = self.concurrency == 'striped'
+        stripe_count = max(1, engine_config.get('lock_stripes', 16)) if self.striped else 0
+        self.stripe_locks = [threading.RLock() for _ in range(stripe_count)]
+        self.timers = TimingWheel(engine_config.get('timer_tick', 0.1))
+        self.reaper = LobbyReaper(self, self.config.get('timeouts', {}))
+    
+    def _new_lobby_lock(self):
+        if self.striped:
+            return threading.RLock()
+        return self.lock
+    
+    def _stripe(self, key: str):
+        if not self.striped:
+            return self.lock
+        return self.stripe_locks[hash(key) % len(self.stripe_locks)]
+    
+    def _is_live(self, lobby: LobbyContext) -> bool:
+        return self.lobbies.get(lobby.lobby_id) is lobby
+    
     def create_lobby(self, lobby_id: str, config: dict) -> LobbyContext:
         with self.lock:
-            lobby = LobbyContext(lobby_id, config, self.event_bus)
+            lobby = LobbyContext(lobby_id, config, self.event_bus, self._new_lobby_lock())
             self.lobbies[lobby_id] = lobby
+            self.lobby_index.update(lobby)
+            self.reaper.track(lobby)
             self.event_bus.emit('lobby_created', {'lobby_id': lobby_id})
             return lobby
     
     def get_lobby(self, lobby_id: str) -> Optional[LobbyContext]:
         return self.lobbies.get(lobby_id)
     
-    def delete_lobby(self, lobby_id: str):
+    def delete_lobby(self, lobby_id: str, expected_version: int = None) -> bool:
         with self.lock:
-            if lobby_id in self.lobbies:
-                lobby = self.lobbies[lobby_id]
-                for player_id in list(lobby.players.keys()):
-                    self.remove_player_from_lobby(lobby_id, player_id)
+            lobby = self.lobbies.get(lobby_id)
+            if not lobby:
+                return False
+            with lobby.lock:
+                if expected_version is not None and lobby.version != expected_version:
+                    return False
+                self.remove_players(lobby_id, list(lobby.players.keys()))
                 del self.lobbies[lobby_id]
-                self.event_bus.emit('lobby_deleted', {'lobby_id': lobby_id})
+                self.lobby_index.remove(lobby_id)
+            self.event_bus.emit('lobby_deleted', {'lobby_id': lobby_id})
+            return True
     
     def add_player_to_lobby(self, lobby_id: str, player: Player) -> bool:
-        with self.lock:
-            lobby = self.get_lobby(lobby_id)
-            if not lobby:
+        lobby = self.get_lobby(lobby_id)
+        if not lobby:
+            return False
+        
+        with lobby.lock:
+            if not self._is_live(lobby):
                 return False
             
             if not self.rule_engine.can_join(lobby, player):
                 return False
             
             lobby.add_player(player)
-            self.players[player.player_id] = player
+            self.lobby_index.update(lobby)
+            with self._stripe(player.player_id):
+                self.players[player.player_id] = player
             self.event_bus.emit('player_joined', {
                 'lobby_id': lobby_id,
                 'player_id': player.player_id
             })
             return True
     
-    def remove_player_from_lobby(self, lobby_id: str, player_id: str):
+    def restore_lobby(self, lobby_id: str, config: dict, players: List[Player], bots: List[Bot],
+                      state: str = 'waiting', version: int = 0, created_at: float = None,
+                      metadata: dict = None) -> LobbyContext:
+        lobby = LobbyContext(lobby_id, config, self.event_bus, self._new_lobby_lock())
+        if created_at is not None:
+            lobby.created_at = created_at
+        if metadata is not None:
+            lobby.metadata = metadata
+        lobby.restore(players, bots, state, version)
+        
         with self.lock:
-            lobby = self.get_lobby(lobby_id)
-            if lobby and player_id in lobby.players:
+            self.lobbies[lobby_id] = lobby
+        self.lobby_index.update(lobby)
+        self._register_players(players)
+        for bot in bots:
+            with self._stripe(bot.bot_id):
+                self.bots[bot.bot_id] = bot
+            self._schedule_bot(bot)
+        self.reaper.track(lobby)
+        return lobby
+    
+    def restore_party(self, party: Party):
+        with self.lock:
+            self.parties[party.party_id] = party
+            for player_id in party.members:
+                self.player_parties[player_id] = party.party_id
+    
+    def add_players_to_lobby(self, lobby_id: str, players: List[Player]) -> bool:
+        lobby = self.get_lobby(lobby_id)
+        if not lobby or not players:
+            return False
+        
+        player_ids = [player.player_id for player in players]
+        if len(set(player_ids)) != len(player_ids):
+            return False
+        
+        with lobby.lock:
+            if not self._seat_players(lobby, players):
+                return False
+            
+            self.event_bus.emit('players_joined', {
+                'lobby_id': lobby_id,
+                'player_ids': player_ids
+            })
+            return True
+    
+    def _seat_players(self, lobby: LobbyContext, players: List[Player]) -> bool:
+        if not self._is_live(lobby):
+            return False
+        
+        if lobby.get_player_count() + len(players) > lobby.max_players:
+            return False
+        
+        if not all(self.rule_engine.can_join_many(lobby, players)):
+            return False
+        
+        for player in players:
+            lobby.add_player(player)
+        self.lobby_index.update(lobby)
+        self._register_players(players)
+        return True
+    
+    def _group_by_stripe(self, keys: List[str]) -> Dict[object, List[str]]:
+        groups: Dict[object, List[str]] = {}
+        for key in keys:
+            groups.setdefault(self._stripe(key), []).append(key)
+        return groups
+    
+    def _register_players(self, players: List[Player]):
+        by_id = {player.player_id: player for player in players}
+        for stripe, player_ids in self._group_by_stripe(list(by_id)).items():
+            with stripe:
+                for player_id in player_ids:
+                    self.players[player_id] = by_id[player_id]
+    
+    def _unregister_players(self, player_ids: List[str]):
+        for stripe, stripe_ids in self._group_by_stripe(player_ids).items():
+            with stripe:
+                for player_id in stripe_ids:
+                    self.players.pop(player_id, None)
+    
+    def quick_join(self, player: Player) -> Optional[LobbyContext]:
+        for lobby_id in self.lobby_index.find_candidates(player.skill_rating):
+            if self.add_player_to_lobby(lobby_id, player):
+                return self.get_lobby(lobby_id)
+        return None
+    
+    def remove_player_from_lobby(self, lobby_id: str, player_id: str):
+        lobby = self.get_lobby(lobby_id)
+        if not lobby:
+            return
+        
+        with lobby.lock:
+            if player_id in lobby.players:
                 lobby.remove_player(player_id)
-                if player_id in self.players:
-                    del self.players[player_id]
+                self.lobby_index.update(lobby)
+                with self._stripe(player_id):
+                    if player_id in self.players:
+                        del self.players[player_id]
+                self._release_parties(lobby, [player_id])
                 self.event_bus.emit('player_left', {
                     'lobby_id': lobby_id,
                     'player_id': player_id
                 })
     
+    def remove_players(self, lobby_id: str, player_ids: List[str]) -> List[str]:
+        lobby = self.get_lobby(lobby_id)
+        if not lobby:
+            return []
+        
+        with lobby.lock:
+            removed = [player_id for player_id in dict.fromkeys(player_ids) if player_id in lobby.players]
+            if not removed:
+                return []
+            
+            for player_id in removed:
+                lobby.remove_player(player_id)
+            self.lobby_index.update(lobby)
+            self._unregister_players(removed)
+            self._release_parties(lobby, removed)
+            self.event_bus.emit('players_left', {
+                'lobby_id': lobby_id,
+                'player_ids': removed
+            })
+            return removed
+    
     def set_player_ready(self, lobby_id: str, player_id: str, ready: bool):
-        with self.lock:
-            lobby = self.get_lobby(lobby_id)
-            if lobby and player_id in lobby.players:
+        lobby = self.get_lobby(lobby_id)
+        if not lobby:
+            return
+        
+        with lobby.lock:
+            if player_id in lobby.players:
                 lobby.set_player_ready(player_id, ready)
+                self.lobby_index.update(lobby)
                 self.event_bus.emit('player_ready_changed', {
                     'lobby_id': lobby_id,
                     'player_id': player_id,
                     'ready': ready
                 })
     
+    def set_player_connected(self, player_id: str, connected: bool):
+        player = self.players.get(player_id)
+        if not player:
+            return
+        
+        lobby = self.get_lobby(player.lobby_id) if player.lobby_id else None
+        if not lobby:
+            player.connected = connected
+            return
+        
+        with lobby.lock:
+            if player_id in lobby.players:
+                lobby.set_player_connected(player_id, connected)
+            else:
+                player.connected = connected
+    
+    def set_ready_many(self, lobby_id: str, player_ids: List[str], ready: bool) -> List[str]:
+        lobby = self.get_lobby(lobby_id)
+        if not lobby:
+            return []
+        
+        with lobby.lock:
+            updated = [player_id for player_id in dict.fromkeys(player_ids) if player_id in lobby.players]
+            if not updated:
+                return []
+            
+            for player_id in updated:
+                lobby.set_player_ready(player_id, ready)
+            self.lobby_index.update(lobby)
+            self.event_bus.emit('players_ready_changed', {
+                'lobby_id': lobby_id,
+                'player_ids': updated,
+                'ready': ready
+            })
+            return updated
+    
     def add_bot_to_lobby(self, lobby_id: str, bot: Bot) -> bool:
-        with self.lock:
-            lobby = self.get_lobby(lobby_id)
-            if not lobby:
+        lobby = self.get_lobby(lobby_id)
+        if not lobby:
+            return False
+        
+        with lobby.lock:
+            if not self._is_live(lobby):
                 return False
             
             lobby.add_bot(bot)
-            self.bots[bot.bot_id] = bot
+            self.lobby_index.update(lobby)
+            with self._stripe(bot.bot_id):
+                self.bots[bot.bot_id] = bot
+            self._schedule_bot(bot)
             self.event_bus.emit('bot_joined', {
                 'lobby_id': lobby_id,
                 'bot_id': bot.bot_id
             })
             return True
     
+    def _schedule_bot(self, bot: Bot):
+        if bot.auto_ready and not bot.ready:
+            self.timers.schedule(bot.get_ready_deadline(), ('bot_ready', bot))
+        
+        interval = bot.get_action_interval()
+        if interval is not None:
+            self.timers.schedule(bot.last_action + interval, ('bot_action', bot))
+    
     def remove_bot_from_lobby(self, lobby_id: str, bot_id: str):
-        with self.lock:
-            lobby = self.get_lobby(lobby_id)
-            if lobby and bot_id in lobby.bots:
+        lobby = self.get_lobby(lobby_id)
+        if not lobby:
+            return
+        
+        with lobby.lock:
+            if bot_id in lobby.bots:
                 lobby.remove_bot(bot_id)
-                if bot_id in self.bots:
-                    del self.bots[bot_id]
+                self.lobby_index.update(lobby)
+                with self._stripe(bot_id):
+                    if bot_id in self.bots:
+                        del self.bots[bot_id]
                 self.event_bus.emit('bot_left', {
                     'lobby_id': lobby_id,
                     'bot_id': bot_id
                 })
     
-    def create_party(self, party_id: str, leader_id: str) -> Party:
+    def set_lobby_metadata(self, lobby_id: str, key: str, value):
+        lobby = self.get_lobby(lobby_id)
+        if not lobby:
+            return
+        
+        with lobby.lock:
+            lobby.set_metadata(key, value)
+            self.lobby_index.update(lobby)
+    
+    def create_party(self, party_id: str, leader_id: str) -> Optional[Party]:
         with self.lock:
+            if party_id in self.parties:
+                return None
+            
+            self.leave_party(leader_id)
             party = Party(party_id, leader_id)
             self.parties[party_id] = party
+            self.player_parties[leader_id] = party_id
+            self.event_bus.emit('party_created', {'party_id': party_id, 'leader_id': leader_id})
             return party
     
-    def get_all_lobbies(self) -> List[dict]:
+    def get_party(self, party_id: str) -> Optional[Party]:
+        return self.parties.get(party_id)
+    
+    def get_player_party(self, player_id: str) -> Optional[Party]:
+        party_id = self.player_parties.get(player_id)
+        return self.parties.get(party_id) if party_id else None
+    
+    def add_party_member(self, party_id: str, player_id: str) -> bool:
+        with self.lock:
+            party = self.parties.get(party_id)
+            if not party or player_id in self.player_parties or party.lobby_id:
+                return False
+            
+            if not party.add_member(player_id):
+                return False
+            self.player_parties[player_id] = party_id
+            self.event_bus.emit('party_member_added', {'party_id': party_id, 'player_id': player_id})
+            return True
+    
+    def leave_party(self, player_id: str):
+        with self.lock:
+            party_id = self.player_parties.pop(player_id, None)
+            party = self.parties.get(party_id) if party_id else None
+            if not party:
+                return
+            
+            party.remove_member(player_id)
+            if not party.members:
+                del self.parties[party_id]
+            self.event_bus.emit('party_member_left', {'party_id': party_id, 'player_id': player_id})
+    
+    def join_party_to_lobby(self, party_id: str, lobby_id: str, players: List[Player] = None) -> bool:
+        lobby = self.get_lobby(lobby_id)
+        if not lobby:
+            return False
+        
         with self.lock:
-            return [lobby.to_dict() for lobby in self.lobbies.values()]
+            party = self.parties.get(party_id)
+            if not party or party.lobby_id:
+                return False
+            
+            profiles = {player.player_id: player for player in players or ()}
+            if any(player_id not in party.members for player_id in profiles):
+                return False
+            
+            member_ids = party.get_member_ids()
+            if any(player_id in self.players for player_id in member_ids):
+                return False
+            
+            members = [profiles.get(player_id) or Player(player_id, player_id) for player_id in member_ids]
+            
+            with lobby.lock:
+                for player in members:
+                    player.party_id = party_id
+                if not self._seat_players(lobby, members):
+                    for player in members:
+                        player.party_id = None
+                    return False
+                
+                party.lobby_id = lobby_id
+                self.event_bus.emit('party_joined', {
+                    'lobby_id': lobby_id,
+                    'party_id': party_id,
+                    'player_ids': member_ids
+                })
+                return True
+    
+    def _release_parties(self, lobby: LobbyContext, player_ids: List[str]):
+        for party_id in {self.player_parties.get(player_id) for player_id in player_ids}:
+            party = self.parties.get(party_id) if party_id else None
+            if party and party.lobby_id == lobby.lobby_id and not any(m in lobby.players for m in party.members):
+                party.lobby_id = None
+    
+    def get_all_lobbies(self) -> List[dict]:
+        if not self.striped:
+            with self.lock:
+                return [lobby.to_dict() for lobby in self.lobbies.values()]
+        
+        lobbies = []
+        for lobby in list(self.lobbies.values()):
+            with lobby.lock:
+                lobbies.append(lobby.to_dict())
+        return lobbies
+    
+    def query_lobbies(self, state: str = None, min_free_slots: int = None, has_bots: bool = None,
+                      tags: dict = None, cursor: int = 0, limit: int = None) -> Tuple[List[LobbyContext], Optional[int]]:
+        lobby_ids, next_cursor = self.lobby_index.query(
+            state=state,
+            min_free_slots=min_free_slots,
+            has_bots=has_bots,
+            tags=tags,
+            cursor=cursor,
+            limit=limit
+        )
+        lobbies = [self.lobbies[lobby_id] for lobby_id in lobby_ids if lobby_id in self.lobbies]
+        return lobbies, next_cursor
     
     def get_player(self, player_id: str) -> Optional[Player]:
         return self.players.get(player_id)
     
     def get_all_players(self) -> List[Player]:
-        with self.lock:
+        if not self.striped:
+            with self.lock:
+                return list(self.players.values())
+        
+        with ExitStack() as stack:
+            for stripe in self.stripe_locks:
+                stack.enter_context(stripe)
             return list(self.players.values())
     
+    def process_timers(self, now: float = None) -> int:
+        now = now if now is not None else time.time()
+        due = self.timers.advance(now)
+        
+        for kind, bot in due:
+            lobby = self.get_lobby(bot.lobby_id) if bot.lobby_id else None
+            if not lobby:
+                continue
+            
+            with lobby.lock:
+                if lobby.bots.get(bot.bot_id) is not bot:
+                    continue
+                
+                if kind == 'bot_ready':
+                    if not bot.ready:
+                        lobby.set_bot_ready(bot.bot_id, True)
+                        self.lobby_index.update(lobby)
+                elif kind == 'bot_action':
+                    interval = bot.get_action_interval()
+                    bot.last_action = now
+                    if interval is not None:
+                        self.timers.schedule(now + interval, ('bot_action', bot))
+        
+        return len(due)
+    
     def tick(self):
-        with self.lock:
-            for lobby in self.lobbies.values():
-                lobby.tick()
-            for bot in self.bots.values():
-                bot.tick()
\ No newline at end of file
+        self.process_timers()
+        self.reaper.reap()
\ No newline at end of file
@@ -1,47 +1,234 @@
+import queue
+import re
 import threading
-from typing import Dict, List, Callable
+from collections import deque
+from typing import Dict, List, Callable, Pattern, Set, Tuple
 import time
 
+def event_topic(event_name: str, data: dict) -> str:
+    lobby_id = data.get('lobby_id')
+    if lobby_id is None:
+        return event_name
+    return f'lobby.{lobby_id}.{event_name}'
+
+def compile_topic(pattern: str) -> Pattern:
+    parts = []
+    for segment in pattern.split('.'):
+        if segment == '*':
+            parts.append(r'(?:[^.]+\.)*')
+        else:
+            parts.append(re.escape(segment) + r'\.')
+    return re.compile(''.join(parts))
+
 class EventBus:
-    def __init__(self):
-        self.listeners: Dict[str, List[Callable]] = {}
-        self.event_history: List[dict] = []
-        self.max_history = 1000
+    def __init__(self, config: dict = None):
+        config = config or {}
+        self.listeners: List[Tuple[str, Callable]] = []
+        self.inline_listeners: Set[Callable] = set()
+        self.exact_routes: Dict[str, List[Tuple[int, Callable]]] = {}
+        self.event_routes: Dict[str, List[Tuple[int, Callable]]] = {}
+        self.lobby_routes: Dict[str, List[Tuple[int, Pattern, Callable]]] = {}
+        self.wildcard_routes: List[Tuple[int, Pattern, Callable]] = []
+        self.route_cache: Dict[str, List[Callable]] = {}
+        self.route_cache_size = config.get('route_cache_size', 10000)
+        self.max_history = config.get('max_history', 1000)
+        self.event_history = deque(maxlen=self.max_history)
         self.lock = threading.Lock()
+        
+        self.async_dispatch = config.get('async_dispatch', False)
+        self.worker_count = max(1, config.get('workers', 2))
+        self.queue_size = config.get('queue_size', 10000)
+        self.queues: List[queue.Queue] = []
+        self.workers: List[threading.Thread] = []
+        self.running = False
+        
+        self.emitted = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.listener_errors = 0
+        
+        if self.async_dispatch:
+            self.start()
+    
+    def start(self):
+        if self.running:
+            return
+        
+        self.running = True
+        self.queues = [queue.Queue(maxsize=self.queue_size) for _ in range(self.worker_count)]
+        self.workers = [
+            threading.Thread(target=self._worker_loop, args=(q,), daemon=True)
+            for q in self.queues
+        ]
+        for worker in self.workers:
+            worker.start()
+    
+    def stop(self):
+        if not self.running:
+            return
+        
+        self.running = False
+        for q in self.queues:
+            q.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+        self.workers = []
+    
+    def flush(self):
+        for q in self.queues:
+            q.join()
     
-    def on(self, event_name: str, callback: Callable):
+    def on(self, pattern: str, callback: Callable, inline: bool = False):
         with self.lock:
-            if event_name not in self.listeners:
-                self.listeners[event_name] = []
-            self.listeners[event_name].append(callback)
+            self.listeners.append((pattern, callback))
+            if inline:
+                self.inline_listeners.add(callback)
+            self._rebuild_routes()
     
-    def off(self, event_name: str, callback: Callable):
+    def off(self, pattern: str, callback: Callable):
         with self.lock:
-            if event_name in self.listeners:
-                self.listeners[event_name].remove(callback)
+            if (pattern, callback) in self.listeners:
+                self.listeners.remove((pattern, callback))
+                if not any(registered is callback for _, registered in self.listeners):
+                    self.inline_listeners.discard(callback)
+                self._rebuild_routes()
+    
+    def _rebuild_routes(self):
+        self.exact_routes = {}
+        self.event_routes = {}
+        self.lobby_routes = {}
+        self.wildcard_routes = []
+        self.route_cache = {}
+        
+        for order, (pattern, callback) in enumerate(self.listeners):
+            segments = pattern.split('.')
+            
+            if len(segments) == 1 and pattern != '*':
+                self.event_routes.setdefault(pattern, []).append((order, callback))
+            elif '*' not in segments:
+                self.exact_routes.setdefault(pattern, []).append((order, callback))
+            elif len(segments) == 2 and segments[0] == '*' and segments[1] != '*':
+                self.event_routes.setdefault(segments[1], []).append((order, callback))
+            elif len(segments) > 2 and segments[0] == 'lobby' and segments[1] != '*':
+                self.lobby_routes.setdefault(segments[1], []).append((order, compile_topic(pattern), callback))
+            else:
+                self.wildcard_routes.append((order, compile_topic(pattern), callback))
+    
+    def _resolve(self, topic: str, event_name: str) -> List[Callable]:
+        callbacks = self.route_cache.get(topic)
+        if callbacks is not None:
+            return callbacks
+        
+        segments = topic.split('.')
+        target = topic + '.'
+        matched = list(self.exact_routes.get(topic, ()))
+        matched.extend(self.event_routes.get(event_name, ()))
+        
+        if len(segments) > 2 and segments[0] == 'lobby':
+            for order, regex, callback in self.lobby_routes.get(segments[1], ()):
+                if regex.fullmatch(target):
+                    matched.append((order, callback))
+        
+        for order, regex, callback in self.wildcard_routes:
+            if regex.fullmatch(target):
+                matched.append((order, callback))
+        
+        matched.sort(key=lambda route: route[0])
+        callbacks = [callback for _, callback in matched]
+        
+        if len(self.route_cache) >= self.route_cache_size:
+            self.route_cache.clear()
+        self.route_cache[topic] = callbacks
+        return callbacks
     
     def emit(self, event_name: str, data: dict = None):
+        data = data or {}
         event_data = {
             'event': event_name,
-            'data': data or {},
+            'topic': event_topic(event_name, data),
+            'data': data,
             'timestamp': time.time()
         }
         
         with self.lock:
             self.event_history.append(event_data)
-            if len(self.event_history) > self.max_history:
-                self.event_history.pop(0)
-            
-            if event_name in self.listeners:
-                for callback in self.listeners[event_name]:
-                    try:
-                        callback(event_data)
-                    except Exception as e:
-                        print(f"Error in event listener: {e}")
+            self.emitted += 1
+            callbacks = self._resolve(event_data['topic'], event_name)
+        
+        if not callbacks:
+            return
+        
+        if not self.running:
+            self._dispatch(event_data, callbacks)
+            return
+        
+        if self.inline_listeners:
+            inline = [callback for callback in callbacks if callback in self.inline_listeners]
+            if inline:
+                errors = self._invoke(event_data, inline)
+                callbacks = [callback for callback in callbacks if callback not in self.inline_listeners]
+                if not callbacks:
+                    with self.lock:
+                        self.delivered += 1
+                        self.listener_errors += errors
+                    return
+                if errors:
+                    with self.lock:
+                        self.listener_errors += errors
+        
+        q = self.queues[hash(event_data['data'].get('lobby_id', event_name)) % len(self.queues)]
+        try:
+            q.put_nowait((event_data, callbacks))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+    
+    def _invoke(self, event_data: dict, callbacks: List[Callable]) -> int:
+        errors = 0
+        for callback in callbacks:
+            try:
+                callback(event_data)
+            except Exception as e:
+                errors += 1
+                print(f"Error in event listener: {e}")
+        return errors
+    
+    def _dispatch(self, event_data: dict, callbacks: List[Callable]):
+        errors = self._invoke(event_data, callbacks)
+        
+        with self.lock:
+            self.delivered += 1
+            self.listener_errors += errors
+    
+    def _worker_loop(self, q: queue.Queue):
+        while True:
+            item = q.get()
+            try:
+                if item is None:
+                    return
+                self._dispatch(*item)
+            finally:
+                q.task_done()
+    
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'async_dispatch': self.running,
+                'workers': len(self.workers),
+                'queue_depth': sum(q.qsize() for q in self.queues),
+                'queue_capacity': self.queue_size * len(self.queues),
+                'emitted': self.emitted,
+                'delivered': self.delivered,
+                'dropped': self.dropped,
+                'listener_errors': self.listener_errors,
+                'history_size': len(self.event_history),
+                'subscriptions': len(self.listeners),
+                'cached_routes': len(self.route_cache)
+            }
     
     def get_history(self, limit: int = 100) -> List[dict]:
         with self.lock:
-            return self.event_history[-limit:]
+            return list(self.event_history)[-limit:]
     
     def clear_history(self):
         with self.lock:
@@ -0,0 +1,185 @@
+import bisect
+import itertools
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+JOINABLE_STATES = ('waiting', 'open')
+
+def lobby_tags(metadata: dict) -> frozenset:
+    return frozenset(
+        (key, str(value)) for key, value in metadata.items()
+        if isinstance(value, (str, int, float, bool))
+    )
+
+class LobbyIndex:
+    def __init__(self, max_candidates: int = 16):
+        self.max_candidates = max_candidates
+        self.entries: List[Tuple[float, str]] = []
+        self.keys: Dict[str, Tuple[float, str]] = {}
+        self.empty_lobbies: Dict[str, None] = {}
+        
+        self.sequence = itertools.count(1)
+        self.order_seqs: List[int] = []
+        self.order_ids: List[str] = []
+        self.seqs: Dict[str, int] = {}
+        self.states: Dict[str, str] = {}
+        self.by_state: Dict[str, Set[str]] = {}
+        self.free_slots: Dict[str, int] = {}
+        self.with_bots: Set[str] = set()
+        self.tags: Dict[str, frozenset] = {}
+        self.by_tag: Dict[Tuple[str, str], Set[str]] = {}
+        self.lock = threading.Lock()
+    
+    def update(self, lobby):
+        lobby_id = lobby.lobby_id
+        joinable = lobby.state in JOINABLE_STATES and not lobby.is_full()
+        empty = joinable and lobby.get_player_count() == 0
+        key = (lobby.get_average_skill(), lobby_id) if joinable and not empty else None
+        tags = lobby_tags(lobby.metadata)
+        
+        with self.lock:
+            old_key = self.keys.get(lobby_id)
+            if old_key != key:
+                if old_key is not None:
+                    self._remove_entry(old_key)
+                    del self.keys[lobby_id]
+                if key is not None:
+                    bisect.insort(self.entries, key)
+                    self.keys[lobby_id] = key
+            
+            if empty:
+                self.empty_lobbies[lobby_id] = None
+            else:
+                self.empty_lobbies.pop(lobby_id, None)
+            
+            if lobby_id not in self.seqs:
+                seq = next(self.sequence)
+                self.seqs[lobby_id] = seq
+                self.order_seqs.append(seq)
+                self.order_ids.append(lobby_id)
+            
+            old_state = self.states.get(lobby_id)
+            if old_state != lobby.state:
+                if old_state is not None:
+                    self.by_state[old_state].discard(lobby_id)
+                self.by_state.setdefault(lobby.state, set()).add(lobby_id)
+                self.states[lobby_id] = lobby.state
+            
+            self.free_slots[lobby_id] = lobby.max_players - lobby.get_player_count()
+            
+            if lobby.get_bot_count():
+                self.with_bots.add(lobby_id)
+            else:
+                self.with_bots.discard(lobby_id)
+            
+            old_tags = self.tags.get(lobby_id, frozenset())
+            if old_tags != tags:
+                for tag in old_tags - tags:
+                    self.by_tag[tag].discard(lobby_id)
+                for tag in tags - old_tags:
+                    self.by_tag.setdefault(tag, set()).add(lobby_id)
+                self.tags[lobby_id] = tags
+    
+    def remove(self, lobby_id: str):
+        with self.lock:
+            old_key = self.keys.pop(lobby_id, None)
+            if old_key is not None:
+                self._remove_entry(old_key)
+            self.empty_lobbies.pop(lobby_id, None)
+            
+            seq = self.seqs.pop(lobby_id, None)
+            if seq is not None:
+                index = bisect.bisect_left(self.order_seqs, seq)
+                del self.order_seqs[index]
+                del self.order_ids[index]
+            
+            state = self.states.pop(lobby_id, None)
+            if state is not None:
+                self.by_state[state].discard(lobby_id)
+            
+            self.free_slots.pop(lobby_id, None)
+            self.with_bots.discard(lobby_id)
+            
+            for tag in self.tags.pop(lobby_id, frozenset()):
+                self.by_tag[tag].discard(lobby_id)
+    
+    def _remove_entry(self, key: Tuple[float, str]):
+        index = bisect.bisect_left(self.entries, key)
+        if index < len(self.entries) and self.entries[index] == key:
+            del self.entries[index]
+    
+    def find_candidates(self, skill_rating: float, limit: Optional[int] = None) -> List[str]:
+        limit = limit or self.max_candidates
+        
+        with self.lock:
+            candidates = []
+            right = bisect.bisect_left(self.entries, (skill_rating, ''))
+            left = right - 1
+            
+            while len(candidates) < limit and (left >= 0 or right < len(self.entries)):
+                if right >= len(self.entries):
+                    take_left = True
+                elif left < 0:
+                    take_left = False
+                else:
+                    take_left = skill_rating - self.entries[left][0] <= self.entries[right][0] - skill_rating
+                
+                if take_left:
+                    candidates.append(self.entries[left][1])
+                    left -= 1
+                else:
+                    candidates.append(self.entries[right][1])
+                    right += 1
+            
+            for lobby_id in self.empty_lobbies:
+                if len(candidates) >= limit:
+                    break
+                candidates.append(lobby_id)
+            
+            return candidates
+    
+    def query(self, state: str = None, min_free_slots: int = None, has_bots: bool = None,
+              tags: dict = None, cursor: int = 0, limit: int = None) -> Tuple[List[str], Optional[int]]:
+        with self.lock:
+            filters = []
+            if state is not None:
+                filters.append(self.by_state.get(state, set()))
+            if has_bots:
+                filters.append(self.with_bots)
+            for key, value in (tags or {}).items():
+                filters.append(self.by_tag.get((key, str(value)), set()))
+            filters.sort(key=len)
+            
+            def matches(lobby_id: str) -> bool:
+                if has_bots is False and lobby_id in self.with_bots:
+                    return False
+                if min_free_slots is not None and self.free_slots[lobby_id] < min_free_slots:
+                    return False
+                return all(lobby_id in f for f in filters)
+            
+            start = bisect.bisect_right(self.order_seqs, cursor or 0)
+            remaining = len(self.order_seqs) - start
+            
+            if filters and len(filters[0]) * 8 < remaining:
+                candidates = sorted(
+                    (self.seqs[lobby_id], lobby_id) for lobby_id in filters[0]
+                    if self.seqs[lobby_id] > (cursor or 0)
+                )
+            else:
+                candidates = (
+                    (self.order_seqs[i], self.order_ids[i]) for i in range(start, len(self.order_seqs))
+                )
+            
+            results = []
+            last_seq = None
+            for seq, lobby_id in candidates:
+                if limit is not None and len(results) >= limit:
+                    return results, last_seq
+                if matches(lobby_id):
+                    results.append(lobby_id)
+                    last_seq = seq
+            
+            return results, None
+    
+    def get_joinable_count(self) -> int:
+        return len(self.entries) + len(self.empty_lobbies)
\ No newline at end of file
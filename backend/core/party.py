@@ -2,30 +2,23 @@ import time
 from typing import Dict, List
 
 class Party:
+    __slots__ = ('party_id', 'leader_id', 'members', 'created_at', 'max_members', 'lobby_id')
+    
     def __init__(self, party_id: str, leader_id: str):
+        now = time.time()
         self.party_id = party_id
         self.leader_id = leader_id
-        self.members: Dict[str, dict] = {}
-        self.created_at = time.time()
+        self.members: Dict[str, float] = {leader_id: now}
+        self.created_at = now
         self.max_members = 5
         self.lobby_id = None
-        
-        self.members[leader_id] = {
-            'player_id': leader_id,
-            'joined_at': time.time(),
-            'role': 'leader'
-        }
     
     def add_member(self, player_id: str) -> bool:
         if len(self.members) >= self.max_members:
             return False
         
         if player_id not in self.members:
-            self.members[player_id] = {
-                'player_id': player_id,
-                'joined_at': time.time(),
-                'role': 'member'
-            }
+            self.members[player_id] = time.time()
             return True
         return False
     
@@ -34,9 +27,7 @@ class Party:
             del self.members[player_id]
             
             if player_id == self.leader_id and self.members:
-                new_leader = list(self.members.keys())[0]
-                self.leader_id = new_leader
-                self.members[new_leader]['role'] = 'leader'
+                self.leader_id = next(iter(self.members))
     
     def is_leader(self, player_id: str) -> bool:
         return player_id == self.leader_id
@@ -51,7 +42,14 @@ class Party:
         return {
             'party_id': self.party_id,
             'leader_id': self.leader_id,
-            'members': list(self.members.values()),
+            'members': [
+                {
+                    'player_id': player_id,
+                    'joined_at': joined_at,
+                    'role': 'leader' if player_id == self.leader_id else 'member'
+                }
+                for player_id, joined_at in self.members.items()
+            ],
             'member_count': self.get_member_count(),
             'max_members': self.max_members,
             'lobby_id': self.lobby_id,
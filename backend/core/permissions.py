@@ -1,4 +1,4 @@
-from typing import Set, Dict
+from typing import Dict, Iterable, List, Set
 
 class Permission:
     ADMIN = 'admin'
@@ -10,48 +10,166 @@ class Permission:
     START_MATCH = 'start_match'
     VIEW_ANALYTICS = 'view_analytics'
 
+class Role:
+    __slots__ = ('name', 'parents', 'own_mask', 'mask')
+    
+    def __init__(self, name: str, own_mask: int, parents: List['Role']):
+        self.name = name
+        self.parents = parents
+        self.own_mask = own_mask
+        self.mask = 0
+        self.resolve()
+    
+    def resolve(self):
+        mask = self.own_mask
+        for parent in self.parents:
+            mask |= parent.mask
+        self.mask = mask
+
+class PlayerAccess:
+    __slots__ = ('role', 'allow', 'deny', 'mask')
+    
+    def __init__(self, role: Role = None):
+        self.role = role
+        self.allow = 0
+        self.deny = 0
+        self.refresh()
+    
+    def refresh(self):
+        role_mask = self.role.mask if self.role else 0
+        self.mask = (role_mask | self.allow) & ~self.deny
+
 class PermissionManager:
     def __init__(self):
-        self.player_permissions: Dict[str, Set[str]] = {}
-        self.role_permissions: Dict[str, Set[str]] = {
-            'admin': {
-                Permission.ADMIN,
-                Permission.KICK_PLAYER,
-                Permission.BAN_PLAYER,
-                Permission.MODIFY_LOBBY,
-                Permission.ADD_BOT,
-                Permission.REMOVE_BOT,
-                Permission.START_MATCH,
-                Permission.VIEW_ANALYTICS
-            },
-            'moderator': {
-                Permission.KICK_PLAYER,
-                Permission.ADD_BOT,
-                Permission.REMOVE_BOT
-            },
-            'player': set()
-        }
+        self.bits: Dict[str, int] = {}
+        self.roles: Dict[str, Role] = {}
+        self.role_access: Dict[str, PlayerAccess] = {}
+        self.players: Dict[str, PlayerAccess] = {}
+        
+        for name in (Permission.ADMIN, Permission.KICK_PLAYER, Permission.BAN_PLAYER, Permission.MODIFY_LOBBY,
+                     Permission.ADD_BOT, Permission.REMOVE_BOT, Permission.START_MATCH, Permission.VIEW_ANALYTICS):
+            self.intern(name)
+        
+        self.define_role('player', set())
+        self.define_role('moderator', {
+            Permission.KICK_PLAYER,
+            Permission.ADD_BOT,
+            Permission.REMOVE_BOT
+        }, inherits=['player'])
+        self.define_role('admin', {
+            Permission.ADMIN,
+            Permission.BAN_PLAYER,
+            Permission.MODIFY_LOBBY,
+            Permission.START_MATCH,
+            Permission.VIEW_ANALYTICS
+        }, inherits=['moderator'])
+    
+    def intern(self, permission: str) -> int:
+        bit = self.bits.get(permission)
+        if bit is None:
+            bit = self.bits[permission] = 1 << len(self.bits)
+        return bit
+    
+    def to_mask(self, permissions: Iterable[str]) -> int:
+        mask = 0
+        for permission in permissions:
+            mask |= self.intern(permission)
+        return mask
+    
+    def to_names(self, mask: int) -> Set[str]:
+        return {name for name, bit in self.bits.items() if mask & bit}
+    
+    def define_role(self, name: str, permissions: Iterable[str], inherits: Iterable[str] = ()) -> Role:
+        parents = []
+        for parent_name in inherits:
+            parent = self.roles.get(parent_name)
+            if parent is None:
+                raise ValueError(f"Unknown parent role: {parent_name}")
+            if parent_name == name or self._inherits_from(parent, name):
+                raise ValueError(f"Role {name} cannot inherit from itself")
+            parents.append(parent)
+        
+        own_mask = self.to_mask(permissions)
+        role = self.roles.get(name)
+        if role is None:
+            role = self.roles[name] = Role(name, own_mask, parents)
+            self.role_access[name] = PlayerAccess(role)
+            return role
+        
+        role.own_mask = own_mask
+        role.parents = parents
+        self._propagate(role)
+        return role
+    
+    def _inherits_from(self, role: Role, name: str) -> bool:
+        return any(parent.name == name or self._inherits_from(parent, name) for parent in role.parents)
+    
+    def _propagate(self, changed: Role):
+        changed.resolve()
+        affected = {changed.name}
+        for role in self.roles.values():
+            if self._inherits_from(role, changed.name):
+                role.resolve()
+                affected.add(role.name)
+        
+        for name in affected:
+            self.role_access[name].refresh()
+        for access in self.players.values():
+            if access.role is not None and access.role.name in affected:
+                access.refresh()
+    
+    def get_role(self, player_id: str) -> str:
+        access = self.players.get(player_id)
+        if access is None or access.role is None:
+            return None
+        return access.role.name
+    
+    def _private_access(self, player_id: str) -> PlayerAccess:
+        access = self.players.get(player_id)
+        if access is None:
+            access = self.players[player_id] = PlayerAccess()
+        elif access.role is not None and access is self.role_access[access.role.name]:
+            access = self.players[player_id] = PlayerAccess(access.role)
+        return access
     
     def grant_permission(self, player_id: str, permission: str):
-        if player_id not in self.player_permissions:
-            self.player_permissions[player_id] = set()
-        self.player_permissions[player_id].add(permission)
+        bit = self.intern(permission)
+        access = self._private_access(player_id)
+        access.allow |= bit
+        access.deny &= ~bit
+        access.refresh()
     
     def revoke_permission(self, player_id: str, permission: str):
-        if player_id in self.player_permissions:
-            self.player_permissions[player_id].discard(permission)
+        if player_id not in self.players:
+            return
+        bit = self.intern(permission)
+        access = self._private_access(player_id)
+        access.allow &= ~bit
+        if access.role and access.role.mask & bit:
+            access.deny |= bit
+        if access.role is not None and not access.allow | access.deny:
+            self.players[player_id] = self.role_access[access.role.name]
+            return
+        access.refresh()
     
     def has_permission(self, player_id: str, permission: str) -> bool:
-        if player_id in self.player_permissions:
-            return permission in self.player_permissions[player_id]
-        return False
+        access = self.players.get(player_id)
+        if access is None:
+            return False
+        return bool(access.mask & self.bits.get(permission, 0))
     
     def assign_role(self, player_id: str, role: str):
-        if role in self.role_permissions:
-            self.player_permissions[player_id] = self.role_permissions[role].copy()
+        if role in self.role_access:
+            self.players[player_id] = self.role_access[role]
+    
+    def remove_player(self, player_id: str):
+        self.players.pop(player_id, None)
     
     def get_permissions(self, player_id: str) -> Set[str]:
-        return self.player_permissions.get(player_id, set())
+        access = self.players.get(player_id)
+        if access is None:
+            return set()
+        return self.to_names(access.mask)
     
     def is_admin(self, player_id: str) -> bool:
         return self.has_permission(player_id, Permission.ADMIN)
\ No newline at end of file
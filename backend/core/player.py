@@ -1,8 +1,14 @@
 import time
-from typing import Optional
+from typing import Optional, Set
 
 class Player:
+    __slots__ = (
+        'player_id', 'username', 'ready', 'team', 'lobby_id', 'party_id', 'connected',
+        'last_heartbeat', 'skill_rating', 'joined_at', '_metadata', '_permissions'
+    )
+    
     def __init__(self, player_id: str, username: str, metadata: dict = None):
+        now = time.time()
         self.player_id = player_id
         self.username = username
         self.ready = False
@@ -10,11 +16,31 @@ class Player:
         self.lobby_id: Optional[str] = None
         self.party_id: Optional[str] = None
         self.connected = True
-        self.last_heartbeat = time.time()
-        self.metadata = metadata or {}
+        self.last_heartbeat = now
+        self._metadata = metadata or None
         self.skill_rating = metadata.get('skill_rating', 1000) if metadata else 1000
-        self.joined_at = time.time()
-        self.permissions = set()
+        self.joined_at = now
+        self._permissions = None
+    
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, metadata: dict):
+        self._metadata = metadata or None
+    
+    @property
+    def permissions(self) -> Set[str]:
+        if self._permissions is None:
+            self._permissions = set()
+        return self._permissions
+    
+    @permissions.setter
+    def permissions(self, permissions: Set[str]):
+        self._permissions = permissions or None
     
     def set_ready(self, ready: bool):
         self.ready = ready
@@ -40,5 +66,5 @@ class Player:
             'connected': self.connected,
             'skill_rating': self.skill_rating,
             'joined_at': self.joined_at,
-            'metadata': self.metadata
+            'metadata': self._metadata or {}
         }
\ No newline at end of file
@@ -0,0 +1,124 @@
+import heapq
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from .context import LobbyContext
+
+class LobbyReaper:
+    def __init__(self, engine, config: dict = None):
+        config = config or {}
+        self.engine = engine
+        self.idle_timeout = config.get('idle_timeout', 300)
+        self.join_timeout = config.get('join_timeout', 60)
+        self.ready_timeout = config.get('ready_timeout', 120)
+        self.heap: List[Tuple[float, str]] = []
+        self.scheduled: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        
+        self.deleted = 0
+        self.downgraded = 0
+        self.rescheduled = 0
+        self.stale = 0
+        
+        for event_name in ('player_left', 'players_left', 'lobby_all_ready'):
+            engine.event_bus.on(f'lobby.*.{event_name}', self._on_event)
+    
+    def deadline_for(self, lobby: LobbyContext) -> Tuple[float, str]:
+        if not lobby.players:
+            return lobby.last_activity + self.join_timeout, 'delete'
+        if lobby.ready_since is not None:
+            return lobby.ready_since + self.ready_timeout, 'downgrade'
+        return lobby.last_activity + self.idle_timeout, 'delete'
+    
+    def track(self, lobby: LobbyContext):
+        deadline, _ = self.deadline_for(lobby)
+        with self.lock:
+            scheduled = self.scheduled.get(lobby.lobby_id)
+            if scheduled is not None and scheduled <= deadline:
+                return
+            self.scheduled[lobby.lobby_id] = deadline
+            heapq.heappush(self.heap, (deadline, lobby.lobby_id))
+    
+    def _on_event(self, event_data: dict):
+        lobby = self.engine.get_lobby(event_data['data']['lobby_id'])
+        if lobby:
+            self.track(lobby)
+    
+    def _pop_due(self, now: float) -> List[LobbyContext]:
+        due = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                deadline, lobby_id = heapq.heappop(self.heap)
+                if self.scheduled.get(lobby_id) != deadline:
+                    self.stale += 1
+                    continue
+                
+                lobby = self.engine.get_lobby(lobby_id)
+                if not lobby:
+                    del self.scheduled[lobby_id]
+                    continue
+                
+                actual, _ = self.deadline_for(lobby)
+                if actual > now:
+                    self.scheduled[lobby_id] = actual
+                    heapq.heappush(self.heap, (actual, lobby_id))
+                    self.rescheduled += 1
+                    continue
+                
+                del self.scheduled[lobby_id]
+                due.append(lobby)
+        return due
+    
+    def reap(self, now: float = None) -> int:
+        now = now if now is not None else time.time()
+        due = self._pop_due(now)
+        if not due:
+            return 0
+        
+        deleted = []
+        downgraded = []
+        for lobby in due:
+            with lobby.lock:
+                if not self.engine._is_live(lobby):
+                    continue
+                version = lobby.version
+                deadline, action = self.deadline_for(lobby)
+                if deadline > now:
+                    action = None
+                elif action == 'downgrade':
+                    self.engine.set_ready_many(lobby.lobby_id, list(lobby.ready_players), False)
+                    downgraded.append(lobby.lobby_id)
+            
+            if action == 'delete' and self.engine.delete_lobby(lobby.lobby_id, version):
+                deleted.append(lobby.lobby_id)
+            elif self.engine._is_live(lobby):
+                self.track(lobby)
+        
+        with self.lock:
+            self.deleted += len(deleted)
+            self.downgraded += len(downgraded)
+        
+        if deleted or downgraded:
+            self.engine.event_bus.emit('lobbies_reaped', {
+                'deleted': deleted,
+                'downgraded': downgraded
+            })
+        return len(deleted) + len(downgraded)
+    
+    def get_next_deadline(self) -> Optional[float]:
+        with self.lock:
+            return self.heap[0][0] if self.heap else None
+    
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'idle_timeout': self.idle_timeout,
+                'join_timeout': self.join_timeout,
+                'ready_timeout': self.ready_timeout,
+                'tracked': len(self.scheduled),
+                'heap_size': len(self.heap),
+                'deleted': self.deleted,
+                'downgraded': self.downgraded,
+                'rescheduled': self.rescheduled,
+                'stale': self.stale
+            }
\ No newline at end of file
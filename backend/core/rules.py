@@ -1,49 +1,211 @@
-from typing import List, Callable
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
 from .context import LobbyContext
 from .player import Player
 
 class Rule:
-    def __init__(self, name: str, check: Callable):
+    def __init__(self, name: str, check: Callable, lobby_only: bool = False):
         self.name = name
         self.check = check
+        self.lobby_only = lobby_only
+        self.rejections = 0
+        self.errors = 0
+        self.calls = 0
+        self.sampled_rejections = 0
+        self.total_time = 0.0
+    
+    def get_average_cost(self) -> float:
+        if not self.calls:
+            return 1e-6
+        return self.total_time / self.calls
+    
+    def get_rejection_rate(self) -> float:
+        if not self.calls:
+            return 0.0
+        return self.sampled_rejections / self.calls
+    
+    def get_order_key(self) -> float:
+        return self.get_average_cost() / max(self.get_rejection_rate(), 1e-6)
+    
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'lobby_only': self.lobby_only,
+            'rejections': self.rejections,
+            'errors': self.errors,
+            'sampled_calls': self.calls,
+            'rejection_rate': self.get_rejection_rate(),
+            'avg_cost_us': self.get_average_cost() * 1e6 if self.calls else None
+        }
 
 class RuleEngine:
-    def __init__(self):
+    def __init__(self, sample_every: int = 64, reorder_every: int = 4096):
         self.rules: List[Rule] = []
+        self.sample_every = sample_every
+        self.reorder_every = reorder_every
+        self.lobby_plan: List[Rule] = []
+        self.player_plan: List[Rule] = []
+        self.join_plan: List[Rule] = []
+        self.lobby_check: Callable = None
+        self.player_check: Callable = None
+        self.join_check: Callable = None
+        self.evaluations = 0
+        self.lock = threading.Lock()
+        self.action_rules: Dict[str, Callable] = {
+            'start_match': lambda ctx: all(p.ready for p in ctx.get('players', [])),
+            'add_bot': lambda ctx: ctx.get('bot_count', 0) < ctx.get('max_bots', 4),
+            'kick_player': lambda ctx: ctx.get('has_permission', False)
+        }
         self.setup_default_rules()
     
     def setup_default_rules(self):
-        self.add_rule('lobby_not_full', lambda lobby, player: not lobby.is_full())
+        self.add_rule('lobby_not_full', lambda lobby: not lobby.is_full(), lobby_only=True)
         self.add_rule('player_not_in_lobby', lambda lobby, player: player.player_id not in lobby.players)
-        self.add_rule('lobby_accepting', lambda lobby, player: lobby.state in ['waiting', 'open'])
+        self.add_rule('lobby_accepting', lambda lobby: lobby.state in ('waiting', 'open'), lobby_only=True)
     
-    def add_rule(self, name: str, check: Callable):
-        self.rules.append(Rule(name, check))
+    def add_rule(self, name: str, check: Callable, lobby_only: bool = False):
+        with self.lock:
+            self.rules.append(Rule(name, check, lobby_only))
+            self._compile()
     
     def remove_rule(self, name: str):
-        self.rules = [r for r in self.rules if r.name != name]
+        with self.lock:
+            self.rules = [r for r in self.rules if r.name != name]
+            self._compile()
     
-    def can_join(self, lobby: LobbyContext, player: Player) -> bool:
-        for rule in self.rules:
-            try:
-                if not rule.check(lobby, player):
+    def add_action_rule(self, action_name: str, check: Callable):
+        self.action_rules[action_name] = check
+    
+    def _compile(self):
+        ordered = sorted(self.rules, key=Rule.get_order_key)
+        if self.join_check is not None and ordered == self.lobby_plan + self.player_plan:
+            return
+        
+        self.lobby_plan = [rule for rule in ordered if rule.lobby_only]
+        self.player_plan = [rule for rule in ordered if not rule.lobby_only]
+        self.join_plan = self.lobby_plan + self.player_plan
+        self.lobby_check = self._build_check(self.lobby_plan, 'lobby')
+        self.player_check = self._build_check(self.player_plan, 'lobby, player')
+        self.join_check = self._build_check(self.join_plan, 'lobby, player')
+    
+    def _build_check(self, plan: List[Rule], params: str) -> Callable:
+        namespace = {}
+        lines = [f'def check({params}):']
+        for index, rule in enumerate(plan):
+            namespace[f'rule_{index}'] = rule.check
+            args = 'lobby' if rule.lobby_only else 'lobby, player'
+            lines.append(f'    if not rule_{index}({args}):')
+            lines.append(f'        return {index}')
+        lines.append('    return -1')
+        exec('\n'.join(lines), namespace)
+        return namespace['check']
+    
+    def _sample(self, count: int = 1) -> bool:
+        self.evaluations += count
+        if self.evaluations % self.sample_every >= count:
+            return False
+        self._maybe_reorder(count)
+        return True
+    
+    def _maybe_reorder(self, count: int = 1):
+        if self.evaluations % self.reorder_every < count:
+            with self.lock:
+                self._compile()
+    
+    def _run_timed(self, plan: List[Rule], args: tuple, timed: bool = True) -> bool:
+        rule = None
+        try:
+            for rule in plan:
+                check_args = args[:1] if rule.lobby_only else args
+                if not timed:
+                    passed = rule.check(*check_args)
+                else:
+                    rule.calls += 1
+                    start = time.perf_counter()
+                    passed = rule.check(*check_args)
+                    rule.total_time += time.perf_counter() - start
+                    if not passed:
+                        rule.sampled_rejections += 1
+                if not passed:
+                    rule.rejections += 1
                     return False
-            except Exception as e:
-                print(f"Rule {rule.name} failed: {e}")
-                return False
+        except Exception as e:
+            rule.errors += 1
+            rule.rejections += 1
+            print(f"Rule {rule.name} failed: {e}")
+            return False
         return True
     
-    def validate_action(self, action_name: str, context: dict) -> bool:
-        action_rules = {
-            'start_match': lambda ctx: all(p.ready for p in ctx.get('players', [])),
-            'add_bot': lambda ctx: ctx.get('bot_count', 0) < ctx.get('max_bots', 4),
-            'kick_player': lambda ctx: ctx.get('has_permission', False)
-        }
+    def can_lobby_accept(self, lobby: LobbyContext) -> bool:
+        if self._sample():
+            return self._run_timed(self.lobby_plan, (lobby,))
+        
+        plan = self.lobby_plan
+        try:
+            rejected = self.lobby_check(lobby)
+        except Exception:
+            return self._run_timed(plan, (lobby,), timed=False)
         
-        if action_name in action_rules:
+        if rejected < 0:
+            return True
+        plan[rejected].rejections += 1
+        return False
+    
+    def can_join(self, lobby: LobbyContext, player: Player) -> bool:
+        self.evaluations += 1
+        if not self.evaluations % self.sample_every:
+            self._maybe_reorder()
+            return self._run_timed(self.join_plan, (lobby, player))
+        
+        plan = self.join_plan
+        try:
+            rejected = self.join_check(lobby, player)
+        except Exception:
+            return self._run_timed(plan, (lobby, player), timed=False)
+        
+        if rejected < 0:
+            return True
+        plan[rejected].rejections += 1
+        return False
+    
+    def can_join_many(self, lobby: LobbyContext, players: List[Player]) -> List[bool]:
+        if not self.can_lobby_accept(lobby):
+            return [False] * len(players)
+        
+        plan = self.player_plan
+        check = self.player_check
+        results = []
+        for player in players:
             try:
-                return action_rules[action_name](context)
-            except:
-                return False
+                rejected = check(lobby, player)
+            except Exception:
+                results.append(self._run_timed(plan, (lobby, player), timed=False))
+                continue
+            
+            if rejected >= 0:
+                plan[rejected].rejections += 1
+            results.append(rejected < 0)
         
-        return True
\ No newline at end of file
+        if players and self._sample(len(players)):
+            self._run_timed(plan, (lobby, players[-1]))
+        return results
+    
+    def validate_action(self, action_name: str, context: dict) -> bool:
+        check = self.action_rules.get(action_name)
+        if check is None:
+            return True
+        
+        try:
+            return check(context)
+        except:
+            return False
+    
+    def get_stats(self) -> dict:
+        with self.lock:
+            plan = self.join_plan
+            return {
+                'evaluations': self.evaluations,
+                'sample_every': self.sample_every,
+                'rules': [dict(rule.to_dict(), position=index) for index, rule in enumerate(plan)]
+            }
\ No newline at end of file
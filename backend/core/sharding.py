@@ -0,0 +1,479 @@
+import bisect
+import itertools
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import zlib
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, List, Optional, Tuple
+from .events import EventBus
+from .party import Party
+from .player import Player
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class HashRing:
+    def __init__(self, nodes: List[int], replicas: int = 64):
+        self.replicas = replicas
+        self.points: List[Tuple[int, int]] = sorted(
+            (zlib.crc32(f'{node}:{replica}'.encode('utf-8')), node)
+            for node in nodes
+            for replica in range(replicas)
+        )
+        self.keys = [point for point, _ in self.points]
+    
+    def get_node(self, key: str) -> int:
+        index = bisect.bisect(self.keys, zlib.crc32(key.encode('utf-8'))) % len(self.keys)
+        return self.points[index][1]
+    
+    def get_nodes(self, key: str) -> List[int]:
+        start = bisect.bisect(self.keys, zlib.crc32(key.encode('utf-8')))
+        nodes = []
+        for offset in range(len(self.points)):
+            node = self.points[(start + offset) % len(self.points)][1]
+            if node not in nodes:
+                nodes.append(node)
+        return nodes
+
+class ShardClient:
+    def __init__(self, shard_id: int, process: subprocess.Popen, conn, on_event: Callable):
+        self.shard_id = shard_id
+        self.process = process
+        self.conn = conn
+        self.on_event = on_event
+        self.pending: Dict[int, Future] = {}
+        self.ids = itertools.count()
+        self.send_lock = threading.Lock()
+        self.requests = 0
+        self.events = 0
+        self.receiver = threading.Thread(target=self._receive_loop, daemon=True)
+        self.receiver.start()
+    
+    def submit(self, method: str, *args) -> Future:
+        future = Future()
+        with self.send_lock:
+            request_id = next(self.ids)
+            self.pending[request_id] = future
+            self.requests += 1
+            try:
+                self.conn.send((request_id, method, args))
+            except (OSError, ValueError) as e:
+                self.pending.pop(request_id, None)
+                future.set_exception(e)
+        return future
+    
+    def _receive_loop(self):
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                break
+            
+            if message[0] == 'event':
+                self._deliver(message[1], message[2])
+                continue
+            
+            _, request_id, ok, result, events = message
+            for event_name, data in events:
+                self._deliver(event_name, data)
+            
+            future = self.pending.pop(request_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(f"Shard {self.shard_id}: {result}"))
+        
+        for future in list(self.pending.values()):
+            future.set_exception(RuntimeError(f"Shard {self.shard_id} disconnected"))
+        self.pending.clear()
+    
+    def _deliver(self, event_name: str, data: dict):
+        self.events += 1
+        try:
+            self.on_event(event_name, data)
+        except Exception as e:
+            print(f"Shard {self.shard_id} event error in {event_name}: {e}")
+    
+    def close(self, timeout: float = 5.0):
+        with self.send_lock:
+            try:
+                self.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.receiver.join(timeout=timeout)
+        self.conn.close()
+
+class ShardedEngine:
+    def __init__(self, config: dict = None, sharding_config: dict = None, event_bus: EventBus = None,
+                 parties=None):
+        self.config = dict(config or {})
+        self.config.pop('sharding', None)
+        sharding_config = sharding_config or {}
+        self.shard_count = max(1, sharding_config.get('shards', 2))
+        self.replicas = sharding_config.get('virtual_nodes', 64)
+        self.timeout = sharding_config.get('timeout', 5.0)
+        self.forward_events = sharding_config.get('forward_events', True)
+        self.event_bus = event_bus or EventBus(self.config.get('events', {}))
+        self.ring = HashRing(list(range(self.shard_count)), self.replicas)
+        self.shards: List[ShardClient] = []
+        self.player_shards: Dict[str, int] = {}
+        self.parties = parties
+        self.running = False
+    
+    def start(self):
+        if self.running:
+            return
+        
+        authkey = secrets.token_bytes(32)
+        listener = Listener(family='AF_UNIX', authkey=authkey)
+        env = dict(os.environ, JOINLY_SHARD_AUTHKEY=authkey.hex())
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get('PYTHONPATH')]))
+        
+        worker_config = dict(self.config, events=dict(self.config.get('events', {}), async_dispatch=False))
+        processes = {
+            shard_id: subprocess.Popen(
+                [sys.executable, '-m', 'core.sharding', listener.address, str(shard_id)],
+                cwd=BACKEND_DIR,
+                env=env
+            )
+            for shard_id in range(self.shard_count)
+        }
+        
+        connections = {}
+        try:
+            while len(connections) < self.shard_count:
+                conn = listener.accept()
+                shard_id = conn.recv()
+                conn.send((worker_config, self.forward_events))
+                connections[shard_id] = conn
+        finally:
+            listener.close()
+        
+        self.shards = [
+            ShardClient(shard_id, processes[shard_id], connections[shard_id], self._on_shard_event)
+            for shard_id in range(self.shard_count)
+        ]
+        self.running = True
+    
+    def stop(self):
+        if not self.running:
+            return
+        
+        self.running = False
+        for shard in self.shards:
+            shard.close()
+        self.shards = []
+    
+    def _on_shard_event(self, event_name: str, data: dict):
+        if event_name in ('player_joined', 'player_left'):
+            player_ids = [data['player_id']]
+        else:
+            player_ids = data.get('player_ids', ())
+        
+        if event_name in ('player_joined', 'players_joined', 'party_joined'):
+            shard_id = self.ring.get_node(data['lobby_id'])
+            for player_id in player_ids:
+                self.player_shards[player_id] = shard_id
+        elif event_name in ('player_left', 'players_left'):
+            for player_id in player_ids:
+                self.player_shards.pop(player_id, None)
+            self._release_parties(data['lobby_id'], player_ids)
+        
+        self.event_bus.emit(event_name, data)
+    
+    def _release_parties(self, lobby_id: str, player_ids: List[str]):
+        if self.parties is None:
+            return
+        
+        with self.parties.lock:
+            for party_id in {self.parties.player_parties.get(player_id) for player_id in player_ids}:
+                party = self.parties.get_party(party_id) if party_id else None
+                if party and party.lobby_id == lobby_id and not any(m in self.player_shards for m in party.members):
+                    party.lobby_id = None
+    
+    def shard_for(self, lobby_id: str) -> ShardClient:
+        return self.shards[self.ring.get_node(lobby_id)]
+    
+    def submit(self, lobby_id: str, method: str, *args) -> Future:
+        return self.shard_for(lobby_id).submit(method, lobby_id, *args)
+    
+    def call(self, lobby_id: str, method: str, *args):
+        return self.submit(lobby_id, method, *args).result(self.timeout)
+    
+    def broadcast(self, method: str, *args) -> List:
+        futures = [shard.submit(method, *args) for shard in self.shards]
+        return [future.result(self.timeout) for future in futures]
+    
+    def create_lobby(self, lobby_id: str, config: dict) -> dict:
+        return self.call(lobby_id, 'create_lobby', config)
+    
+    def delete_lobby(self, lobby_id: str, expected_version: int = None) -> bool:
+        return self.call(lobby_id, 'delete_lobby', expected_version)
+    
+    def get_lobby(self, lobby_id: str) -> Optional[dict]:
+        return self.call(lobby_id, 'get_lobby')
+    
+    def get_lobby_update(self, lobby_id: str, since_version: int = None) -> Optional[Tuple[str, dict]]:
+        return self.call(lobby_id, 'get_lobby_update', since_version)
+    
+    def call_with_update(self, lobby_id: str, method: str, *args) -> Tuple[object, Optional[Tuple[str, dict]]]:
+        return self.call(lobby_id, 'with_update', method, *args)
+    
+    def get_all_lobbies(self) -> List[dict]:
+        return [lobby for lobbies in self.broadcast('get_all_lobbies') for lobby in lobbies]
+    
+    def decode_cursor(self, cursor: str = None) -> List[Optional[int]]:
+        if not cursor:
+            return [0] * self.shard_count
+        
+        positions = str(cursor).split('.')
+        if len(positions) != self.shard_count:
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return [None if position == '-' else int(position) for position in positions]
+    
+    def encode_cursor(self, positions: List[Optional[int]]) -> Optional[str]:
+        if all(position is None for position in positions):
+            return None
+        return '.'.join('-' if position is None else str(position) for position in positions)
+    
+    def query_lobbies(self, state: str = None, min_free_slots: int = None, has_bots: bool = None,
+                      tags: dict = None, cursor: str = None, limit: int = None,
+                      fields: List[str] = None) -> Tuple[List[dict], Optional[str]]:
+        positions = self.decode_cursor(cursor)
+        futures = [
+            (shard_id, self.shards[shard_id].submit('query_lobbies', state, min_free_slots, has_bots, tags,
+                                                    position, limit, fields))
+            for shard_id, position in enumerate(positions)
+            if position is not None
+        ]
+        
+        lobbies = []
+        for shard_id, future in futures:
+            shard_lobbies, seqs, next_cursor = future.result(self.timeout)
+            taken = shard_lobbies if limit is None else shard_lobbies[:max(0, limit - len(lobbies))]
+            lobbies.extend(taken)
+            if len(taken) == len(shard_lobbies):
+                positions[shard_id] = next_cursor
+            elif taken:
+                positions[shard_id] = seqs[len(taken) - 1]
+        return lobbies, self.encode_cursor(positions)
+    
+    def add_player_to_lobby(self, lobby_id: str, player: Player) -> bool:
+        return self.call(lobby_id, 'add_player_to_lobby', player)
+    
+    def add_players_to_lobby(self, lobby_id: str, players: List[Player]) -> bool:
+        return self.call(lobby_id, 'add_players_to_lobby', players)
+    
+    def remove_player_from_lobby(self, lobby_id: str, player_id: str):
+        return self.call(lobby_id, 'remove_player_from_lobby', player_id)
+    
+    def remove_players(self, lobby_id: str, player_ids: List[str]) -> List[str]:
+        return self.call(lobby_id, 'remove_players', player_ids)
+    
+    def set_player_ready(self, lobby_id: str, player_id: str, ready: bool):
+        return self.call(lobby_id, 'set_player_ready', player_id, ready)
+    
+    def set_ready_many(self, lobby_id: str, player_ids: List[str], ready: bool) -> List[str]:
+        return self.call(lobby_id, 'set_ready_many', player_ids, ready)
+    
+    def quick_join(self, player: Player) -> Optional[dict]:
+        for shard_id in self.ring.get_nodes(player.player_id):
+            lobby = self.shards[shard_id].submit('quick_join', player).result(self.timeout)
+            if lobby:
+                return lobby
+        return None
+    
+    def get_player(self, player_id: str) -> Optional[dict]:
+        shard_id = self.player_shards.get(player_id)
+        if shard_id is None:
+            return None
+        return self.shards[shard_id].submit('get_player', player_id).result(self.timeout)
+    
+    def get_all_players(self) -> List[dict]:
+        return [player for players in self.broadcast('get_all_players') for player in players]
+    
+    def create_party(self, party_id: str, leader_id: str) -> Optional[Party]:
+        return self.parties.create_party(party_id, leader_id)
+    
+    def get_party(self, party_id: str) -> Optional[Party]:
+        return self.parties.get_party(party_id)
+    
+    def get_player_party(self, player_id: str) -> Optional[Party]:
+        return self.parties.get_player_party(player_id)
+    
+    def add_party_member(self, party_id: str, player_id: str) -> bool:
+        return self.parties.add_party_member(party_id, player_id)
+    
+    def leave_party(self, player_id: str):
+        self.parties.leave_party(player_id)
+    
+    def join_party_to_lobby(self, party_id: str, lobby_id: str, players: List[Player] = None) -> bool:
+        with self.parties.lock:
+            party = self.parties.get_party(party_id)
+            if not party or party.lobby_id:
+                return False
+            
+            profiles = {player.player_id: player for player in players or ()}
+            if any(player_id not in party.members for player_id in profiles):
+                return False
+            
+            member_ids = party.get_member_ids()
+            if any(player_id in self.player_shards for player_id in member_ids):
+                return False
+            party.lobby_id = lobby_id
+        
+        members = [profiles.get(player_id) or Player(player_id, player_id) for player_id in member_ids]
+        for player in members:
+            player.party_id = party_id
+        
+        seated = False
+        try:
+            seated = self.add_players_to_lobby(lobby_id, members)
+        finally:
+            if not seated:
+                party.lobby_id = None
+        if not seated:
+            return False
+        
+        self.event_bus.emit('party_joined', {
+            'lobby_id': lobby_id,
+            'party_id': party_id,
+            'player_ids': member_ids
+        })
+        return True
+    
+    def get_stats(self) -> dict:
+        shard_stats = self.broadcast('get_stats')
+        return {
+            'shards': self.shard_count,
+            'virtual_nodes': self.replicas,
+            'lobbies': sum(stats['lobbies'] for stats in shard_stats),
+            'players': sum(stats['players'] for stats in shard_stats),
+            'bots': sum(stats['bots'] for stats in shard_stats),
+            'per_shard': [
+                dict(stats, shard_id=shard.shard_id, pid=shard.process.pid, requests=shard.requests,
+                     events=shard.events, in_flight=len(shard.pending))
+                for shard, stats in zip(self.shards, shard_stats)
+            ]
+        }
+
+def _shard_handlers(engine, bot_manager) -> Dict[str, Callable]:
+    def lobby_dict(lobby):
+        return lobby.to_dict() if lobby else None
+    
+    def get_lobby_update(lobby_id, since_version):
+        lobby = engine.get_lobby(lobby_id)
+        return lobby.get_update(since_version) if lobby else None
+    
+    def get_player(player_id):
+        player = engine.get_player(player_id)
+        return player.to_dict() if player else None
+    
+    def query_lobbies(state, min_free_slots, has_bots, tags, cursor, limit, fields):
+        lobbies, next_cursor = engine.query_lobbies(state=state, min_free_slots=min_free_slots, has_bots=has_bots,
+                                                    tags=tags, cursor=cursor, limit=limit)
+        seqs = engine.lobby_index.seqs
+        return (
+            [lobby.project(fields) if fields else lobby.to_dict() for lobby in lobbies],
+            [seqs.get(lobby.lobby_id, 0) for lobby in lobbies],
+            next_cursor
+        )
+    
+    def with_update(lobby_id, method, *args):
+        lobby = engine.get_lobby(lobby_id)
+        since_version = lobby.version if lobby else None
+        result = handlers[method](lobby_id, *args)
+        return result, lobby.get_update(since_version) if lobby else None
+    
+    handlers = {
+        'create_lobby': lambda lobby_id, config: engine.create_lobby(lobby_id, config).to_dict(),
+        'delete_lobby': engine.delete_lobby,
+        'get_lobby': lambda lobby_id: lobby_dict(engine.get_lobby(lobby_id)),
+        'get_lobby_update': get_lobby_update,
+        'get_all_lobbies': engine.get_all_lobbies,
+        'add_player_to_lobby': engine.add_player_to_lobby,
+        'add_players_to_lobby': engine.add_players_to_lobby,
+        'remove_player_from_lobby': engine.remove_player_from_lobby,
+        'remove_players': engine.remove_players,
+        'set_player_ready': engine.set_player_ready,
+        'set_ready_many': engine.set_ready_many,
+        'quick_join': lambda player: lobby_dict(engine.quick_join(player)),
+        'get_player': get_player,
+        'query_lobbies': query_lobbies,
+        'get_all_players': lambda: [player.to_dict() for player in engine.get_all_players()],
+        'create_bot': bot_manager.create_bot,
+        'get_bot': bot_manager.get_bot,
+        'get_all_bots': bot_manager.get_all_bots,
+        'remove_bot': bot_manager.remove_bot,
+        'add_bot_to_lobby': bot_manager.add_bot_to_lobby,
+        'fill_lobby_with_bots': bot_manager.fill_lobby_with_bots,
+        'get_bot_stats': bot_manager.get_bot_stats,
+        'get_rule_stats': engine.rule_engine.get_stats,
+        'get_reaper_stats': engine.reaper.get_stats,
+        'get_stats': lambda: {'lobbies': len(engine.lobbies), 'players': len(engine.players), 'bots': len(engine.bots)}
+    }
+    handlers['with_update'] = with_update
+    return handlers
+
+def run_shard(address: str, shard_id: int, authkey: bytes):
+    from bots.bot_manager import BotManager
+    from core.engine import LobbyEngine
+    from services.heartbeat import HeartbeatService
+    
+    conn = Client(address, authkey=authkey)
+    conn.send(shard_id)
+    config, forward_events = conn.recv()
+    
+    engine = LobbyEngine(config)
+    handlers = _shard_handlers(engine, BotManager(engine))
+    send_lock = threading.Lock()
+    serving = threading.get_ident()
+    batched: List[Tuple[str, dict]] = []
+    
+    def send(message):
+        with send_lock:
+            conn.send(message)
+    
+    def forward(event_data):
+        if threading.get_ident() == serving:
+            batched.append((event_data['event'], event_data['data']))
+        else:
+            send(('event', event_data['event'], event_data['data']))
+    
+    if forward_events:
+        engine.event_bus.on('*', forward)
+    
+    heartbeat = HeartbeatService(engine)
+    heartbeat.start()
+    
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+        
+        request_id, method, args = message
+        try:
+            reply = ('reply', request_id, True, handlers[method](*args), batched[:])
+        except Exception as e:
+            print(f"Shard {shard_id} error in {method}: {e}")
+            reply = ('reply', request_id, False, str(e), batched[:])
+        batched.clear()
+        send(reply)
+    
+    heartbeat.active = False
+    conn.close()
+
+if __name__ == '__main__':
+    run_shard(sys.argv[1], int(sys.argv[2]), bytes.fromhex(os.environ['JOINLY_SHARD_AUTHKEY']))
\ No newline at end of file
@@ -0,0 +1,97 @@
+import math
+import threading
+import time
+from typing import Any, List
+
+class TimerHandle:
+    __slots__ = ('deadline', 'payload', 'cancelled')
+    
+    def __init__(self, deadline: float, payload: Any):
+        self.deadline = deadline
+        self.payload = payload
+        self.cancelled = False
+    
+    def cancel(self):
+        self.cancelled = True
+
+class TimingWheel:
+    def __init__(self, tick: float = 0.1, slots: int = 64, levels: int = 4, start: float = None):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.wheels: List[List[List[TimerHandle]]] = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow: List[TimerHandle] = []
+        self.expired: List[TimerHandle] = []
+        self.current_tick = int((start if start is not None else time.time()) / tick)
+        self.pending = 0
+        self.lock = threading.Lock()
+    
+    def schedule(self, deadline: float, payload: Any) -> TimerHandle:
+        handle = TimerHandle(deadline, payload)
+        with self.lock:
+            self._insert(handle)
+            self.pending += 1
+        return handle
+    
+    def _insert(self, handle: TimerHandle):
+        target = math.ceil(handle.deadline / self.tick)
+        delta = target - self.current_tick
+        
+        if delta <= 0:
+            self.expired.append(handle)
+            return
+        
+        span = self.slots
+        for level in range(self.levels):
+            if delta < span:
+                slot = (target // (span // self.slots)) % self.slots
+                self.wheels[level][slot].append(handle)
+                return
+            span *= self.slots
+        
+        self.overflow.append(handle)
+    
+    def advance(self, now: float = None) -> List[Any]:
+        now_tick = int((now if now is not None else time.time()) / self.tick)
+        due: List[TimerHandle] = []
+        
+        with self.lock:
+            due.extend(self.expired)
+            self.expired = []
+            
+            while self.current_tick < now_tick:
+                self.current_tick += 1
+                self._cascade()
+                
+                slot = self.wheels[0][self.current_tick % self.slots]
+                if slot:
+                    due.extend(slot)
+                    slot.clear()
+            
+            due.extend(self.expired)
+            self.expired = []
+            self.pending -= len(due)
+        
+        return [handle.payload for handle in due if not handle.cancelled]
+    
+    def _cascade(self):
+        span = self.slots
+        for level in range(1, self.levels):
+            if self.current_tick % span:
+                break
+            slot = self.wheels[level][(self.current_tick // span) % self.slots]
+            if slot:
+                entries = list(slot)
+                slot.clear()
+                for handle in entries:
+                    self._insert(handle)
+            span *= self.slots
+        else:
+            if self.overflow and self.current_tick % span == 0:
+                entries = self.overflow
+                self.overflow = []
+                for handle in entries:
+                    self._insert(handle)
+    
+    def get_pending_count(self) -> int:
+        return self.pending
\ No newline at end of file
@@ -1,18 +1,32 @@
+import bisect
 import time
 import threading
-from typing import List, Dict, Optional
+from itertools import compress
+from typing import List, Dict, Optional, Set, Tuple
 from .tickets import MatchTicket
 from .queues import MatchQueue
 from .balancer import TeamBalancer
+from . import vectorized
 
 class Matcher:
-    def __init__(self, engine):
+    def __init__(self, engine, config: dict = None):
+        config = config or {}
         self.engine = engine
         self.queues: Dict[str, MatchQueue] = {}
         self.balancer = TeamBalancer()
         self.active = True
         self.match_thread = None
         self.lock = threading.RLock()
+        self.wakeup = threading.Condition(self.lock)
+        self.dirty_queues: Set[str] = set()
+        self.tick_rate = config.get('tick_rate', 1.0)
+        self.min_batch_interval = config.get('min_batch_interval', 0.002)
+        self.vectorize_threshold = config.get('vectorize_threshold', 0)
+        
+        self.passes = 0
+        self.sweeps = 0
+        self.matches_created = 0
+        self.match_sequence = 0
     
     def start(self):
         self.active = True
@@ -20,24 +34,39 @@ class Matcher:
         self.match_thread.start()
     
     def stop(self):
-        self.active = False
+        with self.wakeup:
+            self.active = False
+            self.wakeup.notify_all()
         if self.match_thread:
             self.match_thread.join()
     
+    def _mark_dirty(self, queue_id: str):
+        with self.wakeup:
+            self.dirty_queues.add(queue_id)
+            self.wakeup.notify()
+    
     def create_queue(self, queue_id: str, config: dict) -> MatchQueue:
         with self.lock:
             queue = MatchQueue(queue_id, config)
             self.queues[queue_id] = queue
+            self.engine.event_bus.emit('queue_created', {'queue_id': queue_id})
             return queue
     
+    def restore_queue(self, queue: MatchQueue):
+        with self.lock:
+            self.queues[queue.queue_id] = queue
+            self._mark_dirty(queue.queue_id)
+    
     def get_queue(self, queue_id: str) -> Optional[MatchQueue]:
         return self.queues.get(queue_id)
     
     def add_ticket(self, queue_id: str, ticket: MatchTicket) -> bool:
         with self.lock:
             queue = self.get_queue(queue_id)
-            if queue:
+            if queue and queue.ticket_for_player(ticket.player_id) in (None, ticket.ticket_id):
                 queue.add_ticket(ticket)
+                self._mark_dirty(queue_id)
+                self.engine.event_bus.emit('ticket_queued', {'queue_id': queue_id, 'ticket_id': ticket.ticket_id})
                 return True
             return False
     
@@ -46,45 +75,200 @@ class Matcher:
             queue = self.get_queue(queue_id)
             if queue:
                 queue.remove_ticket(ticket_id)
+                self._mark_dirty(queue_id)
+                self.engine.event_bus.emit('ticket_removed', {'queue_id': queue_id, 'ticket_id': ticket_id})
     
     def _matching_loop(self):
+        next_sweep = time.time() + self.tick_rate
         while self.active:
+            with self.wakeup:
+                self.wakeup.wait_for(
+                    lambda: self.dirty_queues or not self.active,
+                    timeout=max(0.0, next_sweep - time.time())
+                )
+                if not self.active:
+                    return
+            
+            sweep = time.time() >= next_sweep
+            if sweep:
+                next_sweep = time.time() + self.tick_rate
             try:
-                self._process_queues()
+                self._process_queues(None if sweep else self._take_dirty())
             except Exception as e:
                 print(f"Matching error: {e}")
-            time.sleep(1.0)
+            
+            if self.min_batch_interval > 0:
+                time.sleep(self.min_batch_interval)
     
-    def _process_queues(self):
+    def _take_dirty(self) -> Set[str]:
         with self.lock:
-            for queue in self.queues.values():
-                matches = self._find_matches(queue)
-                for match_group in matches:
-                    self._create_match(queue, match_group)
+            dirty = self.dirty_queues
+            self.dirty_queues = set()
+            return dirty
     
-    def _find_matches(self, queue: MatchQueue) -> List[List[MatchTicket]]:
-        matches = []
-        tickets = queue.get_active_tickets()
+    def _process_queues(self, queue_ids: Set[str] = None):
+        with self.lock:
+            if queue_ids is None:
+                self.dirty_queues.clear()
+                queues = list(self.queues.values())
+                self.sweeps += 1
+            else:
+                queues = [self.queues[queue_id] for queue_id in queue_ids if queue_id in self.queues]
+            self.passes += 1
+            
+            for queue in queues:
+                groups = self._find_matches(queue)
+                teams = None
+                vectorize_teams = queue.team_mode and self.balancer.balance_method != 'random'
+                if groups and vectorize_teams and self._is_vectorized(queue):
+                    teams = vectorized.balance_teams(groups, queue.team_size)
+                
+                handled = []
+                for index, match_group in enumerate(groups):
+                    self._create_match(queue, match_group, teams[index] if teams else None)
+                    handled.extend(ticket.ticket_id for ticket in match_group)
+                queue.remove_tickets(handled)
+    
+    def _is_vectorized(self, queue: MatchQueue) -> bool:
+        return vectorized.NUMPY_AVAILABLE and 0 < self.vectorize_threshold <= len(queue.ordered)
+    
+    def _find_matches(self, queue: MatchQueue, now: float = None) -> List[List[MatchTicket]]:
+        now = now if now is not None else time.time()
+        queue.expire_tickets(now)
+        tickets = queue.ordered
+        size = queue.players_per_match
         
-        if len(tickets) < queue.players_per_match:
-            return matches
+        if len(tickets) < size:
+            return []
         
-        sorted_tickets = sorted(tickets, key=lambda t: t.skill_rating)
+        free = bytearray(b'\x01') * len(tickets)
+        if queue.use_arrays(self._is_vectorized(queue)):
+            matches = self._vectorized_anchor_matches(queue, free, now)
+        else:
+            matches = self._anchor_matches(queue, free, now)
         
-        for i in range(0, len(sorted_tickets) - queue.players_per_match + 1, queue.players_per_match):
-            group = sorted_tickets[i:i + queue.players_per_match]
+        if not matches:
+            return self._base_windows(queue, tickets)
+        matches.extend(self._base_windows(queue, list(compress(tickets, free)), free))
+        return matches
+    
+    def _anchor_matches(self, queue: MatchQueue, free: bytearray, now: float) -> List[List[MatchTicket]]:
+        tickets = queue.ordered
+        matches = []
+        for position, anchor in queue.due_anchors(now):
+            if not free[position]:
+                continue
             
-            if len(group) == queue.players_per_match:
-                avg_skill = sum(t.skill_rating for t in group) / len(group)
-                skill_diff = max(t.skill_rating for t in group) - min(t.skill_rating for t in group)
-                
-                if skill_diff <= queue.max_skill_diff:
-                    matches.append(group)
+            group, due = self._anchor_window(queue, free, position, now)
+            if group:
+                for member in group:
+                    free[member] = 0
+                matches.append([tickets[member] for member in group])
+            else:
+                queue.defer_anchor(anchor, due)
+        return matches
+    
+    def _vectorized_anchor_matches(self, queue: MatchQueue, free: bytearray, now: float) -> List[List[MatchTicket]]:
+        positions = queue.due_positions(now)
+        if not len(positions):
+            return []
+        
+        tickets = queue.ordered
+        size = queue.players_per_match
+        starts, fits, dues = vectorized.anchor_windows(queue, positions, now)
+        matches = []
+        deferred = []
+        deferred_dues = []
+        for index, position in enumerate(positions.tolist()):
+            if not free[position]:
+                continue
+            
+            if 0 in free[max(0, position - size + 1):position + size]:
+                group, due = self._anchor_window(queue, free, position, now)
+            elif fits[index]:
+                group = range(starts[index], starts[index] + size)
+            else:
+                group, due = None, dues[index]
+            
+            if group:
+                for member in group:
+                    free[member] = 0
+                matches.append([tickets[member] for member in group])
+            else:
+                deferred.append(position)
+                deferred_dues.append(due)
+        queue.defer_positions(deferred, deferred_dues)
+        return matches
+    
+    def _base_windows(self, queue: MatchQueue, tickets: List[MatchTicket],
+                      free: bytearray = None) -> List[List[MatchTicket]]:
+        size = queue.players_per_match
+        if queue.arrays is not None:
+            skills = queue.arrays.skills
+            if free is not None:
+                skills = vectorized.select(skills, free)
+            return vectorized.sliding_window(skills, tickets, size, queue.max_skill_diff)
+        
+        skills = queue.skills if free is None else list(compress(queue.skills, free))
+        return self._sliding_window(skills, tickets, size, queue.max_skill_diff)
+    
+    def _anchor_window(self, queue: MatchQueue, free: bytearray, position: int,
+                       now: float) -> Tuple[Optional[List[int]], float]:
+        skills = queue.skills
+        tickets = queue.ordered
+        size = queue.players_per_match
+        left = []
+        index = position - 1
+        while index >= 0 and len(left) < size - 1:
+            if free[index]:
+                left.append(index)
+            index -= 1
         
+        right = []
+        index = position + 1
+        while index < len(skills) and len(right) < size - 1:
+            if free[index]:
+                right.append(index)
+            index += 1
+        
+        candidates = left[::-1] + [position] + right
+        best = None
+        best_spread = float('inf')
+        due = float('inf')
+        for start in range(max(0, len(left) - size + 1), min(len(left), len(candidates) - size) + 1):
+            window = candidates[start:start + size]
+            spread = skills[window[-1]] - skills[window[0]]
+            newest = max(tickets[member].queued_at for member in window)
+            if spread > queue.allowed_diff_since(newest, now):
+                due = min(due, queue.deferred_due(spread, newest, now))
+            elif spread < best_spread:
+                best = start
+                best_spread = spread
+        if best is not None:
+            return candidates[best:best + size], best_spread
+        if due == float('inf'):
+            due = queue.deferred_due(due, tickets[position].queued_at, now)
+        return None, due
+    
+    def _sliding_window(self, skills: List[float], tickets: List[MatchTicket], size: int,
+                        max_skill_diff: float) -> List[List[MatchTicket]]:
+        bisect_left = bisect.bisect_left
+        matches = []
+        start = 0
+        last_start = len(tickets) - size
+        while start <= last_start:
+            end = start + size - 1
+            if skills[end] - skills[start] <= max_skill_diff:
+                matches.append(tickets[start:end + 1])
+                start = end + 1
+            else:
+                start = bisect_left(skills, skills[end] - max_skill_diff, start + 1, end)
         return matches
     
-    def _create_match(self, queue: MatchQueue, tickets: List[MatchTicket]):
-        lobby_id = f"match_{int(time.time()*1000)}"
+    def _create_match(self, queue: MatchQueue, tickets: List[MatchTicket],
+                      teams: List[List[MatchTicket]] = None) -> bool:
+        self.match_sequence += 1
+        lobby_id = f"match_{int(time.time()*1000)}_{self.match_sequence}"
         
         lobby_config = {
             'max_players': queue.players_per_match,
@@ -92,28 +276,63 @@ class Matcher:
             'require_all_ready': True
         }
         
-        lobby = self.engine.create_lobby(lobby_id, lobby_config)
+        self.engine.create_lobby(lobby_id, lobby_config)
         
+        players = []
         if queue.team_mode:
-            teams = self.balancer.balance_teams(tickets, queue.team_size)
+            if teams is None:
+                teams = self.balancer.balance_teams(tickets, queue.team_size)
             for team_id, team_tickets in enumerate(teams):
                 for ticket in team_tickets:
                     player = ticket.to_player()
                     player.team = team_id
-                    self.engine.add_player_to_lobby(lobby_id, player)
-                    queue.remove_ticket(ticket.ticket_id)
+                    players.append(player)
         else:
-            for ticket in tickets:
-                player = ticket.to_player()
-                self.engine.add_player_to_lobby(lobby_id, player)
-                queue.remove_ticket(ticket.ticket_id)
+            players = [ticket.to_player() for ticket in tickets]
+        
+        seated = len(players)
+        if not self.engine.add_players_to_lobby(lobby_id, players):
+            seated = self._seat_individually(queue, lobby_id, tickets, players)
+            if not seated:
+                self.engine.delete_lobby(lobby_id)
+                return False
+        
+        self.matches_created += 1
         
         self.engine.event_bus.emit('match_created', {
             'lobby_id': lobby_id,
             'queue_id': queue.queue_id,
-            'player_count': len(tickets)
+            'player_count': seated,
+            'ticket_ids': [ticket.ticket_id for ticket in tickets]
         })
+        return True
+    
+    def _seat_individually(self, queue: MatchQueue, lobby_id: str, tickets: List[MatchTicket],
+                           players: list) -> int:
+        by_player = {ticket.player_id: ticket for ticket in tickets}
+        seated = 0
+        for player in players:
+            if self.engine.add_player_to_lobby(lobby_id, player):
+                seated += 1
+                continue
+            
+            ticket = by_player[player.player_id]
+            ticket.set_status('cancelled')
+            self.engine.event_bus.emit('ticket_removed', {'queue_id': queue.queue_id, 'ticket_id': ticket.ticket_id})
+        return seated
     
     def get_all_queues(self) -> List[dict]:
         with self.lock:
-            return [q.to_dict() for q in self.queues.values()]
\ No newline at end of file
+            return [q.to_dict() for q in self.queues.values()]
+    
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'tick_rate': self.tick_rate,
+                'min_batch_interval': self.min_batch_interval,
+                'vectorize_threshold': self.vectorize_threshold if vectorized.NUMPY_AVAILABLE else 0,
+                'passes': self.passes,
+                'sweeps': self.sweeps,
+                'dirty_queues': len(self.dirty_queues),
+                'matches_created': self.matches_created
+            }
\ No newline at end of file
@@ -1,6 +1,11 @@
+import bisect
+import heapq
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from .tickets import MatchTicket
+from . import vectorized
+
+INF = float('inf')
 
 class MatchQueue:
     def __init__(self, queue_id: str, config: dict):
@@ -15,45 +20,251 @@ class MatchQueue:
         self.team_size = config.get('team_size', 5)
         self.max_wait_time = config.get('max_wait_time', 300)
         self.priority_enabled = config.get('priority_enabled', False)
+        
+        self.expansion_delay = config.get('expansion_delay', 10)
+        self.expansion_rate = config.get('expansion_rate', 0.0)
+        self.max_expanded_diff = config.get('max_expanded_diff', self.max_skill_diff)
+        self.bulk_threshold = config.get('bulk_threshold', 64)
+        
+        self.indexed: Dict[str, MatchTicket] = {}
+        self.prioritized: Dict[str, MatchTicket] = {}
+        self.player_tickets: Dict[str, str] = {}
+        self.anchor_heap: List[Tuple[float, str]] = []
+        self.anchor_due: Dict[str, float] = {}
+        self.rescan_anchors = False
+        self.skills: List[float] = []
+        self.ordered: List[MatchTicket] = []
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.queued_total = 0.0
+        self.version = 0
+        self.arrays = None
+    
+    def _index(self, tickets: List[MatchTicket]):
+        for ticket in tickets:
+            self.indexed[ticket.ticket_id] = ticket
+            self.player_tickets[ticket.player_id] = ticket.ticket_id
+            if ticket.priority > 0:
+                self.prioritized[ticket.ticket_id] = ticket
+            self.queued_total += ticket.queued_at
+            heapq.heappush(self.expiry_heap, (ticket.queued_at, ticket.ticket_id))
+        
+        if len(tickets) > self.bulk_threshold:
+            self.ordered.extend(tickets)
+            self.ordered.sort(key=lambda t: t.skill_rating)
+            self.skills = [ticket.skill_rating for ticket in self.ordered]
+            if self.arrays is not None:
+                self.arrays.merge(tickets)
+            self.rescan_anchors = self.expansion_rate > 0 or self.priority_enabled
+        else:
+            for ticket in tickets:
+                position = bisect.bisect_right(self.skills, ticket.skill_rating)
+                self.skills.insert(position, ticket.skill_rating)
+                self.ordered.insert(position, ticket)
+                if self.arrays is not None:
+                    self.arrays.insert(position, ticket, INF)
+                self._schedule_anchors(ticket, position)
+        self.version += 1
+    
+    def _unindex(self, ticket_ids: List[str]) -> List[MatchTicket]:
+        removed = [self.indexed.pop(ticket_id) for ticket_id in ticket_ids if ticket_id in self.indexed]
+        if not removed:
+            return removed
+        
+        bulk = len(removed) > self.bulk_threshold
+        positions = []
+        if not bulk or self.arrays is not None:
+            positions = sorted((self.position(ticket) for ticket in removed), reverse=True)
+        if self.arrays is not None:
+            self.arrays.delete(positions)
+        
+        if bulk:
+            gone = set(map(id, removed))
+            self.ordered = [ticket for ticket in self.ordered if id(ticket) not in gone]
+            self.skills = [ticket.skill_rating for ticket in self.ordered]
+        else:
+            for position in positions:
+                del self.skills[position]
+                del self.ordered[position]
+        
+        for ticket in removed:
+            self.prioritized.pop(ticket.ticket_id, None)
+            self.anchor_due.pop(ticket.ticket_id, None)
+            if self.player_tickets.get(ticket.player_id) == ticket.ticket_id:
+                del self.player_tickets[ticket.player_id]
+            self.queued_total -= ticket.queued_at
+        self.version += 1
+        return removed
+    
+    def _is_anchor(self, ticket: MatchTicket, now: float) -> bool:
+        if self.priority_enabled and ticket.priority > 0:
+            return True
+        return self.expansion_rate > 0 and now - ticket.queued_at > self.expansion_delay
+    
+    def _schedule(self, ticket: MatchTicket, due: float):
+        if due < self.anchor_due.get(ticket.ticket_id, INF):
+            self.anchor_due[ticket.ticket_id] = due
+            heapq.heappush(self.anchor_heap, (due, ticket.ticket_id))
+    
+    def _schedule_anchors(self, ticket: MatchTicket, position: int):
+        if self.priority_enabled and ticket.priority > 0:
+            due = ticket.queued_at
+        elif self.expansion_rate > 0:
+            due = ticket.queued_at + self.expansion_delay
+        else:
+            return
+        
+        now = ticket.queued_at
+        start = max(0, position - self.players_per_match + 1)
+        stop = position + self.players_per_match
+        if self.arrays is not None:
+            self.arrays.due[position] = due
+            vectorized.reschedule_neighbors(self, start, stop, position, now)
+            return
+        
+        self._schedule(ticket, due)
+        for neighbor in self.ordered[start:stop]:
+            if neighbor is not ticket and self._is_anchor(neighbor, now):
+                self._schedule(neighbor, now)
+    
+    def use_arrays(self, enabled: bool) -> bool:
+        if enabled != (self.arrays is not None):
+            self.arrays = vectorized.TicketArrays(self.ordered, self.skills) if enabled else None
+            self.anchor_due = {}
+            self.anchor_heap = []
+            self.rescan_anchors = self.expansion_rate > 0 or self.priority_enabled
+        return enabled
+    
+    def due_anchors(self, now: float) -> List[Tuple[int, MatchTicket]]:
+        if self.rescan_anchors:
+            self.rescan_anchors = False
+            self.anchor_due = {}
+            anchors = []
+            for ticket in self.indexed.values():
+                if self._is_anchor(ticket, now):
+                    anchors.append(ticket)
+                elif self.expansion_rate > 0:
+                    self.anchor_due[ticket.ticket_id] = ticket.queued_at + self.expansion_delay
+            self.anchor_heap = [(due, ticket_id) for ticket_id, due in self.anchor_due.items()]
+            heapq.heapify(self.anchor_heap)
+        else:
+            if len(self.anchor_heap) > 4 * len(self.anchor_due) + 1024:
+                self.anchor_heap = [(due, ticket_id) for ticket_id, due in self.anchor_due.items()]
+                heapq.heapify(self.anchor_heap)
+            anchors = []
+            heap = self.anchor_heap
+            while heap and heap[0][0] <= now:
+                due, ticket_id = heapq.heappop(heap)
+                if self.anchor_due.get(ticket_id) == due:
+                    del self.anchor_due[ticket_id]
+                    anchors.append(self.indexed[ticket_id])
+        
+        anchors = [(self.position(ticket), ticket) for ticket in anchors]
+        if self.priority_enabled:
+            anchors.sort(key=lambda anchor: (-anchor[1].priority, anchor[1].queued_at, anchor[0]))
+        else:
+            anchors.sort(key=lambda anchor: (anchor[1].queued_at, anchor[0]))
+        return anchors
+    
+    def due_positions(self, now: float):
+        if self.rescan_anchors:
+            self.rescan_anchors = False
+            return vectorized.rescan_anchors(self, now)
+        return vectorized.pop_due(self, now)
+    
+    def deferred_due(self, min_spread: float, queued_at: float, now: float) -> float:
+        due = now
+        if self.expansion_rate > 0:
+            reach = min(min_spread, self.max_expanded_diff)
+            due = queued_at + self.expansion_delay + (reach - self.max_skill_diff) / self.expansion_rate
+        return due if due > now else now + self.expansion_delay
+    
+    def defer_anchor(self, ticket: MatchTicket, due: float):
+        self._schedule(ticket, due)
+    
+    def defer_positions(self, positions: List[int], dues: List[float]):
+        if positions:
+            vectorized.schedule(self.arrays, positions, dues)
+    
+    def position(self, ticket: MatchTicket) -> int:
+        low = bisect.bisect_left(self.skills, ticket.skill_rating)
+        high = bisect.bisect_right(self.skills, ticket.skill_rating, low)
+        return self.ordered.index(ticket, low, high)
     
     def add_ticket(self, ticket: MatchTicket):
+        self.remove_ticket(ticket.ticket_id)
         self.tickets[ticket.ticket_id] = ticket
         ticket.queued_at = time.time()
+        if ticket.status == 'queued':
+            self._index([ticket])
+    
+    def restore_tickets(self, tickets: List[MatchTicket]):
+        self.remove_tickets([ticket.ticket_id for ticket in tickets])
+        for ticket in tickets:
+            self.tickets[ticket.ticket_id] = ticket
+        queued = []
+        players = set()
+        for ticket in sorted(tickets, key=lambda t: t.queued_at):
+            if ticket.status != 'queued':
+                continue
+            if ticket.player_id in players or ticket.player_id in self.player_tickets:
+                ticket.status = 'cancelled'
+                continue
+            players.add(ticket.player_id)
+            queued.append(ticket)
+        self._index(queued)
     
     def remove_ticket(self, ticket_id: str):
         if ticket_id in self.tickets:
             del self.tickets[ticket_id]
+            self._unindex([ticket_id])
+    
+    def remove_tickets(self, ticket_ids: List[str]):
+        for ticket_id in ticket_ids:
+            self.tickets.pop(ticket_id, None)
+        self._unindex(ticket_ids)
+    
+    def ticket_for_player(self, player_id: str) -> Optional[str]:
+        return self.player_tickets.get(player_id)
     
     def get_ticket(self, ticket_id: str) -> MatchTicket:
         return self.tickets.get(ticket_id)
     
-    def get_active_tickets(self) -> List[MatchTicket]:
-        current_time = time.time()
-        active = []
-        
-        for ticket in self.tickets.values():
-            if ticket.status == 'queued':
-                wait_time = current_time - ticket.queued_at
-                
-                if wait_time > self.max_wait_time:
-                    ticket.status = 'timeout'
-                else:
-                    active.append(ticket)
+    def expire_tickets(self, now: float = None) -> List[MatchTicket]:
+        cutoff = (now if now is not None else time.time()) - self.max_wait_time
+        heap = self.expiry_heap
+        expired = []
+        while heap and heap[0][0] < cutoff:
+            queued_at, ticket_id = heapq.heappop(heap)
+            ticket = self.indexed.get(ticket_id)
+            if ticket is not None and ticket.queued_at == queued_at:
+                ticket.status = 'timeout'
+                expired.append(ticket_id)
         
-        return active
+        if len(heap) > 2 * len(self.indexed) + 1024:
+            self.expiry_heap = [(ticket.queued_at, ticket_id) for ticket_id, ticket in self.indexed.items()]
+            heapq.heapify(self.expiry_heap)
+        return self._unindex(expired)
+    
+    def allowed_skill_diff(self, ticket: MatchTicket, now: float) -> float:
+        return self.allowed_diff_since(ticket.queued_at, now)
+    
+    def allowed_diff_since(self, queued_at: float, now: float) -> float:
+        waited = now - queued_at - self.expansion_delay
+        if waited <= 0 or self.expansion_rate <= 0:
+            return self.max_skill_diff
+        return min(self.max_expanded_diff, self.max_skill_diff + waited * self.expansion_rate)
+    
+    def get_active_tickets(self) -> List[MatchTicket]:
+        self.expire_tickets()
+        return list(self.ordered)
     
     def get_queue_length(self) -> int:
-        return len([t for t in self.tickets.values() if t.status == 'queued'])
+        return len(self.indexed)
     
     def get_average_wait_time(self) -> float:
-        current_time = time.time()
-        queued_tickets = [t for t in self.tickets.values() if t.status == 'queued']
-        
-        if not queued_tickets:
+        if not self.indexed:
             return 0.0
-        
-        total_wait = sum(current_time - t.queued_at for t in queued_tickets)
-        return total_wait / len(queued_tickets)
+        return time.time() - self.queued_total / len(self.indexed)
     
     def clear_expired_tickets(self):
         current_time = time.time()
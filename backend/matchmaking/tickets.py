@@ -3,19 +3,35 @@ import uuid
 from typing import Optional
 
 class MatchTicket:
+    __slots__ = (
+        'ticket_id', 'player_id', 'username', 'skill_rating', 'status', 'created_at',
+        'queued_at', 'matched_at', 'party_id', 'priority', '_metadata'
+    )
+    
     def __init__(self, player_id: str, username: str, skill_rating: int = 1000, metadata: dict = None):
+        now = time.time()
         self.ticket_id = str(uuid.uuid4())
         self.player_id = player_id
         self.username = username
         self.skill_rating = skill_rating
-        self.metadata = metadata or {}
+        self._metadata = metadata or None
         self.status = 'queued'
-        self.created_at = time.time()
-        self.queued_at = time.time()
+        self.created_at = now
+        self.queued_at = now
         self.matched_at: Optional[float] = None
         self.party_id: Optional[str] = None
         self.priority = 0
     
+    @property
+    def metadata(self) -> dict:
+        if self._metadata is None:
+            self._metadata = {}
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, metadata: dict):
+        self._metadata = metadata or None
+    
     def set_status(self, status: str):
         self.status = status
         if status == 'matched':
@@ -33,7 +49,7 @@ class MatchTicket:
             username=self.username,
             metadata={
                 'skill_rating': self.skill_rating,
-                **self.metadata
+                **(self._metadata or {})
             }
         )
     
@@ -47,5 +63,5 @@ class MatchTicket:
             'wait_time': self.get_wait_time(),
             'created_at': self.created_at,
             'party_id': self.party_id,
-            'metadata': self.metadata
+            'metadata': self._metadata or {}
         }
\ No newline at end of file
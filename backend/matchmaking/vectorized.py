@@ -0,0 +1,194 @@
+from itertools import chain
+from typing import List, Tuple
+from .tickets import MatchTicket
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+SKILL, QUEUED_AT, PRIORITY, DUE = range(4)
+
+def ticket_columns(tickets: List[MatchTicket], skills: List[float] = None):
+    data = np.empty((4, len(tickets)), dtype=np.float64)
+    data[SKILL] = skills if skills is not None else [ticket.skill_rating for ticket in tickets]
+    data[QUEUED_AT] = [ticket.queued_at for ticket in tickets]
+    data[PRIORITY] = [ticket.priority for ticket in tickets]
+    data[DUE] = np.inf
+    return data
+
+class TicketArrays:
+    def __init__(self, tickets: List[MatchTicket], skills: List[float] = None):
+        self.data = ticket_columns(tickets, skills)
+    
+    @property
+    def skills(self):
+        return self.data[SKILL]
+    
+    @property
+    def queued_at(self):
+        return self.data[QUEUED_AT]
+    
+    @property
+    def priority(self):
+        return self.data[PRIORITY]
+    
+    @property
+    def due(self):
+        return self.data[DUE]
+    
+    def insert(self, position: int, ticket: MatchTicket, due: float):
+        self.data = np.insert(self.data, position, (ticket.skill_rating, ticket.queued_at, ticket.priority, due), axis=1)
+    
+    def merge(self, tickets: List[MatchTicket]):
+        columns = ticket_columns(sorted(tickets, key=lambda t: t.skill_rating))
+        positions = np.searchsorted(self.data[SKILL], columns[SKILL], side='right')
+        self.data = np.insert(self.data, positions, columns, axis=1)
+    
+    def delete(self, positions: List[int]):
+        self.data = np.delete(self.data, positions, axis=1)
+
+def anchor_mask(queue, now: float, start: int = 0, stop: int = None):
+    arrays = queue.arrays
+    queued_at = arrays.queued_at[start:stop]
+    mask = np.zeros(len(queued_at), dtype=np.bool_)
+    if queue.priority_enabled:
+        mask |= arrays.priority[start:stop] > 0
+    if queue.expansion_rate > 0:
+        mask |= now - queued_at > queue.expansion_delay
+    return mask
+
+def reschedule_neighbors(queue, start: int, stop: int, position: int, now: float):
+    mask = anchor_mask(queue, now, start, stop)
+    mask[position - start] = False
+    due = queue.arrays.due[start:stop]
+    due[mask] = np.minimum(due[mask], now)
+
+def schedule(arrays: TicketArrays, positions: List[int], dues: List[float]):
+    positions = np.asarray(positions, dtype=np.int64)
+    arrays.due[positions] = np.minimum(arrays.due[positions], dues)
+
+def anchor_order(queue, positions):
+    arrays = queue.arrays
+    queued_at = arrays.queued_at[positions]
+    if queue.priority_enabled:
+        return positions[np.lexsort((queued_at, -arrays.priority[positions]))]
+    return positions[np.argsort(queued_at, kind='stable')]
+
+def rescan_anchors(queue, now: float):
+    arrays = queue.arrays
+    mask = anchor_mask(queue, now)
+    if queue.expansion_rate > 0:
+        arrays.due[:] = np.where(mask, np.inf, arrays.queued_at + queue.expansion_delay)
+    else:
+        arrays.due[:] = np.inf
+    return anchor_order(queue, np.flatnonzero(mask))
+
+def pop_due(queue, now: float):
+    due = queue.arrays.due
+    positions = np.flatnonzero(due <= now)
+    due[positions] = np.inf
+    return anchor_order(queue, positions)
+
+def allowed_diff(queue, queued_at, now: float):
+    waited = now - queued_at - queue.expansion_delay
+    if queue.expansion_rate <= 0:
+        return np.full(len(waited), float(queue.max_skill_diff))
+    return np.where(waited <= 0, queue.max_skill_diff,
+                    np.minimum(queue.max_expanded_diff, queue.max_skill_diff + waited * queue.expansion_rate))
+
+def deferred_due(queue, spreads, queued_at, now: float):
+    if queue.expansion_rate > 0:
+        reach = np.minimum(spreads, queue.max_expanded_diff)
+        due = queued_at + queue.expansion_delay + (reach - queue.max_skill_diff) / queue.expansion_rate
+    else:
+        due = np.full(spreads.shape, now)
+    return np.where(due > now, due, now + queue.expansion_delay)
+
+def window_spreads(skills, size: int):
+    return skills[size - 1:] - skills[:len(skills) - size + 1]
+
+def window_newest(queued_at, size: int):
+    newest = queued_at
+    width = 1
+    while width * 2 <= size:
+        newest = np.maximum(newest[:len(newest) - width], newest[width:])
+        width *= 2
+    count = len(queued_at) - size + 1
+    return np.maximum(newest[:count], newest[size - width:size - width + count])
+
+def anchor_windows(queue, positions, now: float) -> Tuple[List[int], List[bool], List[float]]:
+    arrays = queue.arrays
+    size = queue.players_per_match
+    spreads = window_spreads(arrays.skills, size)
+    newest = window_newest(arrays.queued_at, size)
+    count = len(spreads)
+    
+    starts = positions[:, None] - (size - 1) + np.arange(size)
+    valid = (starts >= 0) & (starts < count)
+    starts = np.clip(starts, 0, count - 1)
+    window_spread = np.where(valid, spreads[starts], np.inf)
+    window_newest_at = newest[starts]
+    fits = valid & (window_spread <= allowed_diff(queue, window_newest_at, now))
+    
+    best = np.argmin(np.where(fits, window_spread, np.inf), axis=1)
+    dues = np.where(valid & ~fits, deferred_due(queue, window_spread, window_newest_at, now), np.inf).min(axis=1)
+    rows = np.arange(len(positions))
+    return starts[rows, best].tolist(), fits.any(axis=1).tolist(), dues.tolist()
+
+def select(skills, free: bytearray):
+    return skills[np.frombuffer(free, dtype=np.bool_)]
+
+def window_starts(skills, size: int, max_skill_diff: float):
+    count = len(skills)
+    if count < size:
+        return np.empty(0, dtype=np.int64)
+    
+    valid = window_spreads(skills, size) <= max_skill_diff
+    last = len(valid)
+    following = np.minimum.accumulate(np.where(valid, np.arange(last), last)[::-1])[::-1]
+    following = np.append(following, last)
+    step = following[np.minimum(np.arange(last + 1) + size, last)]
+    
+    chosen = following[:1]
+    chosen = chosen[chosen < last]
+    while len(chosen):
+        reached = step[chosen]
+        reached = reached[reached < last]
+        if not len(reached):
+            break
+        chosen = np.concatenate((chosen, reached))
+        step = step[step]
+    return chosen
+
+def sliding_window(skills, tickets: List[MatchTicket], size: int, max_skill_diff: float) -> List[List[MatchTicket]]:
+    return [tickets[start:start + size] for start in window_starts(skills, size, max_skill_diff).tolist()]
+
+def balance_teams(groups: List[List[MatchTicket]], team_size: int) -> List[List[List[MatchTicket]]]:
+    if not groups:
+        return []
+    
+    flat = list(chain.from_iterable(groups))
+    size = len(groups[0])
+    team_count = size // team_size
+    rows = np.arange(len(groups))
+    skills = np.array([ticket.skill_rating for ticket in flat], dtype=np.float64).reshape(len(groups), size)
+    
+    order = np.argsort(-skills, axis=1, kind='stable')
+    sorted_skills = np.take_along_axis(skills, order, axis=1)
+    team_skills = np.zeros((len(groups), team_count))
+    assignment = np.empty(order.shape, dtype=np.int64)
+    for column in range(size):
+        team = np.argmin(team_skills, axis=1)
+        assignment[:, column] = team
+        team_skills[rows, team] += sorted_skills[:, column]
+    
+    by_team = np.argsort(assignment, axis=1, kind='stable')
+    members = np.take_along_axis(order, by_team, axis=1) + rows[:, None] * size
+    members = list(map(flat.__getitem__, members.ravel().tolist()))
+    
+    team_sizes = np.bincount((assignment + rows[:, None] * team_count).ravel(), minlength=len(groups) * team_count)
+    bounds = np.concatenate(([0], np.cumsum(team_sizes))).tolist()
+    teams = [members[start:end] for start, end in zip(bounds, bounds[1:])]
+    return [teams[start:start + team_count] for start in range(0, len(teams), team_count)]
\ No newline at end of file
@@ -3,8 +3,9 @@ from typing import Dict, List
 from collections import defaultdict
 
 class AnalyticsService:
-    def __init__(self, engine):
+    def __init__(self, engine, shards=None):
         self.engine = engine
+        self.shards = shards
         self.metrics: Dict[str, any] = defaultdict(int)
         self.event_counts: Dict[str, int] = defaultdict(int)
         self.start_time = time.time()
@@ -12,35 +13,37 @@ class AnalyticsService:
         self._setup_event_tracking()
     
     def _setup_event_tracking(self):
-        events = [
-            'lobby_created', 'lobby_deleted', 'player_joined',
-            'player_left', 'player_ready_changed', 'bot_joined',
-            'bot_left', 'match_created', 'lobby_all_ready'
-        ]
-        
-        for event in events:
-            self.engine.event_bus.on(event, self._track_event)
+        self.engine.event_bus.on('*', self._track_event)
     
     def _track_event(self, event_data):
         event_name = event_data.get('event')
         self.event_counts[event_name] += 1
         self.metrics['total_events'] += 1
     
+    def get_totals(self) -> dict:
+        if self.shards:
+            stats = self.shards.get_stats()
+            lobbies, players, bots = stats['lobbies'], stats['players'], stats['bots']
+        else:
+            lobbies, players, bots = len(self.engine.lobbies), len(self.engine.players), len(self.engine.bots)
+        
+        return {
+            'total_lobbies': lobbies,
+            'total_players': players,
+            'total_bots': bots,
+            'total_parties': len(self.engine.parties)
+        }
+    
     def get_analytics(self) -> dict:
         uptime = time.time() - self.start_time
         
-        analytics = {
-            'uptime_seconds': uptime,
-            'total_lobbies': len(self.engine.lobbies),
-            'total_players': len(self.engine.players),
-            'total_bots': len(self.engine.bots),
-            'total_parties': len(self.engine.parties),
-            'event_counts': dict(self.event_counts),
-            'metrics': dict(self.metrics)
-        }
+        analytics = {'uptime_seconds': uptime}
+        analytics.update(self.get_totals())
+        analytics['event_counts'] = dict(self.event_counts)
+        analytics['metrics'] = dict(self.metrics)
         
-        if self.engine.lobbies:
-            analytics['avg_players_per_lobby'] = len(self.engine.players) / len(self.engine.lobbies)
+        if analytics['total_lobbies']:
+            analytics['avg_players_per_lobby'] = analytics['total_players'] / analytics['total_lobbies']
         
         return analytics
     
@@ -32,10 +32,10 @@ class PresenceService:
         current_time = time.time()
         disconnected_players = []
         
-        for player_id, player in self.engine.players.items():
+        for player in self.engine.get_all_players():
             if not player.is_alive(self.timeout):
-                disconnected_players.append((player_id, player.lobby_id))
-                player.connected = False
+                disconnected_players.append((player.player_id, player.lobby_id))
+                self.engine.set_player_connected(player.player_id, False)
         
         for player_id, lobby_id in disconnected_players:
             if lobby_id:
@@ -48,7 +48,9 @@ class PresenceService:
     def update_player_presence(self, player_id: str):
         player = self.engine.get_player(player_id)
         if player:
+            if not player.connected:
+                self.engine.set_player_connected(player_id, True)
             player.heartbeat()
     
     def get_online_count(self) -> int:
-        return sum(1 for p in self.engine.players.values() if p.connected)
\ No newline at end of file
+        return sum(1 for p in self.engine.get_all_players() if p.connected)
\ No newline at end of file
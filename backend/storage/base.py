@@ -33,6 +33,15 @@ class StorageBackend(ABC):
     @abstractmethod
     def clear(self):
         pass
+    
+    def set_many(self, items: Dict[str, Optional[str]]) -> bool:
+        ok = True
+        for key, value in items.items():
+            if value is None:
+                ok = self.delete(key) and ok
+            else:
+                ok = self.set(key, value) and ok
+        return ok
 
 class StorageManager:
     def __init__(self, backend: StorageBackend):
@@ -71,6 +80,9 @@ class StorageManager:
             return json.loads(value)
         return None
     
+    def save_many(self, values: Dict[str, Optional[str]]) -> bool:
+        return self.backend.set_many(values)
+    
     def get_all_lobbies(self) -> List[str]:
         keys = self.backend.keys("lobby:*")
         return [k.replace("lobby:", "") for k in keys]
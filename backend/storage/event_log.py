@@ -0,0 +1,312 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+RECORD_HEADER = struct.Struct('<IIdH')
+ENCODER = json.JSONEncoder(separators=(',', ':'), default=str)
+
+class Segment:
+    def __init__(self, number: int, path: str):
+        self.number = number
+        self.path = path
+        self.size = 0
+        self.count = 0
+        self.min_ts = None
+        self.max_ts = None
+        self.ts_marks: List[Tuple[float, int]] = []
+    
+    def track(self, timestamp: float, offset: int, index_interval: int):
+        if self.count % index_interval == 0:
+            self.ts_marks.append((self.max_ts if self.max_ts is not None else float('-inf'), offset))
+        self.count += 1
+        self.min_ts = timestamp if self.min_ts is None else min(self.min_ts, timestamp)
+        self.max_ts = timestamp if self.max_ts is None else max(self.max_ts, timestamp)
+    
+    def start_offset(self, since: Optional[float]) -> int:
+        if since is None or not self.ts_marks:
+            return 0
+        index = bisect.bisect_left(self.ts_marks, (since, -1)) - 1
+        return self.ts_marks[index][1] if index >= 0 else 0
+
+class EventLog:
+    def __init__(self, config: dict = None):
+        config = config or {}
+        self.directory = config.get('directory', 'event_log')
+        self.segment_bytes = config.get('segment_bytes', 16 * 1024 * 1024)
+        self.max_segments = config.get('max_segments', 64)
+        self.flush_interval = config.get('flush_interval', 0.05)
+        self.batch_size = config.get('batch_size', 512)
+        self.index_interval = config.get('index_interval', 64)
+        self.fsync = config.get('fsync', False)
+        
+        self.queue_size = config.get('queue_size', 100000)
+        self.pending = deque()
+        self.stopped = threading.Event()
+        self.segments: List[Segment] = []
+        self.lobby_index: Dict[str, List[Tuple[int, int]]] = {}
+        self.file = None
+        self.lock = threading.RLock()
+        self.running = False
+        self.writer = None
+        
+        self.appended = 0
+        self.written = 0
+        self.dropped = 0
+        self.recovered = 0
+        self.truncated_bytes = 0
+    
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        
+        with self.lock:
+            for name in sorted(os.listdir(self.directory)):
+                if name.startswith('segment_') and name.endswith('.log'):
+                    number = int(name[len('segment_'):-len('.log')])
+                    segment = Segment(number, os.path.join(self.directory, name))
+                    self._recover_segment(segment)
+                    self.segments.append(segment)
+            
+            if not self.segments:
+                self._roll_segment()
+            else:
+                self.file = open(self.segments[-1].path, 'ab')
+        
+        self.running = True
+        self.stopped.clear()
+        self.writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer.start()
+    
+    def close(self):
+        if not self.running:
+            return
+        
+        self.running = False
+        self.stopped.set()
+        self.writer.join(timeout=10)
+        
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+    
+    def append(self, event_data: dict):
+        if len(self.pending) >= self.queue_size:
+            self.dropped += 1
+            return
+        self.pending.append(event_data)
+        self.appended += 1
+    
+    def _writer_loop(self):
+        while not self.stopped.wait(self.flush_interval):
+            self._drain()
+        self._drain()
+    
+    def _drain(self):
+        while self.pending:
+            batch = []
+            while self.pending and len(batch) < self.batch_size:
+                batch.append(self.pending.popleft())
+            
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                print(f"Event log write error: {e}")
+    
+    def _encode(self, event_data: dict) -> Tuple[bytes, float, str]:
+        payload = ENCODER.encode(event_data).encode('utf-8')
+        lobby_id = event_data.get('data', {}).get('lobby_id')
+        lobby = str(lobby_id).encode('utf-8') if lobby_id is not None else b''
+        timestamp = event_data.get('timestamp', 0.0)
+        header = RECORD_HEADER.pack(len(payload), zlib.crc32(payload), timestamp, len(lobby))
+        return header + lobby + payload, timestamp, lobby.decode('utf-8')
+    
+    def _write_batch(self, events: List[dict]):
+        with self.lock:
+            chunks = []
+            for event_data in events:
+                record, timestamp, lobby_id = self._encode(event_data)
+                segment = self.segments[-1]
+                if segment.size and segment.size + len(record) > self.segment_bytes:
+                    self._flush_chunks(chunks)
+                    chunks = []
+                    self._roll_segment()
+                    segment = self.segments[-1]
+                
+                self._index_record(segment, segment.size, timestamp, lobby_id)
+                segment.size += len(record)
+                chunks.append(record)
+            
+            self._flush_chunks(chunks)
+            self.written += len(events)
+    
+    def _flush_chunks(self, chunks: List[bytes]):
+        if not chunks:
+            return
+        self.file.write(b''.join(chunks))
+        self.file.flush()
+        if self.fsync:
+            os.fsync(self.file.fileno())
+    
+    def _roll_segment(self):
+        if self.file:
+            self.file.close()
+        
+        number = self.segments[-1].number + 1 if self.segments else 0
+        segment = Segment(number, os.path.join(self.directory, f'segment_{number:08d}.log'))
+        self.segments.append(segment)
+        self.file = open(segment.path, 'ab')
+        
+        while len(self.segments) > self.max_segments:
+            self._drop_segment(self.segments.pop(0))
+    
+    def _drop_segment(self, segment: Segment):
+        try:
+            os.remove(segment.path)
+        except OSError as e:
+            print(f"Event log cleanup error: {e}")
+        
+        oldest = self.segments[0].number
+        for lobby_id in list(self.lobby_index.keys()):
+            locations = self.lobby_index[lobby_id]
+            cut = bisect.bisect_left(locations, (oldest, -1))
+            if cut == len(locations):
+                del self.lobby_index[lobby_id]
+            elif cut:
+                del locations[:cut]
+    
+    def _index_record(self, segment: Segment, offset: int, timestamp: float, lobby_id: str):
+        segment.track(timestamp, offset, self.index_interval)
+        if lobby_id:
+            self.lobby_index.setdefault(lobby_id, []).append((segment.number, offset))
+    
+    def _recover_segment(self, segment: Segment):
+        valid = 0
+        with _MappedFile(segment.path) as mm:
+            if mm is not None:
+                for offset, end, timestamp, lobby_id, _ in self._scan(mm, 0):
+                    self._index_record(segment, offset, timestamp, lobby_id)
+                    self.recovered += 1
+                    valid = end
+        
+        actual = os.path.getsize(segment.path)
+        if actual > valid:
+            self.truncated_bytes += actual - valid
+            with open(segment.path, 'r+b') as f:
+                f.truncate(valid)
+        segment.size = valid
+    
+    def _scan(self, mm, offset: int, end: int = None) -> Iterator[Tuple[int, int, float, str, bytes]]:
+        end = len(mm) if end is None else min(end, len(mm))
+        while offset + RECORD_HEADER.size <= end:
+            length, crc, timestamp, lobby_length = RECORD_HEADER.unpack_from(mm, offset)
+            start = offset + RECORD_HEADER.size
+            payload_start = start + lobby_length
+            payload_end = payload_start + length
+            if payload_end > end:
+                return
+            
+            payload = mm[payload_start:payload_end]
+            if zlib.crc32(payload) != crc:
+                return
+            
+            yield offset, payload_end, timestamp, mm[start:payload_start].decode('utf-8'), payload
+            offset = payload_end
+    
+    def _read_segment(self, number: int, path: str, size: int, start: int,
+                      locations: Optional[List[Tuple[int, int]]]) -> Iterator[Tuple[float, bytes]]:
+        with _MappedFile(path) as mm:
+            if mm is None:
+                return
+            
+            if locations is None:
+                for _, _, timestamp, _, payload in self._scan(mm, start, size):
+                    yield timestamp, payload
+                return
+            
+            first = bisect.bisect_left(locations, (number, start))
+            last = bisect.bisect_left(locations, (number + 1, -1))
+            for _, offset in locations[first:last]:
+                for _, _, timestamp, _, payload in self._scan(mm, offset, size):
+                    yield timestamp, payload
+                    break
+    
+    def query(self, since: float = None, until: float = None, lobby_id: str = None,
+              event: str = None, limit: int = 100) -> List[dict]:
+        with self.lock:
+            segments = [
+                (segment.number, segment.path, segment.size, segment.start_offset(since))
+                for segment in self.segments
+                if segment.count
+                and (since is None or segment.max_ts >= since)
+                and (until is None or segment.min_ts <= until)
+            ]
+            locations = list(self.lobby_index.get(lobby_id, ())) if lobby_id else None
+        
+        newest_first = since is None
+        results: List[dict] = []
+        
+        for number, path, size, start in (reversed(segments) if newest_first else segments):
+            found = []
+            for timestamp, payload in self._read_segment(number, path, size, start, locations):
+                if since is not None and timestamp < since:
+                    continue
+                if until is not None and timestamp > until:
+                    continue
+                record = json.loads(payload)
+                if event is not None and record.get('event') != event:
+                    continue
+                found.append(record)
+                if not newest_first and len(results) + len(found) >= limit:
+                    break
+            
+            if newest_first:
+                results = found + results
+            else:
+                results.extend(found)
+            if len(results) >= limit:
+                break
+        
+        return results[-limit:] if newest_first else results[:limit]
+    
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'directory': self.directory,
+                'segments': len(self.segments),
+                'bytes': sum(segment.size for segment in self.segments),
+                'records': sum(segment.count for segment in self.segments),
+                'indexed_lobbies': len(self.lobby_index),
+                'queue_depth': len(self.pending),
+                'appended': self.appended,
+                'written': self.written,
+                'dropped': self.dropped,
+                'recovered': self.recovered,
+                'truncated_bytes': self.truncated_bytes
+            }
+
+class _MappedFile:
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+        self.mm = None
+    
+    def __enter__(self):
+        try:
+            self.file = open(self.path, 'rb')
+            if os.fstat(self.file.fileno()).st_size:
+                self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            self.mm = None
+        return self.mm
+    
+    def __exit__(self, *args):
+        if self.mm is not None:
+            self.mm.close()
+        if self.file:
+            self.file.close()
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Dict, Optional, List
 from .base import StorageBackend
 import fnmatch
 
@@ -31,6 +31,19 @@ class LevelDBStore(StorageBackend):
             print(f"LevelDB set error: {e}")
             return False
     
+    def set_many(self, items: Dict[str, Optional[str]]) -> bool:
+        try:
+            with self.db.write_batch() as batch:
+                for key, value in items.items():
+                    if value is None:
+                        batch.delete(key.encode('utf-8'))
+                    else:
+                        batch.put(key.encode('utf-8'), value.encode('utf-8'))
+            return True
+        except Exception as e:
+            print(f"LevelDB set_many error: {e}")
+            return False
+    
     def get(self, key: str) -> Optional[str]:
         try:
             value = self.db.get(key.encode('utf-8'))
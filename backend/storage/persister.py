@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+class WriteBehindPersister:
+    def __init__(self, engine, storage_manager, config: dict = None):
+        config = config or {}
+        self.engine = engine
+        self.storage = storage_manager
+        self.batch_size = config.get('batch_size', 256)
+        self.flush_interval = config.get('flush_interval', 0.25)
+        self.max_pending = config.get('max_pending', 10000)
+        self.backpressure_timeout = config.get('backpressure_timeout', 0.05)
+        
+        self.pending: Dict[Tuple[str, str], None] = {}
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.writer = None
+        
+        self.marked = 0
+        self.coalesced = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.throttled = 0
+        self.write_seconds = 0.0
+    
+    def start(self):
+        self.stopped = False
+        self.engine.event_bus.on('*', self._on_event, inline=True)
+        self.writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer.start()
+    
+    def stop(self):
+        if not self.writer:
+            return
+        
+        self.engine.event_bus.off('*', self._on_event)
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.writer.join(timeout=30)
+        self.writer = None
+    
+    def _keys_for(self, data: dict) -> List[Tuple[str, str]]:
+        keys = []
+        if 'lobby_id' in data:
+            keys.append(('lobby', data['lobby_id']))
+        if 'player_id' in data:
+            keys.append(('player', data['player_id']))
+        for player_id in data.get('player_ids', ()):
+            keys.append(('player', player_id))
+        return keys
+    
+    def _on_event(self, event_data: dict):
+        keys = self._keys_for(event_data['data'])
+        if not keys:
+            return
+        
+        with self.condition:
+            for key in keys:
+                if key in self.pending:
+                    self.coalesced += 1
+                else:
+                    self.pending[key] = None
+            self.marked += len(keys)
+            
+            if len(self.pending) >= self.batch_size:
+                self.condition.notify_all()
+            if len(self.pending) >= self.max_pending and threading.current_thread() is not self.writer:
+                self.throttled += 1
+                self.condition.wait_for(
+                    lambda: len(self.pending) < self.max_pending or self.stopped,
+                    timeout=self.backpressure_timeout
+                )
+    
+    def _writer_loop(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(
+                    lambda: len(self.pending) >= self.batch_size or self.stopped,
+                    timeout=self.flush_interval
+                )
+                stopping = self.stopped
+            self.flush()
+            if stopping:
+                return
+    
+    def flush(self) -> int:
+        written = 0
+        retry = []
+        while True:
+            with self.condition:
+                if not self.pending:
+                    break
+                keys = list(islice(self.pending, self.batch_size))
+                for key in keys:
+                    del self.pending[key]
+            
+            count = self._write_batch(keys)
+            if not count:
+                retry.extend(keys)
+            written += count
+            with self.condition:
+                self.condition.notify_all()
+        
+        if retry and not self.stopped:
+            with self.condition:
+                for key in retry:
+                    self.pending.setdefault(key, None)
+        return written
+    
+    def _encode(self, kind: str, key: str) -> Optional[str]:
+        if kind == 'lobby':
+            lobby = self.engine.get_lobby(key)
+            return lobby.to_json().decode('utf-8') if lobby else None
+        
+        player = self.engine.get_player(key)
+        return json.dumps(player.to_dict(), separators=(',', ':')) if player else None
+    
+    def _write_batch(self, keys: List[Tuple[str, str]]) -> int:
+        start = time.perf_counter()
+        values = {f"{kind}:{key}": self._encode(kind, key) for kind, key in keys}
+        ok = self.storage.save_many(values)
+        
+        with self.condition:
+            self.batches += 1
+            self.write_seconds += time.perf_counter() - start
+            if ok:
+                self.written += len(values)
+            else:
+                self.failed += len(values)
+        return len(values) if ok else 0
+    
+    def get_stats(self) -> dict:
+        with self.condition:
+            return {
+                'pending': len(self.pending),
+                'batch_size': self.batch_size,
+                'flush_interval': self.flush_interval,
+                'max_pending': self.max_pending,
+                'backpressure_timeout': self.backpressure_timeout,
+                'marked': self.marked,
+                'coalesced': self.coalesced,
+                'written': self.written,
+                'batches': self.batches,
+                'failed': self.failed,
+                'throttled': self.throttled,
+                'avg_batch_ms': (self.write_seconds / self.batches * 1000) if self.batches else 0.0
+            }
\ No newline at end of file
@@ -0,0 +1,452 @@
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+from core.bot import Bot
+from core.party import Party
+from core.player import Player
+from matchmaking.queues import MatchQueue
+from matchmaking.tickets import MatchTicket
+
+SNAPSHOT_MAGIC = b'JNLYSNAP'
+SNAPSHOT_HEADER = struct.Struct('<8sHHQII')
+SNAPSHOT_VERSION = 2
+SNAPSHOT_COMPRESSED = 1
+JOURNAL_MAGIC = b'JNLYJRNL'
+JOURNAL_HEADER = struct.Struct('<8sH')
+FRAME_HEADER = struct.Struct('<II')
+
+def encode_player(player: Player) -> tuple:
+    return (player.player_id, player.username, player.ready, player.team, player.party_id,
+            player.skill_rating, player.joined_at, player._metadata)
+
+def decode_player(fields: tuple) -> Player:
+    player_id, username, ready, team, party_id, skill_rating, joined_at, metadata = fields
+    player = Player(player_id, username, metadata)
+    player.ready = ready
+    player.team = team
+    player.party_id = party_id
+    player.skill_rating = skill_rating
+    player.joined_at = joined_at
+    return player
+
+def encode_bot(bot: Bot) -> tuple:
+    return (bot.bot_id, bot.profile, bot.username, bot.ready, bot.team, bot.ready_delay, bot.joined_at)
+
+def decode_bot(fields: tuple) -> Bot:
+    bot_id, profile, username, ready, team, ready_delay, joined_at = fields
+    bot = Bot(bot_id, profile)
+    bot.username = username
+    bot.ready = ready
+    bot.team = team
+    bot.ready_delay = ready_delay
+    bot.joined_at = joined_at
+    return bot
+
+def encode_lobby(lobby) -> tuple:
+    with lobby.lock:
+        return (lobby.lobby_id, lobby.config, lobby.state, lobby.version, lobby.created_at, lobby.metadata,
+                [encode_player(player) for player in lobby.players.values()],
+                [encode_bot(bot) for bot in lobby.bots.values()])
+
+def encode_party(party: Party) -> tuple:
+    return (party.party_id, party.leader_id, list(party.members.items()), party.created_at,
+            party.max_members, party.lobby_id)
+
+def decode_party(fields: tuple) -> Party:
+    party_id, leader_id, members, created_at, max_members, lobby_id = fields
+    party = Party(party_id, leader_id)
+    party.members = dict(members)
+    party.created_at = created_at
+    party.max_members = max_members
+    party.lobby_id = lobby_id
+    return party
+
+def encode_ticket(ticket: MatchTicket) -> tuple:
+    return (ticket.ticket_id, ticket.player_id, ticket.username, ticket.skill_rating, ticket.status,
+            ticket.created_at, ticket.queued_at, ticket.party_id, ticket.priority, ticket._metadata)
+
+def decode_ticket(fields: tuple) -> MatchTicket:
+    ticket_id, player_id, username, skill_rating, status, created_at, queued_at, party_id, priority, metadata = fields
+    ticket = MatchTicket(player_id, username, skill_rating, metadata)
+    ticket.ticket_id = ticket_id
+    ticket.status = status
+    ticket.created_at = created_at
+    ticket.queued_at = queued_at
+    ticket.party_id = party_id
+    ticket.priority = priority
+    return ticket
+
+def encode_queue(queue: MatchQueue) -> tuple:
+    return (queue.queue_id, queue.config, queue.created_at,
+            [encode_ticket(ticket) for ticket in list(queue.tickets.values())])
+
+def encode_queue_header(queue: MatchQueue) -> tuple:
+    return (queue.queue_id, queue.config, queue.created_at)
+
+class SnapshotManager:
+    def __init__(self, engine, matcher, bot_manager=None, config: dict = None):
+        config = config or {}
+        self.engine = engine
+        self.matcher = matcher
+        self.bot_manager = bot_manager
+        self.directory = config.get('directory', 'snapshots')
+        self.interval = config.get('interval', 60)
+        self.flush_interval = config.get('flush_interval', 0.5)
+        self.compress_level = config.get('compress_level', 0)
+        self.fsync = config.get('fsync', False)
+        
+        self.sequence = 0
+        self.journal = None
+        self.dirty_lobbies = set()
+        self.dirty_parties = set()
+        self.dirty_queues = set()
+        self.dirty_tickets = set()
+        self.dirty_lock = threading.Lock()
+        self.journal_lock = threading.Lock()
+        self.snapshot_lock = threading.RLock()
+        self.stopped = threading.Event()
+        self.thread = None
+        
+        self.last_snapshot = {}
+        self.last_restore = {}
+        self.journal_records = 0
+    
+    def _on_event(self, event_data: dict):
+        data = event_data['data']
+        with self.dirty_lock:
+            if 'lobby_id' in data:
+                self.dirty_lobbies.add(data['lobby_id'])
+            if 'party_id' in data:
+                self.dirty_parties.add(data['party_id'])
+            if 'ticket_id' in data:
+                self.dirty_tickets.add((data['queue_id'], data['ticket_id']))
+            elif 'ticket_ids' in data:
+                self.dirty_tickets.update((data['queue_id'], ticket_id) for ticket_id in data['ticket_ids'])
+            elif 'queue_id' in data:
+                self.dirty_queues.add(data['queue_id'])
+    
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if self.journal is None:
+            self.journal = self._open_journal(self.sequence, append=True)
+        self.engine.event_bus.on('*', self._on_event, inline=True)
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        if not self.thread:
+            return
+        
+        self.stopped.set()
+        self.thread.join(timeout=30)
+        self.thread = None
+        self.engine.event_bus.off('*', self._on_event)
+        self.write_snapshot()
+        with self.journal_lock:
+            self.journal.close()
+            self.journal = None
+    
+    def _run(self):
+        next_snapshot = time.time() + self.interval
+        while not self.stopped.wait(self.flush_interval):
+            try:
+                self.flush_journal()
+                if time.time() >= next_snapshot:
+                    self.write_snapshot()
+                    next_snapshot = time.time() + self.interval
+            except Exception as e:
+                print(f"Snapshot error: {e}")
+    
+    def _snapshot_path(self, sequence: int) -> str:
+        return os.path.join(self.directory, f'snapshot_{sequence:08d}.bin')
+    
+    def _journal_path(self, sequence: int) -> str:
+        return os.path.join(self.directory, f'journal_{sequence:08d}.log')
+    
+    def _take_dirty(self) -> Tuple[set, set, set, set]:
+        with self.dirty_lock:
+            dirty = (self.dirty_lobbies, self.dirty_parties, self.dirty_queues, self.dirty_tickets)
+            self.dirty_lobbies, self.dirty_parties, self.dirty_queues, self.dirty_tickets = set(), set(), set(), set()
+        return dirty
+    
+    def _restore_dirty(self, dirty: Tuple[set, set, set, set]):
+        with self.dirty_lock:
+            for pending, taken in zip((self.dirty_lobbies, self.dirty_parties, self.dirty_queues, self.dirty_tickets),
+                                      dirty):
+                pending.update(taken)
+    
+    def _encode_ticket_record(self, queue_id: str, ticket_id: str) -> tuple:
+        queue = self.matcher.get_queue(queue_id)
+        ticket = queue.get_ticket(ticket_id) if queue else None
+        return ('ticket', (queue_id, ticket_id), encode_ticket(ticket) if ticket else None)
+    
+    def flush_journal(self) -> int:
+        with self.snapshot_lock:
+            dirty = self._take_dirty()
+            try:
+                return self._write_records(*dirty)
+            except Exception:
+                self._restore_dirty(dirty)
+                raise
+    
+    def _write_records(self, lobby_ids: set, party_ids: set, queue_ids: set, ticket_keys: set) -> int:
+        records = []
+        for lobby_id in lobby_ids:
+            lobby = self.engine.get_lobby(lobby_id)
+            records.append(('lobby', lobby_id, encode_lobby(lobby) if lobby else None))
+        for party_id in party_ids:
+            party = self.engine.get_party(party_id)
+            records.append(('party', party_id, encode_party(party) if party else None))
+        for queue_id in queue_ids:
+            queue = self.matcher.get_queue(queue_id)
+            records.append(('queue', queue_id, encode_queue_header(queue) if queue else None))
+        for queue_id, ticket_id in ticket_keys:
+            records.append(self._encode_ticket_record(queue_id, ticket_id))
+        if not records:
+            return 0
+        
+        chunks = []
+        for record in records:
+            payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+            chunks.append(FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        
+        with self.journal_lock:
+            if self.journal is None:
+                raise OSError("Snapshot journal is closed")
+            self.journal.write(b''.join(chunks))
+            self.journal.flush()
+            if self.fsync:
+                os.fsync(self.journal.fileno())
+            self.journal_records += len(records)
+        return len(records)
+    
+    def encode_state(self) -> dict:
+        return {
+            'lobbies': [encode_lobby(lobby) for lobby in list(self.engine.lobbies.values())],
+            'parties': [encode_party(party) for party in list(self.engine.parties.values())],
+            'queues': [encode_queue(queue) for queue in list(self.matcher.queues.values())]
+        }
+    
+    def write_snapshot(self) -> dict:
+        with self.snapshot_lock:
+            return self._write_snapshot()
+    
+    def _write_snapshot(self) -> dict:
+        start = time.perf_counter()
+        self.flush_journal()
+        sequence = self.sequence + 1
+        
+        state = self.encode_state()
+        payload = pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+        flags = 0
+        if self.compress_level:
+            payload = zlib.compress(payload, self.compress_level)
+            flags |= SNAPSHOT_COMPRESSED
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, sequence, zlib.crc32(payload),
+                                      len(payload))
+        
+        path = self._snapshot_path(sequence)
+        with open(path + '.tmp', 'wb') as f:
+            f.write(header)
+            f.write(payload)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+        
+        with self.journal_lock:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = self._open_journal(sequence)
+            self.sequence = sequence
+        
+        self._remove_older_than(sequence)
+        self.last_snapshot = {
+            'sequence': sequence,
+            'bytes': SNAPSHOT_HEADER.size + len(payload),
+            'lobbies': len(state['lobbies']),
+            'parties': len(state['parties']),
+            'queues': len(state['queues']),
+            'seconds': time.perf_counter() - start,
+            'written_at': time.time()
+        }
+        return self.last_snapshot
+    
+    def _remove_older_than(self, sequence: int):
+        for name in os.listdir(self.directory):
+            if not name.endswith(('.bin', '.log')) or '_' not in name:
+                continue
+            try:
+                number = int(name.rsplit('_', 1)[1].split('.', 1)[0])
+            except ValueError:
+                continue
+            if number < sequence:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError as e:
+                    print(f"Snapshot cleanup error: {e}")
+    
+    def _find_latest(self) -> Tuple[Optional[int], List[int]]:
+        snapshots, journals = [], []
+        for name in os.listdir(self.directory):
+            if name.startswith('snapshot_') and name.endswith('.bin'):
+                snapshots.append(int(name[len('snapshot_'):-len('.bin')]))
+            elif name.startswith('journal_') and name.endswith('.log'):
+                journals.append(int(name[len('journal_'):-len('.log')]))
+        return (max(snapshots) if snapshots else None), sorted(journals)
+    
+    def _read_snapshot(self, sequence: int) -> Optional[dict]:
+        with open(self._snapshot_path(sequence), 'rb') as f:
+            header = f.read(SNAPSHOT_HEADER.size)
+            if len(header) < SNAPSHOT_HEADER.size:
+                return None
+            magic, version, flags, stored_sequence, crc, length = SNAPSHOT_HEADER.unpack(header)
+            payload = f.read(length)
+        
+        if magic != SNAPSHOT_MAGIC or len(payload) != length:
+            return None
+        if version != SNAPSHOT_VERSION:
+            print(f"Snapshot {sequence} has format version {version}, expected {SNAPSHOT_VERSION}; ignoring it")
+            return None
+        if zlib.crc32(payload) != crc:
+            return None
+        if flags & SNAPSHOT_COMPRESSED:
+            payload = zlib.decompress(payload)
+        return pickle.loads(payload)
+    
+    def _journal_matches(self, sequence: int) -> bool:
+        try:
+            with open(self._journal_path(sequence), 'rb') as f:
+                header = f.read(JOURNAL_HEADER.size)
+        except FileNotFoundError:
+            return False
+        return len(header) == JOURNAL_HEADER.size and JOURNAL_HEADER.unpack(header) == (JOURNAL_MAGIC, SNAPSHOT_VERSION)
+    
+    def _open_journal(self, sequence: int, append: bool = False):
+        if append and self._journal_matches(sequence):
+            return open(self._journal_path(sequence), 'ab')
+        
+        journal = open(self._journal_path(sequence), 'wb')
+        journal.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, SNAPSHOT_VERSION))
+        journal.flush()
+        return journal
+    
+    def _read_journal(self, sequence: int) -> Iterator[tuple]:
+        if not self._journal_matches(sequence):
+            print(f"Journal {sequence} has a different format version; ignoring it")
+            return
+        with open(self._journal_path(sequence), 'rb') as f:
+            data = f.read()
+        
+        offset = JOURNAL_HEADER.size
+        while offset + FRAME_HEADER.size <= len(data):
+            length, crc = FRAME_HEADER.unpack_from(data, offset)
+            start = offset + FRAME_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return
+            yield pickle.loads(payload)
+            offset = start + length
+    
+    def restore(self) -> dict:
+        start = time.perf_counter()
+        os.makedirs(self.directory, exist_ok=True)
+        sequence, journals = self._find_latest()
+        
+        state = self._read_snapshot(sequence) if sequence is not None else None
+        if state is None:
+            sequence = journals[-1] if journals else 0
+            state = {'lobbies': [], 'parties': [], 'queues': []}
+        lobbies = {fields[0]: fields for fields in state['lobbies']}
+        parties = {fields[0]: fields for fields in state['parties']}
+        queues = {fields[0]: fields[:3] for fields in state['queues']}
+        tickets: Dict[str, Dict[str, tuple]] = {
+            fields[0]: {ticket[0]: ticket for ticket in fields[3]} for fields in state['queues']
+        }
+        
+        replayed = 0
+        if sequence in journals:
+            targets = {'lobby': lobbies, 'party': parties}
+            for kind, key, fields in self._read_journal(sequence):
+                if kind == 'ticket':
+                    self._replay_ticket(queues, tickets, key, fields)
+                elif kind == 'queue':
+                    self._replay_queue(queues, tickets, key, fields)
+                elif fields is None:
+                    targets[kind].pop(key, None)
+                else:
+                    targets[kind][key] = fields
+                replayed += 1
+        
+        for fields in lobbies.values():
+            self._restore_lobby(fields)
+        for fields in parties.values():
+            self.engine.restore_party(decode_party(fields))
+        for queue_id, config, created_at in queues.values():
+            queue = MatchQueue(queue_id, config)
+            queue.created_at = created_at
+            queue.restore_tickets([decode_ticket(ticket) for ticket in tickets.get(queue_id, {}).values()])
+            self.matcher.restore_queue(queue)
+        
+        self.sequence = sequence
+        with self.journal_lock:
+            self.journal = self._open_journal(sequence, append=True)
+        self.last_restore = {
+            'sequence': sequence,
+            'lobbies': len(lobbies),
+            'parties': len(parties),
+            'queues': len(queues),
+            'journal_records': replayed,
+            'seconds': time.perf_counter() - start
+        }
+        return self.last_restore
+    
+    def _replay_queue(self, queues: dict, tickets: dict, queue_id: str, fields: Optional[tuple]):
+        if fields is None:
+            queues.pop(queue_id, None)
+            tickets.pop(queue_id, None)
+            return
+        
+        queues[queue_id] = fields[:3]
+        if len(fields) > 3:
+            tickets[queue_id] = {ticket[0]: ticket for ticket in fields[3]}
+    
+    def _replay_ticket(self, queues: dict, tickets: dict, key: Tuple[str, str], fields: Optional[tuple]):
+        queue_id, ticket_id = key
+        if fields is None:
+            tickets.get(queue_id, {}).pop(ticket_id, None)
+            return
+        
+        if queue_id not in queues:
+            queue = self.matcher.get_queue(queue_id)
+            if queue is None:
+                return
+            queues[queue_id] = encode_queue_header(queue)
+        tickets.setdefault(queue_id, {})[ticket_id] = fields
+    
+    def _restore_lobby(self, fields: tuple):
+        lobby_id, config, state, version, created_at, metadata, players, bots = fields
+        bots = [decode_bot(bot) for bot in bots]
+        self.engine.restore_lobby(lobby_id, config, [decode_player(player) for player in players], bots,
+                                  state, version, created_at, metadata)
+        if self.bot_manager:
+            for bot in bots:
+                self.bot_manager.active_bots[bot.bot_id] = bot
+    
+    def get_stats(self) -> dict:
+        with self.dirty_lock:
+            dirty = len(self.dirty_lobbies) + len(self.dirty_parties) + len(self.dirty_queues) + len(self.dirty_tickets)
+        return {
+            'directory': self.directory,
+            'sequence': self.sequence,
+            'interval': self.interval,
+            'dirty': dirty,
+            'journal_records': self.journal_records,
+            'last_snapshot': self.last_snapshot,
+            'last_restore': self.last_restore
+        }
\ No newline at end of file
@@ -1,5 +1,5 @@
 import sqlite3
-from typing import Optional, List
+from typing import Dict, Optional, List
 from .base import StorageBackend
 
 class SQLiteStore(StorageBackend):
@@ -39,6 +39,20 @@ class SQLiteStore(StorageBackend):
             print(f"SQLite set error: {e}")
             return False
     
+    def set_many(self, items: Dict[str, Optional[str]]) -> bool:
+        updates = [(key, value) for key, value in items.items() if value is not None]
+        deletes = [(key,) for key, value in items.items() if value is None]
+        try:
+            with self.conn:
+                if updates:
+                    self.conn.executemany('INSERT OR REPLACE INTO storage (key, value) VALUES (?, ?)', updates)
+                if deletes:
+                    self.conn.executemany('DELETE FROM storage WHERE key = ?', deletes)
+            return True
+        except Exception as e:
+            print(f"SQLite set_many error: {e}")
+            return False
+    
     def get(self, key: str) -> Optional[str]:
         try:
             self.cursor.execute('SELECT value FROM storage WHERE key = ?', (key,))
@@ -0,0 +1,40 @@
+import gc
+import os
+import sys
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.player import Player
+from core.bot import Bot
+from core.party import Party
+from matchmaking.tickets import MatchTicket
+
+SIZES = [100_000, 1_000_000]
+
+FACTORIES = {
+    'Player': lambda i: Player(f'player_{i}', f'Player{i}'),
+    'Bot': lambda i: Bot(f'bot_{i}', {'username': f'Bot{i}'}),
+    'MatchTicket': lambda i: MatchTicket(f'player_{i}', f'Player{i}', 1000 + i % 1000),
+    'Party': lambda i: Party(f'party_{i}', f'player_{i}')
+}
+
+def measure(factory, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    
+    entities = [factory(i) for i in range(count)]
+    
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del entities
+    gc.collect()
+    return used / count
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    
+    print(f"{'entity':<12}" + ''.join(f"{f'{size:,} objs':>16}" for size in sizes))
+    for name, factory in FACTORIES.items():
+        row = [measure(factory, size) for size in sizes]
+        print(f"{name:<12}" + ''.join(f"{f'{value:,.0f} B/obj':>16}" for value in row))
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.engine import LobbyEngine
+from core.player import Player
+from core.bot import Bot
+
+THREADS = 8
+LOBBIES_PER_THREAD = 200
+PLAYERS_PER_LOBBY = 10
+BACKGROUND_LOBBIES = 5000
+BOTS_PER_BACKGROUND_LOBBY = 4
+SLOW_SWEEP_SECONDS = 0.005
+
+def build_engine(concurrency: str) -> LobbyEngine:
+    engine = LobbyEngine({'engine': {'concurrency': concurrency, 'lock_stripes': 16}})
+    
+    for i in range(BACKGROUND_LOBBIES):
+        lobby_id = f'background_{i}'
+        engine.create_lobby(lobby_id, {'max_players': 10, 'max_bots': BOTS_PER_BACKGROUND_LOBBY})
+        for j in range(BOTS_PER_BACKGROUND_LOBBY):
+            engine.add_bot_to_lobby(lobby_id, Bot(f'bot_{i}_{j}', {'ready_delay': 3600}))
+    
+    slow_lobby = engine.create_lobby('slow_lobby', {})
+    slow_lobby.to_dict = lambda: time.sleep(SLOW_SWEEP_SECONDS) or {}
+    
+    return engine
+
+def worker(engine: LobbyEngine, thread_id: int, latencies: list):
+    samples = []
+    for i in range(LOBBIES_PER_THREAD):
+        lobby_id = f'bench_{thread_id}_{i}'
+        engine.create_lobby(lobby_id, {'max_players': PLAYERS_PER_LOBBY})
+        
+        for j in range(PLAYERS_PER_LOBBY):
+            player = Player(f'player_{thread_id}_{i}_{j}', f'Player{j}')
+            start = time.perf_counter()
+            engine.add_player_to_lobby(lobby_id, player)
+            samples.append(time.perf_counter() - start)
+        
+        for j in range(PLAYERS_PER_LOBBY):
+            start = time.perf_counter()
+            engine.set_player_ready(lobby_id, f'player_{thread_id}_{i}_{j}', True)
+            samples.append(time.perf_counter() - start)
+    
+    latencies[thread_id] = samples
+
+def run(concurrency: str) -> dict:
+    engine = build_engine(concurrency)
+    latencies = [[] for _ in range(THREADS)]
+    done = threading.Event()
+    ticks = [0]
+    
+    def ticker():
+        while not done.is_set():
+            engine.get_all_lobbies()
+            ticks[0] += 1
+    
+    tick_thread = threading.Thread(target=ticker, daemon=True)
+    threads = [threading.Thread(target=worker, args=(engine, i, latencies)) for i in range(THREADS)]
+    
+    tick_thread.start()
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    tick_thread.join()
+    
+    samples = sorted(sample for thread_samples in latencies for sample in thread_samples)
+    return {
+        'mode': concurrency,
+        'ops': len(samples),
+        'seconds': elapsed,
+        'ops_per_second': len(samples) / elapsed,
+        'p50_ms': samples[len(samples) // 2] * 1000,
+        'p99_ms': samples[int(len(samples) * 0.99)] * 1000,
+        'max_ms': samples[-1] * 1000,
+        'ticks': ticks[0]
+    }
+
+if __name__ == '__main__':
+    print(f"Join/ready contention: {THREADS} threads, {LOBBIES_PER_THREAD} lobbies each, "
+          f"{BACKGROUND_LOBBIES} background lobbies and one {SLOW_SWEEP_SECONDS * 1000:.0f} ms lobby swept by get_all_lobbies()")
+    print()
+    
+    results = [run('global'), run('striped')]
+    for result in results:
+        print(f"{result['mode']:>8}: {result['ops']} ops in {result['seconds']:.2f}s "
+              f"= {result['ops_per_second']:,.0f} ops/s, p50 {result['p50_ms']:.3f} ms, "
+              f"p99 {result['p99_ms']:.3f} ms, max {result['max_ms']:.1f} ms ({result['ticks']} ticks)")
+    
+    speedup = results[1]['ops_per_second'] / results[0]['ops_per_second']
+    print(f"\nstriped vs global: {speedup:.2f}x")
\ No newline at end of file
@@ -0,0 +1,91 @@
+import os
+import random
+import statistics
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.engine import LobbyEngine
+from matchmaking.matcher import Matcher
+from matchmaking.queues import MatchQueue
+from matchmaking.tickets import MatchTicket
+
+SIZES = [30, 100, 300, 1000, 10000, 100000]
+QUEUE_CONFIGS = {
+    'ranked': {'players_per_match': 10, 'max_skill_diff': 100},
+    'quick': {'players_per_match': 6, 'max_skill_diff': 500}
+}
+TRIALS = 20
+ROUNDS = 500
+ARRIVALS_PER_ROUND = 20
+
+def stride_find_matches(queue: MatchQueue):
+    skills = queue.skills
+    tickets = queue.ordered
+    size = queue.players_per_match
+    matches = []
+    for i in range(0, len(tickets) - size + 1, size):
+        if skills[i + size - 1] - skills[i] <= queue.max_skill_diff:
+            matches.append(tickets[i:i + size])
+    return matches
+
+def summarize(matches) -> tuple:
+    spreads = [group[-1].skill_rating - group[0].skill_rating for group in matches]
+    return len(matches), statistics.mean(spreads) if spreads else 0.0
+
+def build_queue(queue_id: str, config: dict, size: int) -> MatchQueue:
+    queue = MatchQueue(queue_id, config)
+    queue.restore_tickets([
+        MatchTicket(f'player_{i}', f'Player{i}', int(random.gauss(1500, 300))) for i in range(size)
+    ])
+    return queue
+
+def run(matcher: Matcher, name: str, config: dict, size: int):
+    results = {'stride': [], 'sliding': []}
+    timings = {'stride': 0.0, 'sliding': 0.0}
+    for _ in range(TRIALS):
+        queue = build_queue(name, config, size)
+        for label, finder in (('stride', stride_find_matches), ('sliding', matcher._find_matches)):
+            start = time.perf_counter()
+            matches = finder(queue)
+            timings[label] += time.perf_counter() - start
+            results[label].append(summarize(matches))
+    
+    row = [f"{name:<7}{size:>8}"]
+    for label in ('stride', 'sliding'):
+        count = statistics.mean(r[0] for r in results[label])
+        spread = statistics.mean(r[1] for r in results[label])
+        row.append(f"{label} {count:9.1f} matches  spread {spread:6.1f}  {timings[label] / TRIALS * 1000:7.2f} ms")
+    
+    print('   '.join(row))
+
+def run_steady(matcher: Matcher, name: str, config: dict):
+    row = [f"{name:<7}"]
+    for label, finder in (('stride', stride_find_matches), ('sliding', matcher._find_matches)):
+        random.seed(11)
+        queue = MatchQueue(name, config)
+        matched = []
+        backlog = 0
+        for round_number in range(ROUNDS):
+            for i in range(ARRIVALS_PER_ROUND):
+                queue.add_ticket(MatchTicket(f'{round_number}_{i}', 'Player', int(random.gauss(1500, 300))))
+            matches = finder(queue)
+            queue.remove_tickets([ticket.ticket_id for group in matches for ticket in group])
+            matched.extend(matches)
+            backlog += queue.get_queue_length()
+        
+        count, spread = summarize(matched)
+        row.append(f"{label} {count:6d} matches  spread {spread:6.1f}  backlog {backlog / ROUNDS:7.1f}")
+    print('   '.join(row))
+
+if __name__ == '__main__':
+    random.seed(7)
+    matcher = Matcher(LobbyEngine({'events': {'async_dispatch': False}}))
+    print(f"Skill ratings ~ N(1500, 300), mean of {TRIALS} queues per row\n")
+    for name, config in QUEUE_CONFIGS.items():
+        for size in SIZES:
+            run(matcher, name, config, size)
+    
+    print(f"\nSteady state: {ARRIVALS_PER_ROUND} arrivals per pass for {ROUNDS} passes, mean queue length after each pass\n")
+    for name, config in QUEUE_CONFIGS.items():
+        run_steady(matcher, name, config)
\ No newline at end of file
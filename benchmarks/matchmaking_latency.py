@@ -0,0 +1,51 @@
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.engine import LobbyEngine
+from matchmaking.matcher import Matcher
+from matchmaking.tickets import MatchTicket
+
+MATCHES = 20
+PLAYERS_PER_MATCH = 10
+QUEUE_CONFIG = {'players_per_match': PLAYERS_PER_MATCH, 'max_skill_diff': 200}
+ENGINE_CONFIG = {'events': {'async_dispatch': False}}
+
+class FixedTickMatcher(Matcher):
+    def _mark_dirty(self, queue_id: str):
+        pass
+
+def run(matcher_class, label: str):
+    engine = LobbyEngine(ENGINE_CONFIG)
+    matcher = matcher_class(engine, {'tick_rate': 1.0})
+    matcher.create_queue('bench', QUEUE_CONFIG)
+    
+    matched = threading.Event()
+    engine.event_bus.on('match_created', lambda event_data: matched.set())
+    matcher.start()
+    
+    latencies = []
+    for m in range(MATCHES):
+        matched.clear()
+        for p in range(PLAYERS_PER_MATCH):
+            ticket = MatchTicket(f'{label}_{m}_{p}', f'Player{p}', 1000 + random.randint(0, 100))
+            matcher.add_ticket('bench', ticket)
+        queued = time.perf_counter()
+        matched.wait(timeout=5)
+        latencies.append(time.perf_counter() - queued)
+        time.sleep(random.uniform(0, 0.1))
+    matcher.stop()
+    
+    stats = matcher.get_stats()
+    print(f"{label:<22} median {statistics.median(latencies) * 1000:8.2f} ms   "
+          f"p95 {sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000:8.2f} ms   "
+          f"passes {stats['passes']:5d}   sweeps {stats['sweeps']:3d}")
+
+if __name__ == '__main__':
+    print(f"Time from the last ticket of a match being queued to match_created ({MATCHES} matches)\n")
+    run(FixedTickMatcher, 'fixed 1.0 s tick')
+    run(Matcher, 'ticket wakeups')
\ No newline at end of file
@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.engine import LobbyEngine
+from matchmaking.matcher import Matcher
+from matchmaking.queues import MatchQueue
+from matchmaking.tickets import MatchTicket
+
+SIZES = [1000, 10000, 100000]
+SCENARIOS = [('waiting', 200), ('dense', 0.03)]
+PASSES = 20
+QUEUE_CONFIG = {'players_per_match': 10, 'max_skill_diff': 100}
+
+def legacy_find_matches(queue: MatchQueue):
+    current_time = time.time()
+    tickets = []
+    for ticket in queue.tickets.values():
+        if ticket.status == 'queued':
+            if current_time - ticket.queued_at > queue.max_wait_time:
+                ticket.status = 'timeout'
+            else:
+                tickets.append(ticket)
+    
+    matches = []
+    sorted_tickets = sorted(tickets, key=lambda t: t.skill_rating)
+    size = queue.players_per_match
+    for i in range(0, len(sorted_tickets) - size + 1, size):
+        group = sorted_tickets[i:i + size]
+        if max(t.skill_rating for t in group) - min(t.skill_rating for t in group) <= queue.max_skill_diff:
+            matches.append(group)
+    return matches
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def run(size: int, spread: float, matcher: Matcher):
+    queue = MatchQueue(f'bench_{size}', QUEUE_CONFIG)
+    tickets = [MatchTicket(f'player_{i}', f'Player{i}', random.randint(0, int(spread * size))) for i in range(size)]
+    
+    start = time.perf_counter()
+    for ticket in tickets:
+        queue.add_ticket(ticket)
+    insert_us = (time.perf_counter() - start) / size * 1e6
+    
+    assert [len(g) for g in legacy_find_matches(queue)] == [len(g) for g in matcher._find_matches(queue)]
+    legacy_ms = timed(lambda: legacy_find_matches(queue), PASSES)
+    idle_ms = timed(lambda: matcher._find_matches(queue), PASSES)
+    
+    def changed_pass():
+        ticket = MatchTicket('churn', 'Churn', random.randint(0, int(spread * size)))
+        queue.add_ticket(ticket)
+        matcher._find_matches(queue)
+        queue.remove_ticket(ticket.ticket_id)
+    changed_ms = timed(changed_pass, PASSES)
+    
+    matches = len(matcher._find_matches(queue))
+    start = time.perf_counter()
+    for ticket in tickets[:1000]:
+        queue.remove_ticket(ticket.ticket_id)
+    remove_us = (time.perf_counter() - start) / 1000 * 1e6
+    
+    print(f"{size:>8} tickets ({matches:>5} groups)   legacy pass {legacy_ms:8.2f} ms   indexed pass {idle_ms:7.2f} ms   "
+          f"after change {changed_ms:7.2f} ms   insert {insert_us:5.2f} us   remove {remove_us:5.2f} us")
+
+if __name__ == '__main__':
+    matcher = Matcher(LobbyEngine({'events': {'async_dispatch': False}}))
+    for label, spread in SCENARIOS:
+        print(f"{label} queue: skill ratings spread over {spread} x queue size")
+        for size in SIZES:
+            run(size, spread, matcher)
\ No newline at end of file
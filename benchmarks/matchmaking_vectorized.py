@@ -0,0 +1,143 @@
+import gc
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.engine import LobbyEngine
+from matchmaking import vectorized
+from matchmaking.matcher import Matcher
+from matchmaking.queues import MatchQueue
+from matchmaking.tickets import MatchTicket
+
+SIZES = [10000, 100000, 1000000]
+ANCHOR_SIZE_LIMIT = 100000
+CORPUS_SIZES = [0, 9, 10, 57, 500, 3000]
+CORPUS_SEEDS = range(8)
+QUEUE_CONFIGS = {
+    'ranked': {'players_per_match': 10, 'max_skill_diff': 100, 'team_mode': True, 'team_size': 5},
+    'quick': {'players_per_match': 6, 'max_skill_diff': 500},
+    'duel': {'players_per_match': 2, 'max_skill_diff': 25, 'team_mode': True, 'team_size': 1},
+    'expanding': {
+        'players_per_match': 10, 'max_skill_diff': 100, 'team_mode': True, 'team_size': 5,
+        'max_wait_time': 3600, 'priority_enabled': True,
+        'expansion_delay': 60, 'expansion_rate': 2.0, 'max_expanded_diff': 300
+    }
+}
+NOW = 1000000.0
+CORPUS_PASSES = [0, 45, 90, 180]
+TRIALS = 5
+LARGE_TRIALS = 3
+
+def build_tickets(size: int, integer: bool = True, now: float = NOW, spread: float = 240, first: int = 0):
+    tickets = []
+    for i in range(first, first + size):
+        skill = random.gauss(1500, 300)
+        ticket = MatchTicket(f'player_{i}', f'Player{i}', int(skill) if integer else skill)
+        ticket.queued_at = now - random.uniform(0, spread)
+        ticket.priority = 1 if random.random() < 0.02 else 0
+        tickets.append(ticket)
+    return tickets
+
+def build_queue(name: str, config: dict, tickets) -> MatchQueue:
+    queue = MatchQueue(name, config)
+    queue.restore_tickets(tickets)
+    return queue
+
+def team_ids(teams):
+    return [[ticket.ticket_id for ticket in team] for team in teams]
+
+def corpus_arrivals(size: int, seed: int):
+    random.seed(seed)
+    arrivals = [build_tickets(size, integer=seed % 2 == 0)]
+    first = size
+    for previous, offset in zip(CORPUS_PASSES, CORPUS_PASSES[1:]):
+        count = size // 10 + 5
+        arrivals.append(build_tickets(count, seed % 2 == 0, NOW + offset, offset - previous, first))
+        first += count
+    return arrivals
+
+def run_passes(matcher: Matcher, queue: MatchQueue, arrivals):
+    passes = []
+    for offset, tickets in zip(CORPUS_PASSES, arrivals):
+        queue.restore_tickets(tickets)
+        groups = matcher._find_matches(queue, NOW + offset)
+        queue.remove_tickets([ticket.ticket_id for group in groups for ticket in group])
+        passes.append(groups)
+    return passes
+
+def check_corpus(python_matcher: Matcher, numpy_matcher: Matcher) -> int:
+    cases = 0
+    for name, config in QUEUE_CONFIGS.items():
+        for size in CORPUS_SIZES:
+            for seed in CORPUS_SEEDS:
+                arrivals = corpus_arrivals(size, seed)
+                expected_passes = run_passes(python_matcher, MatchQueue(name, config), arrivals)
+                actual_passes = run_passes(numpy_matcher, MatchQueue(name, config), arrivals)
+                for expected, actual in zip(expected_passes, actual_passes):
+                    assert [team_ids([g]) for g in expected] == [team_ids([g]) for g in actual], (name, size, seed)
+                    
+                    if config.get('team_mode'):
+                        balanced = vectorized.balance_teams(actual, config['team_size'])
+                        for group, teams in zip(expected, balanced):
+                            assert team_ids(python_matcher.balancer.balance_teams(group, config['team_size'])) == team_ids(teams), (name, size, seed)
+                cases += 1
+    return cases
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+def run(python_matcher: Matcher, numpy_matcher: Matcher, name: str, config: dict, size: int):
+    random.seed(size)
+    tickets = build_tickets(size)
+    trials = TRIALS if size < max(SIZES) else LARGE_TRIALS
+    timings = {label: [] for label in ('python', 'numpy', 'numpy_warm', 'balance_python', 'balance_numpy')}
+    gc.collect()
+    gc.disable()
+    for _ in range(trials):
+        expected, elapsed = timed(python_matcher._find_matches, build_queue(name, config, tickets), NOW)
+        timings['python'].append(elapsed)
+        queue = build_queue(name, config, tickets)
+        actual, elapsed = timed(numpy_matcher._find_matches, queue, NOW)
+        timings['numpy'].append(elapsed)
+        _, elapsed = timed(numpy_matcher._find_matches, queue, NOW)
+        timings['numpy_warm'].append(elapsed)
+        assert len(expected) == len(actual)
+        
+        if config.get('team_mode'):
+            team_size = config['team_size']
+            _, elapsed = timed(lambda: [python_matcher.balancer.balance_teams(group, team_size) for group in expected])
+            timings['balance_python'].append(elapsed)
+            _, elapsed = timed(vectorized.balance_teams, actual, team_size)
+            timings['balance_numpy'].append(elapsed)
+    
+    gc.enable()
+    
+    timings = {label: min(values) if values else 0.0 for label, values in timings.items()}
+    row = (f"{name:<10}{size:>9}{len(expected):>8} matches   find python {timings['python']:8.1f} ms"
+           f"  numpy {timings['numpy']:7.1f} ms (arrays kept {timings['numpy_warm']:6.1f} ms)")
+    if config.get('team_mode'):
+        row += f"   balance python {timings['balance_python']:7.1f} ms  numpy {timings['balance_numpy']:6.1f} ms"
+    print(row)
+
+if __name__ == '__main__':
+    if not vectorized.NUMPY_AVAILABLE:
+        sys.exit('numpy is not installed: pip install numpy')
+    
+    engine = LobbyEngine({'events': {'async_dispatch': False}})
+    python_matcher = Matcher(engine, {'vectorize_threshold': 0})
+    numpy_matcher = Matcher(engine, {'vectorize_threshold': 1})
+    
+    cases = check_corpus(python_matcher, numpy_matcher)
+    print(f"Corpus: {cases} queues over {len(CORPUS_PASSES)} passes with arrivals, identical groups and teams on both paths\n")
+    
+    print(f"Skill ratings ~ N(1500, 300), enqueue times spread over the last 4 minutes, 2% priority, best of {TRIALS} trials ({LARGE_TRIALS} at {max(SIZES)})\n")
+    for name, config in QUEUE_CONFIGS.items():
+        for size in SIZES:
+            if config.get('expansion_rate') and size > ANCHOR_SIZE_LIMIT:
+                print(f"{name:<10}{size:>9}   skipped, a restored queue this old makes nearly every ticket an anchor")
+                continue
+            run(python_matcher, numpy_matcher, name, config, size)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import os
+import random
+import statistics
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.engine import LobbyEngine
+from matchmaking.matcher import Matcher
+from matchmaking.queues import MatchQueue
+from matchmaking.tickets import MatchTicket
+
+SECONDS = 3600
+ARRIVALS_PER_SECOND = 2.0
+PRIORITY_SHARE = 0.05
+BASE_CONFIG = {'players_per_match': 10, 'max_skill_diff': 100, 'max_wait_time': 600, 'priority_enabled': True}
+EXPANSION = {'expansion_delay': 60, 'expansion_rate': 2.0, 'max_expanded_diff': 300}
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def simulate(matcher: Matcher, config: dict, seed: int) -> dict:
+    random.seed(seed)
+    queue = MatchQueue('bench', config)
+    waits = []
+    priority_waits = []
+    spreads = []
+    timeouts = 0
+    for now in range(SECONDS):
+        arrivals = []
+        for i in range(int(ARRIVALS_PER_SECOND) + (random.random() < ARRIVALS_PER_SECOND % 1)):
+            ticket = MatchTicket(f'{now}_{i}', 'Player', int(random.gauss(1500, 300)))
+            ticket.queued_at = float(now)
+            ticket.priority = 1 if random.random() < PRIORITY_SHARE else 0
+            arrivals.append(ticket)
+        queue.restore_tickets(arrivals)
+        
+        before = set(queue.indexed)
+        matches = matcher._find_matches(queue, float(now))
+        timeouts += len(before) - len(queue.indexed)
+        for group in matches:
+            spreads.append(max(t.skill_rating for t in group) - min(t.skill_rating for t in group))
+            for ticket in group:
+                waits.append(now - ticket.queued_at)
+                if ticket.priority:
+                    priority_waits.append(now - ticket.queued_at)
+        queue.remove_tickets([ticket.ticket_id for group in matches for ticket in group])
+    
+    return {
+        'matched': len(waits),
+        'timeouts': timeouts,
+        'p50': percentile(waits, 0.5),
+        'p99': percentile(waits, 0.99),
+        'priority_p50': percentile(priority_waits, 0.5),
+        'spread_p50': statistics.median(spreads) if spreads else 0.0,
+        'spread_mean': statistics.mean(spreads) if spreads else 0.0
+    }
+
+if __name__ == '__main__':
+    matcher = Matcher(LobbyEngine({'events': {'async_dispatch': False}}))
+    print(f"{SECONDS} simulated seconds, {ARRIVALS_PER_SECOND} arrivals/s, skill ~ N(1500, 300), "
+          f"{BASE_CONFIG['players_per_match']} per match, max_skill_diff {BASE_CONFIG['max_skill_diff']}\n")
+    for label, config in (('fixed window', BASE_CONFIG), ('wait expansion', dict(BASE_CONFIG, **EXPANSION))):
+        r = simulate(matcher, config, seed=3)
+        print(f"{label:<16} matched {r['matched']:5d}  timeouts {r['timeouts']:4d}  "
+              f"wait p50 {r['p50']:5.0f} s  p99 {r['p99']:5.0f} s  priority p50 {r['priority_p50']:5.0f} s  "
+              f"spread p50 {r['spread_p50']:5.0f}  mean {r['spread_mean']:5.1f}")
\ No newline at end of file
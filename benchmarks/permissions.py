@@ -0,0 +1,79 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.permissions import Permission, PermissionManager
+
+PLAYERS = 200_000
+CHECKS = 2_000_000
+ROLES = ['player', 'player', 'player', 'moderator', 'admin']
+
+class SetPermissionManager:
+    def __init__(self, role_permissions: dict):
+        self.player_permissions = {}
+        self.role_permissions = role_permissions
+    
+    def assign_role(self, player_id: str, role: str):
+        if role in self.role_permissions:
+            self.player_permissions[player_id] = self.role_permissions[role].copy()
+    
+    def has_permission(self, player_id: str, permission: str) -> bool:
+        if player_id in self.player_permissions:
+            return permission in self.player_permissions[player_id]
+        return False
+
+def build_set_manager() -> SetPermissionManager:
+    reference = PermissionManager()
+    return SetPermissionManager({
+        name: reference.to_names(role.mask) for name, role in reference.roles.items()
+    })
+
+def populate(manager, count: int):
+    for i in range(count):
+        manager.assign_role(f'player_{i}', ROLES[i % len(ROLES)])
+        if i % 50 == 0 and hasattr(manager, 'grant_permission'):
+            manager.grant_permission(f'player_{i}', Permission.START_MATCH)
+
+def measure_memory(factory, count: int) -> float:
+    player_ids = [f'player_{i}' for i in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    
+    manager = factory()
+    populate(manager, count)
+    
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del manager, player_ids
+    gc.collect()
+    return used / count
+
+def measure_checks(manager, count: int) -> float:
+    player_ids = [f'player_{i % PLAYERS}' for i in range(0, count * 7, 7)]
+    permissions = [Permission.KICK_PLAYER, Permission.ADMIN, Permission.ADD_BOT, Permission.VIEW_ANALYTICS]
+    has_permission = manager.has_permission
+    
+    start = time.perf_counter()
+    for index, player_id in enumerate(player_ids):
+        has_permission(player_id, permissions[index & 3])
+    elapsed = time.perf_counter() - start
+    return count / elapsed
+
+if __name__ == '__main__':
+    factories = {
+        'set copy': build_set_manager,
+        'bitmask': PermissionManager
+    }
+    
+    print(f"{PLAYERS:,} players, {CHECKS:,} checks")
+    print(f"{'manager':<10}{'checks/s':>16}{'bytes/player':>16}")
+    for name, factory in factories.items():
+        memory = measure_memory(factory, PLAYERS)
+        manager = factory()
+        populate(manager, PLAYERS)
+        throughput = measure_checks(manager, CHECKS)
+        print(f"{name:<10}{throughput:>16,.0f}{memory:>16,.0f}")
\ No newline at end of file
@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.engine import LobbyEngine
+from core.player import Player
+from core.sharding import ShardedEngine
+
+SHARD_COUNTS = [1, 2, 4, 8]
+CLIENT_THREADS = 32
+LOBBIES_PER_THREAD = 100
+PLAYERS_PER_LOBBY = 8
+ENGINE_CONFIG = {'engine': {'concurrency': 'striped'}, 'events': {'async_dispatch': False}}
+
+def client(engine, thread_id: int, counts: list):
+    ops = 0
+    for i in range(LOBBIES_PER_THREAD):
+        lobby_id = f'bench_{thread_id}_{i}'
+        engine.create_lobby(lobby_id, {'max_players': PLAYERS_PER_LOBBY})
+        ops += 1
+        
+        for j in range(PLAYERS_PER_LOBBY):
+            engine.add_player_to_lobby(lobby_id, Player(f'player_{thread_id}_{i}_{j}', f'Player{j}'))
+            ops += 1
+        
+        engine.set_ready_many(lobby_id, [f'player_{thread_id}_{i}_{j}' for j in range(PLAYERS_PER_LOBBY)], True)
+        ops += 1
+    counts[thread_id] = ops
+
+def run(engine) -> float:
+    counts = [0] * CLIENT_THREADS
+    threads = [threading.Thread(target=client, args=(engine, t, counts)) for t in range(CLIENT_THREADS)]
+    
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(counts) / elapsed
+
+if __name__ == '__main__':
+    total = CLIENT_THREADS * LOBBIES_PER_THREAD * (PLAYERS_PER_LOBBY + 2)
+    print(f"{CLIENT_THREADS} client threads, {total:,} ops per run, {os.cpu_count()} cpus")
+    
+    baseline = run(LobbyEngine(ENGINE_CONFIG))
+    print(f"{'in-process':>12}: {baseline:>10,.0f} ops/s")
+    
+    single = None
+    for count in SHARD_COUNTS:
+        shards = ShardedEngine(ENGINE_CONFIG, {'shards': count})
+        shards.start()
+        try:
+            throughput = run(shards)
+        finally:
+            shards.stop()
+        
+        single = single or throughput
+        print(f"{f'{count} shards':>12}: {throughput:>10,.0f} ops/s  ({throughput / single:.2f}x vs 1 shard)")
\ No newline at end of file
@@ -0,0 +1,76 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from core.engine import LobbyEngine
+from core.player import Player
+from matchmaking.matcher import Matcher
+from matchmaking.tickets import MatchTicket
+from storage.snapshots import SnapshotManager
+
+LOBBIES = 100000
+PLAYERS_PER_LOBBY = 4
+QUEUED_TICKETS = 10000
+JOURNALED_LOBBIES = 1000
+COMPRESS_LEVELS = [0, 1]
+ENGINE_CONFIG = {'engine': {'concurrency': 'striped'}, 'events': {'async_dispatch': False}, 'event_log': {}}
+
+def build():
+    engine = LobbyEngine(ENGINE_CONFIG)
+    matcher = Matcher(engine)
+    for i in range(LOBBIES):
+        lobby_id = f'lobby_{i}'
+        engine.create_lobby(lobby_id, {'max_players': 8})
+        engine.add_players_to_lobby(lobby_id, [
+            Player(f'player_{i}_{j}', f'Player{j}', {'skill_rating': 1000 + j}) for j in range(PLAYERS_PER_LOBBY)
+        ])
+        if i % 2:
+            engine.set_ready_many(lobby_id, [f'player_{i}_{j}' for j in range(PLAYERS_PER_LOBBY)], True)
+    
+    matcher.create_queue('ranked', {'players_per_match': 10})
+    for i in range(QUEUED_TICKETS):
+        matcher.add_ticket('ranked', MatchTicket(f'queued_{i}', f'Queued{i}', 800 + i % 800))
+    return engine, matcher
+
+def run(engine, matcher, compress_level: int):
+    directory = tempfile.mkdtemp(prefix='joinly_snapshots_')
+    config = {'directory': directory, 'compress_level': compress_level}
+    try:
+        manager = SnapshotManager(engine, matcher, None, config)
+        manager.restore()
+        engine.event_bus.on('*', manager._on_event)
+        snapshot = manager.write_snapshot()
+        
+        for i in range(JOURNALED_LOBBIES):
+            engine.add_player_to_lobby(f'lobby_{i}', Player(f'late_{compress_level}_{i}', 'Late'))
+        start = time.perf_counter()
+        records = manager.flush_journal()
+        journal_seconds = time.perf_counter() - start
+        engine.event_bus.off('*', manager._on_event)
+        manager.journal.close()
+        
+        fresh_engine = LobbyEngine(ENGINE_CONFIG)
+        fresh_matcher = Matcher(fresh_engine)
+        restored = SnapshotManager(fresh_engine, fresh_matcher, None, config).restore()
+        
+        print(f"compress_level={compress_level}")
+        print(f"  snapshot size:   {snapshot['bytes'] / 1048576:8.2f} MiB "
+              f"({snapshot['lobbies']} lobbies, {len(engine.players)} players)")
+        print(f"  write time:      {snapshot['seconds']:8.2f} s")
+        print(f"  journal flush:   {journal_seconds * 1000:8.2f} ms ({records} records)")
+        print(f"  restore time:    {restored['seconds']:8.2f} s "
+              f"({restored['lobbies']} lobbies, {restored['journal_records']} journal records replayed)")
+        assert len(fresh_engine.lobbies) == len(engine.lobbies)
+        assert len(fresh_engine.players) == len(engine.players)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == '__main__':
+    start = time.perf_counter()
+    engine, matcher = build()
+    print(f"Built {LOBBIES} lobbies in {time.perf_counter() - start:.2f} s\n")
+    for level in COMPRESS_LEVELS:
+        run(engine, matcher, level)
\ No newline at end of file
@@ -42,10 +42,11 @@ for i, profile in enumerate(profiles * 2):
 print("\nWaiting for bots to get ready...")
 for _ in range(5):
     time.sleep(1)
-    ready_count = sum(1 for p in lobby.players.values() if p.ready)
-    ready_count += sum(1 for b in lobby.bots.values() if b.ready)
-    total = lobby.get_player_count() + lobby.get_bot_count()
-    print(f"Ready: {ready_count}/{total}")
+    counts = lobby.get_ready_counts()
+    print(f"Ready: {counts['players_ready'] + counts['bots_ready']}/"
+          f"{counts['players_total'] + counts['bots_total']} "
+          f"(humans {counts['players_ready']}/{counts['players_total']}, "
+          f"bots {counts['bots_ready']}/{counts['bots_total']})")
     
     bot_manager.update_all_bots()
 